@@ -1,26 +1,138 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
+from flask import Flask, Response, abort, g, has_request_context, render_template, request, redirect, url_for, flash, jsonify
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
-from werkzeug.security import generate_password_hash, check_password_hash
 from flask_migrate import Migrate
 from flask_wtf.csrf import CSRFProtect
 from flask_wtf import FlaskForm
 from wtforms import StringField, PasswordField, SubmitField
-from wtforms.validators import DataRequired, Email, EqualTo, ValidationError
+from wtforms.validators import DataRequired, Email, EqualTo
+from sqlalchemy import event, or_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+import click
 from config import Config
+import metrics
+from db_routing import ReplicaRouter, RoutingSession, set_statement_timeout_per_transaction
+from symptom_index import RelatedConditions, SymptomIndex
+from intent_router import IntentRouter, Rule
+from password_hashing import HasherBusy, PasswordHasher
+from profiler import SamplingProfiler
+from write_behind import WriteBehindBuffer
+from ttl_cache import TTLCache
+import atexit
+from contextlib import ExitStack
+import gc
+import hmac
 import json
+import logging
+import math
+import random
 import re
-from datetime import datetime, timedelta
+import time
+from datetime import date, datetime, timedelta
 
 app = Flask(__name__)
 app.config.from_object(Config)
 
-db = SQLAlchemy(app)
+db = SQLAlchemy(app, session_options={'class_': RoutingSession})
+replica_router = ReplicaRouter(db, retry_interval=app.config['DB_REPLICA_RETRY_INTERVAL'])
+read_only = replica_router.read_only
+if app.config['DB_PGBOUNCER'] and app.config['DB_STATEMENT_TIMEOUT_MS']:
+    with app.app_context():
+        for engine in db.engines.values():
+            if engine.dialect.name == 'postgresql':
+                set_statement_timeout_per_transaction(engine, app.config['DB_STATEMENT_TIMEOUT_MS'])
 migrate = Migrate(app, db)
 csrf = CSRFProtect(app)
 login_manager = LoginManager(app)
 login_manager.login_view = 'login'
 
+password_hasher = PasswordHasher(
+    iterations=app.config['PASSWORD_HASH_ITERATIONS'],
+    max_workers=app.config['PASSWORD_HASH_WORKERS'],
+    max_pending=app.config['PASSWORD_HASH_MAX_PENDING'],
+    timeout=app.config['PASSWORD_HASH_TIMEOUT']
+)
+
+# Per-request instrumentation, exported on /metrics
+request_seconds = metrics.registry.histogram(
+    'healthcare_http_request_duration_seconds', 'Request latency by route', ['route', 'method', 'status'])
+response_size_bytes = metrics.registry.histogram(
+    'healthcare_http_response_size_bytes', 'Response body size by route', ['route'],
+    buckets=(100, 1000, 10000, 100000, 1000000))
+request_sql_queries = metrics.registry.histogram(
+    'healthcare_http_request_sql_queries', 'SQL statements executed per request', ['route'],
+    buckets=(0, 1, 2, 5, 10, 25, 50, 100))
+request_sql_seconds = metrics.registry.histogram(
+    'healthcare_http_request_sql_seconds', 'Time spent in SQL statements per request', ['route'])
+sql_query_seconds = metrics.registry.histogram(
+    'healthcare_sql_query_seconds', 'SQL statement execution time')
+slow_requests = metrics.registry.counter(
+    'healthcare_http_slow_requests', 'Requests slower than SLOW_REQUEST_MS', ['route'])
+
+# Statements in the slow-request log, and characters of each statement kept
+SLOW_REQUEST_TOP_QUERIES = 5
+MAX_LOGGED_STATEMENT_LENGTH = 200
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def record_query(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['query_start'].pop()
+    sql_query_seconds.observe(elapsed)
+    # Statements outside a request (the chat history writer, CLI commands) only count globally
+    if has_request_context() and 'sql' in g:
+        g.sql['count'] += 1
+        g.sql['seconds'] += elapsed
+        entry = g.sql['statements'].setdefault(statement[:MAX_LOGGED_STATEMENT_LENGTH], [0, 0.0])
+        entry[0] += 1
+        entry[1] += elapsed
+
+@event.listens_for(Engine, 'handle_error')
+def discard_query_timer(context):
+    # A failed statement never reaches after_cursor_execute
+    if context.connection is not None and context.connection.info.get('query_start'):
+        context.connection.info['query_start'].pop()
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+    g.sql = {'count': 0, 'seconds': 0.0, 'statements': {}}
+
+@app.after_request
+def record_request(response):
+    start = g.pop('request_start', None)
+    if start is None:
+        return response
+    elapsed = time.perf_counter() - start
+    route = request.url_rule.rule if request.url_rule else 'unmatched'  # Bounded label values
+    sql = g.sql
+    
+    request_seconds.observe(elapsed, route=route, method=request.method, status=str(response.status_code))
+    request_sql_queries.observe(sql['count'], route=route)
+    request_sql_seconds.observe(sql['seconds'], route=route)
+    size = response.calculate_content_length()  # None for streamed responses
+    if size is not None:
+        response_size_bytes.observe(size, route=route)
+    
+    if elapsed * 1000 >= app.config['SLOW_REQUEST_MS']:
+        slow_requests.inc(route=route)
+        top_queries = sorted(sql['statements'].items(), key=lambda item: item[1][1], reverse=True)
+        metrics.log_event(
+            app.logger, 'slow_request', logging.WARNING,
+            route=route, method=request.method, status=response.status_code,
+            duration_ms=round(elapsed * 1000, 1),
+            sql_queries=sql['count'], sql_ms=round(sql['seconds'] * 1000, 1),
+            top_queries=[
+                {'statement': statement, 'count': count, 'ms': round(seconds * 1000, 1)}
+                for statement, (count, seconds) in top_queries[:SLOW_REQUEST_TOP_QUERIES]
+            ]
+        )
+    return response
+
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
@@ -28,10 +140,10 @@ class User(UserMixin, db.Model):
     password_hash = db.Column(db.String(256), nullable=False)  
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
 
 class LoginForm(FlaskForm):
     username = StringField('Username', validators=[DataRequired()])
@@ -45,15 +157,18 @@ class RegistrationForm(FlaskForm):
     confirm_password = PasswordField('Confirm Password', validators=[DataRequired(), EqualTo('password')])
     submit = SubmitField('Register')
 
-    def validate_username(self, username):
-        user = User.query.filter_by(username=username.data).first()
-        if user:
-            raise ValidationError('Username already taken. Please choose a different one.')
-
-    def validate_email(self, email):
-        user = User.query.filter_by(email=email.data).first()
-        if user:
-            raise ValidationError('Email already registered. Please use a different one.')
+    def taken_fields(self):
+        """Errors for a username or email already in use, checked in one query; {} if both are free."""
+        username, email = self.username.data, self.email.data
+        taken = db.session.execute(
+            db.select(User.username, User.email).where(or_(User.username == username, User.email == email))
+        ).all()
+        errors = {}
+        if any(row.username == username for row in taken):
+            errors['username'] = ['Username already taken. Please choose a different one.']
+        if any(row.email == email for row in taken):
+            errors['email'] = ['Email already registered. Please use a different one.']
+        return errors
 
 class Appointment(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -63,27 +178,124 @@ class Appointment(db.Model):
     notes = db.Column(db.Text, nullable=True)
     status = db.Column(db.String(120), nullable=False, default='pending')
 
+    __table_args__ = (
+        db.Index('ix_appointment_patient_id_appointment_date', 'patient_id', 'appointment_date'),
+    )
+
 class Meal(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     date = db.Column(db.DateTime, nullable=False)
     calories = db.Column(db.Integer, nullable=False)
 
+    __table_args__ = (
+        db.Index('ix_meal_user_id_date', 'user_id', 'date'),
+    )
+
 class WaterIntake(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     date = db.Column(db.DateTime, nullable=False)
     amount = db.Column(db.Integer, nullable=False)
 
+    __table_args__ = (
+        db.Index('ix_water_intake_user_id_date', 'user_id', 'date'),
+    )
+
 class Exercise(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     date = db.Column(db.DateTime, nullable=False)
     duration = db.Column(db.Integer, nullable=False)
 
+    __table_args__ = (
+        db.Index('ix_exercise_user_id_date', 'user_id', 'date'),
+    )
+
+class HealthMetric(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    date = db.Column(db.DateTime, nullable=False)
+    weight = db.Column(db.Float)  # in kg
+    height = db.Column(db.Float)  # in cm
+    blood_pressure_sys = db.Column(db.Integer)
+    blood_pressure_dia = db.Column(db.Integer)
+    heart_rate = db.Column(db.Integer)
+    sleep_hours = db.Column(db.Float)
+
+    __table_args__ = (
+        db.Index('ix_health_metric_user_id_date', 'user_id', 'date'),
+    )
+
+class IngestBatch(db.Model):
+    # Stored /log_batch responses, so a retried sync with the same key is not applied twice
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    idempotency_key = db.Column(db.String(128), primary_key=True)
+    response = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+class ChatHistory(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    message = db.Column(db.Text, nullable=False)
+    response = db.Column(db.Text, nullable=False)
+    timestamp = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_chat_history_user_id_timestamp_id', 'user_id', 'timestamp', 'id'),
+    )
+
+class DailyRollup(db.Model):
+    # Per-user daily totals, kept current by the logging endpoints so progress reads are one lookup
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    calories = db.Column(db.Integer, nullable=False, default=0)
+    water_ml = db.Column(db.Integer, nullable=False, default=0)
+    exercise_min = db.Column(db.Integer, nullable=False, default=0)
+    sleep_h = db.Column(db.Float, nullable=False, default=0)
+
+class CachedUser(UserMixin):
+    """Detached identity of a logged-in user, safe to share between requests and threads.
+
+    Carries the columns views read from ``current_user``, never the password
+    hash. Load the ``User`` row to change anything.
+    """
+
+    def __init__(self, id, username, email):
+        self.id = id
+        self.username = username
+        self.email = email
+
+    @classmethod
+    def from_user(cls, user):
+        return cls(user.id, user.username, user.email)
+
+# Keyed by user id. Each worker process has its own cache; updates made by other
+# processes (or by bulk UPDATE statements) show up once an entry expires.
+user_cache = TTLCache(
+    maxsize=app.config['USER_CACHE_SIZE'],
+    ttl=app.config['USER_CACHE_TTL']
+)
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def invalidate_cached_user(mapper, connection, target):
+    user_cache.invalidate(target.id)
+
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    if not app.config['USER_CACHE_ENABLED']:
+        return db.session.get(User, int(user_id))
+    
+    user_id = int(user_id)
+    identity = user_cache.get(user_id)
+    if identity is None:
+        user = db.session.get(User, user_id)
+        if user is None:
+            return None
+        identity = CachedUser.from_user(user)
+        user_cache.set(user_id, identity)
+    return identity
 
 @app.route('/')
 @login_required
@@ -97,6 +309,19 @@ def format_response_list(response_list):
 with open('training_data.json', 'r') as f:
     training_data = json.load(f)['training_data']
 
+# Symptom -> disease lookup, compiled once instead of rescanning training_data per message
+symptom_index = SymptomIndex(training_data)
+
+# Disease x symptom incidence matrix with per-disease category flags
+related_conditions = RelatedConditions(
+    symptom_index,
+    respiratory_infections={'Common Cold', 'Flu', 'Tonsillitis'},
+    chronic_respiratory={'COPD', 'Asthma'},
+    emergency_conditions={'Heart Attack', 'Stroke'},
+    mild_symptoms={'cough', 'runny nose', 'sore throat'},
+    severe_symptoms={'shortness of breath', 'wheezing', 'chest pain'}
+)
+
 def get_severity_level(symptoms):
     emergency_symptoms = ['chest pain', 'shortness of breath', 'severe bleeding', 'stroke', 'heart attack']
     urgent_symptoms = ['high fever', 'severe pain', 'persistent vomiting', 'severe headache']
@@ -123,78 +348,19 @@ def check_symptom_duration(message):
     return False, ""
 
 def find_related_conditions(user_symptoms, current_disease):
-    related = []
-    
-    # Define condition categories
-    respiratory_infections = {'Common Cold', 'Flu', 'Tonsillitis'}
-    chronic_respiratory = {'COPD', 'Asthma'}
-    emergency_conditions = {'Heart Attack', 'Stroke'}
-    
-    for item in training_data:
-        if 'symptoms' not in item or item['disease'] == current_disease:
-            continue
-            
-        # Convert both sets to lowercase for comparison
-        item_symptoms = set(s.lower() for s in item['symptoms'])
-        user_symptoms_lower = set(s.lower() for s in user_symptoms)
-        
-        # Count matching symptoms
-        matching_count = len(item_symptoms & user_symptoms_lower)
-        
-        # Define symptom groups
-        mild_respiratory = {'cough', 'runny nose', 'sore throat'}
-        severe_respiratory = {'shortness of breath', 'wheezing', 'chest pain'}
-        
-        # Check if current symptoms are mild or severe
-        has_mild = any(s in mild_respiratory for s in user_symptoms_lower)
-        has_severe = any(s in severe_respiratory for s in user_symptoms_lower)
-        
-        # Skip chronic conditions for mild symptoms
-        if has_mild and not has_severe and item['disease'] in chronic_respiratory:
-            continue
-            
-        # Skip mild conditions for severe symptoms
-        if has_severe and item['disease'] in respiratory_infections:
-            continue
-        
-        if matching_count > 0:
-            related.append({
-                'disease': item['disease'],
-                'match_count': matching_count,
-                'is_emergency': item['disease'] in emergency_conditions
-            })
-    
-    # Sort by emergency first, then match count
-    related.sort(key=lambda x: (x['is_emergency'], x['match_count']), reverse=True)
-    return [r['disease'] for r in related[:3]] if related else []
+    return related_conditions.top(user_symptoms, current_disease)
 
 def check_symptoms(message):
-    user_symptoms = set()
-    for item in training_data:
-        if 'symptoms' in item:
-            for symptom in item['symptoms']:
-                if symptom.lower() in message.lower():
-                    user_symptoms.add(symptom)  # Keep original case for display
-    
-    if user_symptoms:
-        possible_matches = []
-        for item in training_data:
-            if 'symptoms' not in item:
-                continue
-            
-            matching_symptoms = set(s.lower() for s in user_symptoms) & set(s.lower() for s in item['symptoms'])
-            if matching_symptoms:
-                possible_matches.append({
-                    'disease': item['disease'],
-                    'treatment': item['treatment'],
-                    'advice': item['advice'],
-                    'match_count': len(matching_symptoms),
-                    'total_symptoms': len(item['symptoms'])
-                })
+    with metrics.symptom_check_seconds.time():
+        return symptom_report(symptom_index.match(message), message)
+
+def symptom_report(symptom_ids, message):
+    if symptom_ids:
+        possible_matches = symptom_index.rank(symptom_ids)
         
         if possible_matches:
-            possible_matches.sort(key=lambda x: x['match_count'], reverse=True)
-            best_match = possible_matches[0]
+            best_match = possible_matches[0][0]
+            user_symptoms = symptom_index.original_forms(symptom_ids)  # Keep original case for display
             
             # Get severity level
             severity_level, severity_color, severity_message = get_severity_level(user_symptoms)
@@ -218,165 +384,267 @@ def check_symptoms(message):
             return '\n'.join(response)
     return None
 
+def write_chat_history(rows):
+    # Runs on the write-behind thread, outside any request
+    with app.app_context():
+        db.session.execute(db.insert(ChatHistory), rows)
+        db.session.commit()
+
+chat_history_buffer = WriteBehindBuffer(
+    write_chat_history,
+    max_queue_size=app.config['CHAT_HISTORY_QUEUE_SIZE'],
+    batch_size=app.config['CHAT_HISTORY_BATCH_SIZE'],
+    flush_interval=app.config['CHAT_HISTORY_FLUSH_INTERVAL']
+)
+atexit.register(chat_history_buffer.close)
+
+# Self-care advice for common complaints, keyed by the phrase that triggers it
+HEALTH_RESPONSES = {
+    'headache': {
+        'response': [
+            'Rest in a quiet, dark room',
+            'Stay hydrated',
+            'Try over-the-counter pain relievers',
+            'Consider applying a cold or warm compress'
+        ],
+        'additional_advice': 'If the headache persists for more than 3 days or worsens, consult a healthcare provider.'
+    },
+    'fever': {
+        'response': [
+            'Rest and stay hydrated',
+            'Take acetaminophen or ibuprofen',
+            'Use a light blanket',
+            'Take lukewarm baths'
+        ],
+        'additional_advice': 'Seek medical attention if fever is high or persists.'
+    },
+    'cold': {
+        'response': [
+            'Get plenty of rest',
+            'Stay hydrated',
+            'Use over-the-counter cold medications',
+            'Try honey for sore throat',
+            'Use a humidifier'
+        ],
+        'additional_advice': 'Consult a doctor if symptoms worsen.'
+    },
+    'cough': {
+        'response': [
+            'Stay hydrated',
+            'Try honey and warm tea',
+            'Use a humidifier',
+            'Consider over-the-counter cough medicine'
+        ],
+        'additional_advice': 'See a doctor if the cough persists or is severe.'
+    },
+    'pain': {
+        'response': [
+            'Rest the affected area',
+            'Apply ice or heat',
+            'Use over-the-counter pain relievers',
+            'Consider gentle stretching or physical therapy'
+        ],
+        'additional_advice': 'If the pain is severe or persists, consult a healthcare professional.'
+    },
+    'hurt': {
+        'response': [
+            'Assess the injury for swelling or bruising',
+            'Rest and avoid strain',
+            'Apply ice or compression if needed'
+        ],
+        'additional_advice': 'If the pain does not improve or worsens, seek medical advice.'
+    },
+    'sore throat': {
+        'response': [
+            'Gargle with warm salt water',
+            'Drink warm teas with honey',
+            'Use lozenges or throat sprays',
+            'Stay hydrated'
+        ],
+        'additional_advice': 'If symptoms persist for more than a week, consult a doctor.'
+    },
+    'flu': {
+        'response': [
+            'Get plenty of rest',
+            'Drink fluids to prevent dehydration',
+            'Take over-the-counter flu medicine',
+            'Use a humidifier to ease congestion'
+        ],
+        'additional_advice': 'Seek medical attention if symptoms become severe.'
+    },
+    'fatigue': {
+        'response': [
+            'Ensure you get enough sleep',
+            'Stay hydrated and eat a balanced diet',
+            'Take breaks and avoid excessive screen time',
+            'Consider light physical activity like walking'
+        ],
+        'additional_advice': 'Persistent fatigue may require a medical checkup.'
+    }
+}
+
+# Basic responses; {username} is filled in after cache lookup so cached replies stay shared
+BASIC_RESPONSES = {
+    'hello': 'Hello {username}! How can I assist you with your health today?',
+    'hi': 'Hi {username}! How can I help you with your health concerns?',
+    'how are you': 'I am doing well, thank you! How can I assist you with your health today?',
+    'goodbye': 'Goodbye! Take care of your health!',
+    'bye': 'Bye! Stay healthy!',
+    'thank you': 'You are welcome! Let me know if you need any more help.',
+    'thanks': 'You are welcome! Feel free to ask if you need further assistance.'
+}
+
+# Default response for health-related concerns
+HEALTH_KEYWORDS = ['pain', 'hurt', 'feel', 'sick', 'symptoms', 'treatment', 'medicine', 'doctor']
+
+# Messages longer than this are rarely repeated, so they bypass the response cache
+MAX_CACHED_MESSAGE_LENGTH = 256
+
+chat_response_cache = TTLCache(
+    maxsize=app.config['CHAT_CACHE_SIZE'],
+    ttl=app.config['CHAT_CACHE_TTL']
+)
+
+def chat_response(message, username):
+    """Return the chat reply for an already lowercased ``message``.
+
+    Replies are cached per normalized message and shared across users; the
+    only user-specific text is the ``{username}`` placeholder, filled in here.
+    """
+    key = message.strip()
+    template = chat_response_cache.get(key) if len(key) <= MAX_CACHED_MESSAGE_LENGTH else None
+    if template is None:
+        template = route_chat_message(key)
+        if len(key) <= MAX_CACHED_MESSAGE_LENGTH:
+            chat_response_cache.set(key, template)
+    return template.replace('{username}', username)
+
+def health_advice(key):
+    response = [
+        f"For {key}, I recommend:",
+        format_response_list(HEALTH_RESPONSES[key]['response']),
+        "\nAdditional advice:",
+        HEALTH_RESPONSES[key]['additional_advice']
+    ]
+    return '\n'.join(response)
+
+PERSISTENT_HEADACHE_RESPONSE = (
+    'It sounds like you are experiencing a persistent headache. For headaches that last more than a few days, here are a few suggestions:\n' +
+    '- Continue resting in a quiet, dark room\n' +
+    '- Stay hydrated\n' +
+    '- Consider trying a cold or warm compress\n' +
+    '- Over-the-counter medications may help, but you might want to consult with a healthcare provider for further evaluation if the pain continues beyond 3 days.\n\n' +
+    'You may need a more thorough evaluation to rule out other conditions that could be causing the headache.'
+)
+
+HEALTH_CONCERN_RESPONSE = (
+    'I understand you have a health concern. To provide the best advice, could you please:\n' +
+    '1. Describe your symptoms in detail\n' +
+    '2. How long have you been experiencing this?\n' +
+    '3. Have you tried any remedies?\n\n' +
+    'Remember, I am an AI assistant and not a substitute for professional medical advice. ' +
+    'Please consult a healthcare provider for proper diagnosis and treatment.'
+)
+
+DEFAULT_CHAT_RESPONSE = (
+    'I am your healthcare assistant. You can ask me about common health issues like headaches, ' +
+    'fever, colds, or coughs. How can I help you today?'
+)
+
+# Chat routing rules, tried in priority order; the first rule with a qualifying pattern wins
+CHAT_RULES = [
+    # A single mention of a common complaint in a short message
+    Rule('single_health_topic', 10, HEALTH_RESPONSES,
+         lambda message, match: health_advice(match.pattern),
+         exactly_once=True, max_tokens=4),
+    # Any known symptom from the training data
+    Rule('symptoms', 20, symptom_index.symptoms,
+         lambda message, match: symptom_report(
+             [symptom_index.symptom_ids[symptom] for symptom in match.patterns], message)),
+    # Greetings and thank you responses
+    Rule('basic', 30, BASIC_RESPONSES,
+         lambda message, match: BASIC_RESPONSES[match.pattern]),
+    Rule('health_topic', 40, HEALTH_RESPONSES,
+         lambda message, match: health_advice(match.pattern)),
+    Rule('persistent_headache', 50, ['headache'],
+         lambda message, match: PERSISTENT_HEADACHE_RESPONSE,
+         requires_any=['3 days', 'persistent']),
+    Rule('health_concern', 60, HEALTH_KEYWORDS,
+         lambda message, match: HEALTH_CONCERN_RESPONSE)
+]
+
+chat_router = IntentRouter(CHAT_RULES, default=DEFAULT_CHAT_RESPONSE)
+
+def route_chat_message(message):
+    """Pick the reply template for a normalized (lowercased) message."""
+    start = time.perf_counter()
+    rule_name, response = chat_router.route(message)
+    if rule_name == 'symptoms':
+        # Symptoms are matched in the router's single scan for every rule, so the whole route is timed
+        metrics.symptom_check_seconds.observe(time.perf_counter() - start)
+    return response
+
 @app.route('/chat', methods=['POST'])
 @login_required
 def chat():
-    message = request.json.get('message', '').lower()
+    raw_message = request.json.get('message', '')
+    message = raw_message.lower()
+    response = chat_response(message, current_user.username)
     
-    # First check if it's a single symptom that exists in health_responses
-    health_responses = {
-        'headache': {
-            'response': [
-                'Rest in a quiet, dark room',
-                'Stay hydrated',
-                'Try over-the-counter pain relievers',
-                'Consider applying a cold or warm compress'
-            ],
-            'additional_advice': 'If the headache persists for more than 3 days or worsens, consult a healthcare provider.'
-        },
-        'fever': {
-            'response': [
-                'Rest and stay hydrated',
-                'Take acetaminophen or ibuprofen',
-                'Use a light blanket',
-                'Take lukewarm baths'
-            ],
-            'additional_advice': 'Seek medical attention if fever is high or persists.'
-        },
-        'cold': {
-            'response': [
-                'Get plenty of rest',
-                'Stay hydrated',
-                'Use over-the-counter cold medications',
-                'Try honey for sore throat',
-                'Use a humidifier'
-            ],
-            'additional_advice': 'Consult a doctor if symptoms worsen.'
-        },
-        'cough': {
-            'response': [
-                'Stay hydrated',
-                'Try honey and warm tea',
-                'Use a humidifier',
-                'Consider over-the-counter cough medicine'
-            ],
-            'additional_advice': 'See a doctor if the cough persists or is severe.'
-        },
-        'pain': {
-            'response': [
-                'Rest the affected area',
-                'Apply ice or heat',
-                'Use over-the-counter pain relievers',
-                'Consider gentle stretching or physical therapy'
-            ],
-            'additional_advice': 'If the pain is severe or persists, consult a healthcare professional.'
-        },
-        'hurt': {
-            'response': [
-                'Assess the injury for swelling or bruising',
-                'Rest and avoid strain',
-                'Apply ice or compression if needed'
-            ],
-            'additional_advice': 'If the pain does not improve or worsens, seek medical advice.'
-        },
-        'sore throat': {
-            'response': [
-                'Gargle with warm salt water',
-                'Drink warm teas with honey',
-                'Use lozenges or throat sprays',
-                'Stay hydrated'
-            ],
-            'additional_advice': 'If symptoms persist for more than a week, consult a doctor.'
-        },
-        'flu': {
-            'response': [
-                'Get plenty of rest',
-                'Drink fluids to prevent dehydration',
-                'Take over-the-counter flu medicine',
-                'Use a humidifier to ease congestion'
-            ],
-            'additional_advice': 'Seek medical attention if symptoms become severe.'
-        },
-        'fatigue': {
-            'response': [
-                'Ensure you get enough sleep',
-                'Stay hydrated and eat a balanced diet',
-                'Take breaks and avoid excessive screen time',
-                'Consider light physical activity like walking'
-            ],
-            'additional_advice': 'Persistent fatigue may require a medical checkup.'
-        }
-    }
+    # Persisted by a background thread so the insert stays off the request path
+    chat_history_buffer.record({
+        'user_id': current_user.id,
+        'message': raw_message,
+        'response': response,
+        'timestamp': datetime.utcnow()
+    })
+    return jsonify({'response': response})
 
-    for key in health_responses:
-        if message.count(key) == 1 and len(message.split()) <= 4:  # Check if it's a simple symptom mention
-            response = [
-                f"For {key}, I recommend:",
-                format_response_list(health_responses[key]['response']),
-                "\nAdditional advice:",
-                health_responses[key]['additional_advice']
-            ]
-            return jsonify({'response': '\n'.join(response)})
-    
-    # If not a single symptom, try symptom matching from training data
-    symptom_response = check_symptoms(message)
-    if symptom_response:
-        return jsonify({'response': symptom_response})
-    
-    # Basic responses
-    basic_responses = {
-        'hello': f'Hello {current_user.username}! How can I assist you with your health today?',
-        'hi': f'Hi {current_user.username}! How can I help you with your health concerns?',
-        'how are you': 'I am doing well, thank you! How can I assist you with your health today?',
-        'goodbye': 'Goodbye! Take care of your health!',
-        'bye': 'Bye! Stay healthy!',
-        'thank you': 'You are welcome! Let me know if you need any more help.',
-        'thanks': 'You are welcome! Feel free to ask if you need further assistance.'
-    }
+# Page size bounds for /chat_history
+DEFAULT_HISTORY_PAGE_SIZE = 20
+MAX_HISTORY_PAGE_SIZE = 100
 
-    # Check for basic greetings and thank you responses
-    for key in basic_responses:
-        if key in message:
-            return jsonify({'response': basic_responses[key]})
+@app.route('/chat_history')
+@login_required
+@read_only
+def chat_history():
+    """Newest-first chat turns, paginated by a (timestamp, id) keyset cursor."""
+    try:
+        limit = min(int(request.args.get('limit', DEFAULT_HISTORY_PAGE_SIZE)), MAX_HISTORY_PAGE_SIZE)
+        if limit < 1:
+            raise ValueError
+    except ValueError:
+        return jsonify({'error': 'Invalid limit'}), 400
 
-    # Check for health concerns
-    for key in health_responses:
-        if key in message:
-            response = [
-                f"For {key}, I recommend:",
-                format_response_list(health_responses[key]['response']),
-                "\nAdditional advice:",
-                health_responses[key]['additional_advice']
-            ]
-            return jsonify({'response': '\n'.join(response)})
+    query = db.select(ChatHistory).where(ChatHistory.user_id == current_user.id)
 
-    # Custom health advice based on user input
-    if 'headache' in message and ('3 days' in message or 'persistent' in message):
-        return jsonify({
-            'response': 'It sounds like you are experiencing a persistent headache. For headaches that last more than a few days, here are a few suggestions:\n' +
-                       '- Continue resting in a quiet, dark room\n' +
-                       '- Stay hydrated\n' +
-                       '- Consider trying a cold or warm compress\n' +
-                       '- Over-the-counter medications may help, but you might want to consult with a healthcare provider for further evaluation if the pain continues beyond 3 days.\n\n' +
-                       'You may need a more thorough evaluation to rule out other conditions that could be causing the headache.'
-        })
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            timestamp_str, id_str = cursor.rsplit('_', 1)
+            cursor_key = (datetime.fromisoformat(timestamp_str), int(id_str))
+        except ValueError:
+            return jsonify({'error': 'Invalid cursor'}), 400
+        query = query.where(db.tuple_(ChatHistory.timestamp, ChatHistory.id) < cursor_key)
 
-    # Default response for health-related concerns
-    health_keywords = ['pain', 'hurt', 'feel', 'sick', 'symptoms', 'treatment', 'medicine', 'doctor']
-    if any(keyword in message for keyword in health_keywords):
-        return jsonify({
-            'response': 'I understand you have a health concern. To provide the best advice, could you please:\n' +
-                       '1. Describe your symptoms in detail\n' +
-                       '2. How long have you been experiencing this?\n' +
-                       '3. Have you tried any remedies?\n\n' +
-                       'Remember, I am an AI assistant and not a substitute for professional medical advice. ' +
-                       'Please consult a healthcare provider for proper diagnosis and treatment.'
-        })
+    # Fetch one extra row to know whether another page exists
+    rows = db.session.execute(
+        query.order_by(ChatHistory.timestamp.desc(), ChatHistory.id.desc()).limit(limit + 1)
+    ).scalars().all()
+    page = rows[:limit]
+    next_cursor = f'{page[-1].timestamp.isoformat()}_{page[-1].id}' if len(rows) > limit else None
 
-    # Default response if no match is found
     return jsonify({
-        'response': 'I am your healthcare assistant. You can ask me about common health issues like headaches, ' +
-                   'fever, colds, or coughs. How can I help you today?'
+        'messages': [
+            {
+                'id': row.id,
+                'message': row.message,
+                'response': row.response,
+                'timestamp': row.timestamp.isoformat()
+            }
+            for row in page
+        ],
+        'next_cursor': next_cursor
     })
 
 @app.route('/book_appointment', methods=['POST'])
@@ -390,7 +658,6 @@ def book_appointment():
 
     try:
         data = request.get_json()
-        print("Received appointment data:", data)
         
         if not data:
             return jsonify({
@@ -403,7 +670,12 @@ def book_appointment():
         appointment_time = data.get('appointmentTime')
         notes = data.get('appointmentNotes', '')
         
-        print(f"Parsed data - Type: {appointment_type}, Date: {appointment_date}, Time: {appointment_time}")
+        # Notes are free text about the patient's health, so they are never logged
+        metrics.log_event(
+            app.logger, 'appointment_request', logging.DEBUG, app.config['LOG_SAMPLE_RATE'],
+            user_id=current_user.id, appointment_type=appointment_type,
+            appointment_date=appointment_date, appointment_time=appointment_time
+        )
         
         # Validate required fields
         if not all([appointment_type, appointment_date, appointment_time]):
@@ -416,7 +688,10 @@ def book_appointment():
                 missing_fields.append('time')
             
             error_msg = f"Missing required fields: {', '.join(missing_fields)}"
-            print(error_msg)
+            metrics.log_event(
+                app.logger, 'appointment_rejected', logging.INFO, app.config['LOG_SAMPLE_RATE'],
+                user_id=current_user.id, missing_fields=missing_fields
+            )
             return jsonify({
                 'status': 'error',
                 'message': error_msg
@@ -450,12 +725,14 @@ def book_appointment():
             }), 400
             
     except Exception as e:
-        print(f"Error booking appointment: {str(e)}")
+        app.logger.exception('Error booking appointment')
         return jsonify({
             'status': 'error',
             'message': 'An error occurred while booking the appointment'
         }), 500
 
+BUSY_RESPONSE = {'status': 'error', 'message': 'The server is busy. Please try again in a moment.'}
+
 @app.route('/register', methods=['GET', 'POST'])
 def register():
     if current_user.is_authenticated:
@@ -463,38 +740,33 @@ def register():
         
     form = RegistrationForm()
     if request.method == 'POST':
-        # Debug prints
-        print("Raw form data:", request.form)
-        print("Form data:", {
-            'username': form.username.data,
-            'email': form.email.data,
-            'password': 'hidden',
-            'csrf_token': form.csrf_token.data
-        })
-        print("Form errors:", form.errors)
-        print("Form validated:", form.validate())
-        
-        if form.validate_on_submit():
-            try:
-                # Create new user
-                user = User(
-                    username=form.username.data,
-                    email=form.email.data
-                )
-                user.set_password(form.password.data)
-                
-                # Try to add to database
-                db.session.add(user)
-                db.session.commit()
-                print("Registration successful for:", user.username)
-                return jsonify({'status': 'success', 'message': 'Registration successful! Please login.'})
-            except Exception as e:
-                db.session.rollback()
-                print(f"Registration error: {str(e)}")
-                return jsonify({'status': 'error', 'message': f'Registration failed: {str(e)}'})
-        else:
-            print("Form validation failed:", form.errors)
+        if not form.validate_on_submit():
             return jsonify({'status': 'error', 'message': form.errors})
+        
+        errors = form.taken_fields()
+        if errors:
+            return jsonify({'status': 'error', 'message': errors})
+        
+        try:
+            user = User(
+                username=form.username.data,
+                email=form.email.data
+            )
+            user.set_password(form.password.data)
+            db.session.add(user)
+            db.session.commit()
+        except HasherBusy:
+            return jsonify(BUSY_RESPONSE), 503
+        except IntegrityError:
+            # A concurrent registration took the name or email after the check; the unique constraints caught it
+            db.session.rollback()
+            errors = form.taken_fields() or {'username': ['Username or email already registered.']}
+            return jsonify({'status': 'error', 'message': errors})
+        except Exception as e:
+            db.session.rollback()
+            app.logger.exception('Registration failed')
+            return jsonify({'status': 'error', 'message': f'Registration failed: {str(e)}'})
+        return jsonify({'status': 'success', 'message': 'Registration successful! Please login.'})
             
     return render_template('register.html', form=form)
 
@@ -505,26 +777,27 @@ def login():
     
     form = LoginForm()
     if request.method == 'POST':
-        # Debug prints
-        print("Raw login form data:", request.form)
-        print("Login form data:", {
-            'username': form.username.data,
-            'csrf_token': form.csrf_token.data
-        })
-        print("Login form errors:", form.errors)
-        print("Login form validated:", form.validate())
+        if not form.validate_on_submit():
+            return jsonify({'status': 'error', 'message': 'Invalid form data'})
         
-        if form.validate_on_submit():
-            user = User.query.filter_by(username=form.username.data).first()
-            print("User found:", user is not None)
-            if user and user.check_password(form.password.data):
-                login_user(user)
-                print("Login successful for user:", user.username)
-                return jsonify({'status': 'success', 'redirect': url_for('index')})
-            print("Invalid password for user:", form.username.data)
+        user = User.query.filter_by(username=form.username.data).first()
+        try:
+            # Unknown usernames are checked against a dummy hash so they take as long as wrong passwords
+            valid = password_hasher.verify(user.password_hash if user else None, form.password.data)
+        except HasherBusy:
+            return jsonify(BUSY_RESPONSE), 503
+        if not valid:
             return jsonify({'status': 'error', 'message': 'Invalid username or password'})
-        print("Login form validation failed:", form.errors)
-        return jsonify({'status': 'error', 'message': 'Invalid form data'})
+        
+        if password_hasher.needs_rehash(user.password_hash):
+            # Upgrade hashes made with another work factor while the plain password is at hand
+            try:
+                user.set_password(form.password.data)
+                db.session.commit()
+            except HasherBusy:
+                pass  # Upgraded at a later login
+        login_user(user)
+        return jsonify({'status': 'success', 'redirect': url_for('index')})
             
     return render_template('login.html', form=form)
 
@@ -534,8 +807,144 @@ def logout():
     logout_user()
     return redirect(url_for('login'))
 
+# Default daily goals reported alongside progress totals
+DEFAULT_GOALS = {
+    'calories': 2000,  # kcal
+    'water': 2000,     # ml
+    'exercise': 30,    # minutes
+    'sleep': 8         # hours
+}
+
+# Upper bound on /get_progress_range so one request can't scan unbounded history
+MAX_PROGRESS_RANGE_DAYS = 366
+
+# Rollup column -> raw table and column it totals
+ROLLUP_SOURCES = {
+    'calories': (Meal, Meal.calories),
+    'water_ml': (WaterIntake, WaterIntake.amount),
+    'exercise_min': (Exercise, Exercise.duration),
+    'sleep_h': (HealthMetric, HealthMetric.sleep_hours)
+}
+ROLLUP_COLUMNS = list(ROLLUP_SOURCES)
+
+def add_to_daily_rollup(user_id, day, **deltas):
+    """Add ``deltas`` to the user's rollup row for ``day`` in the current transaction.
+
+    Uses INSERT ... ON CONFLICT DO UPDATE so concurrent writers never lose an increment.
+    """
+    insert = postgresql.insert if db.engine.dialect.name == 'postgresql' else sqlite.insert
+    values = {column: 0 for column in ROLLUP_COLUMNS}
+    values.update(deltas)
+    statement = insert(DailyRollup).values(user_id=user_id, day=day, **values)
+    statement = statement.on_conflict_do_update(
+        index_elements=[DailyRollup.user_id, DailyRollup.day],
+        set_={column: DailyRollup.__table__.c[column] + statement.excluded[column] for column in deltas}
+    )
+    db.session.execute(statement)
+
+def day_bucket(column):
+    # date_trunc is PostgreSQL-only; SQLite (local development) truncates with date()
+    if db.engine.dialect.name == 'postgresql':
+        return db.func.date_trunc('day', column)
+    return db.func.date(column)
+
+def raw_daily_totals(user_ids):
+    """Recompute rollup values from the raw tables as ``{(user_id, day): {column: total}}``.
+
+    The tables are grouped by user and day in SQL and combined with UNION ALL,
+    so each call is a single query regardless of how many users it covers.
+    """
+    def grouped(column_name, model, column):
+        day = day_bucket(model.date)
+        return db.select(
+            db.literal(column_name).label('column_name'),
+            model.user_id,
+            day.label('day'),
+            db.func.sum(column).label('total')
+        ).where(model.user_id.in_(user_ids)).group_by(model.user_id, day)
+
+    rows = db.session.execute(db.union_all(*(
+        grouped(column_name, model, column) for column_name, (model, column) in ROLLUP_SOURCES.items()
+    )))
+
+    totals = {}
+    for column_name, user_id, day, total in rows:
+        day = day.date() if isinstance(day, datetime) else datetime.strptime(str(day), '%Y-%m-%d').date()
+        totals.setdefault((user_id, day), {column: 0 for column in ROLLUP_COLUMNS})[column_name] = total or 0
+    return totals
+
+def iter_user_id_chunks(chunk_size):
+    # Keyset over user ids so rollup maintenance streams through the table
+    last_id = 0
+    while True:
+        user_ids = db.session.execute(
+            db.select(User.id).where(User.id > last_id).order_by(User.id).limit(chunk_size)
+        ).scalars().all()
+        if not user_ids:
+            return
+        yield user_ids
+        last_id = user_ids[-1]
+
+@app.cli.command('rebuild-rollups')
+@click.option('--chunk-size', default=500, help='Users recomputed per transaction.')
+def rebuild_rollups(chunk_size):
+    """Recompute DailyRollup from the raw tracking tables.
+
+    Safe to run while users are logging: each chunk's users are locked before their
+    totals are read, so a concurrent log_* write either commits before the read (and
+    is counted) or waits for the chunk to commit (and adds its delta on top).
+    """
+    rebuilt = 0
+    for user_ids in iter_user_id_chunks(chunk_size):
+        # PostgreSQL: FOR UPDATE on the users conflicts with the FOR KEY SHARE lock each raw
+        # insert takes through its user_id foreign key. SQLite ignores FOR UPDATE, but the
+        # DELETE takes the database write lock, so it runs before the read
+        db.session.execute(db.select(User.id).where(User.id.in_(user_ids)).with_for_update())
+        db.session.execute(db.delete(DailyRollup).where(DailyRollup.user_id.in_(user_ids)))
+        totals = raw_daily_totals(user_ids)
+        if totals:
+            db.session.execute(db.insert(DailyRollup), [
+                {'user_id': user_id, 'day': day, **values} for (user_id, day), values in totals.items()
+            ])
+        db.session.commit()
+        rebuilt += len(totals)
+    click.echo(f'Rebuilt {rebuilt} daily rollup rows')
+
+@app.cli.command('check-rollups')
+@click.option('--chunk-size', default=500, help='Users compared per query.')
+def check_rollups(chunk_size):
+    """Compare DailyRollup with totals recomputed from the raw tracking tables."""
+    mismatches = 0
+    for user_ids in iter_user_id_chunks(chunk_size):
+        expected = raw_daily_totals(user_ids)
+        actual = {
+            (row.user_id, row.day): {column: getattr(row, column) for column in ROLLUP_COLUMNS}
+            for row in DailyRollup.query.filter(DailyRollup.user_id.in_(user_ids))
+        }
+        for key in sorted(expected.keys() | actual.keys()):
+            want = expected.get(key, {})
+            have = actual.get(key, {})
+            # sleep_h sums floats, so compare with a tolerance
+            if not all(math.isclose(want.get(c, 0), have.get(c, 0), abs_tol=1e-6) for c in ROLLUP_COLUMNS):
+                mismatches += 1
+                click.echo(f'user {key[0]} on {key[1]}: expected {want or None}, found {have or None}')
+    click.echo(f'{mismatches} mismatched daily rollup rows')
+    if mismatches:
+        raise SystemExit(1)
+
+def rollup_totals(rollup):
+    if rollup is None:
+        return {'calories': 0, 'water': 0, 'exercise': 0, 'sleep': 0}
+    return {
+        'calories': rollup.calories,
+        'water': rollup.water_ml,
+        'exercise': rollup.exercise_min,
+        'sleep': rollup.sleep_h
+    }
+
 @app.route('/get_daily_progress')
 @login_required
+@read_only
 def get_daily_progress():
     date_str = request.args.get('date')
     if not date_str:
@@ -543,49 +952,23 @@ def get_daily_progress():
 
     try:
         # Parse the date
-        target_date = datetime.strptime(date_str, '%Y-%m-%d')
-        start_of_day = target_date.replace(hour=0, minute=0, second=0, microsecond=0)
-        end_of_day = start_of_day + timedelta(days=1)
-
-        # Get meals for the day
-        meals = Meal.query.filter(
-            Meal.user_id == current_user.id,
-            Meal.date >= start_of_day,
-            Meal.date < end_of_day
-        ).all()
+        target_date = datetime.strptime(date_str, '%Y-%m-%d').date()
 
-        # Calculate total calories
-        total_calories = sum(meal.calories for meal in meals)
-
-        # Get water intake for the day
-        water_entries = WaterIntake.query.filter(
-            WaterIntake.user_id == current_user.id,
-            WaterIntake.date >= start_of_day,
-            WaterIntake.date < end_of_day
-        ).all()
-        total_water = sum(entry.amount for entry in water_entries)
-
-        # Get exercise for the day
-        exercises = Exercise.query.filter(
-            Exercise.user_id == current_user.id,
-            Exercise.date >= start_of_day,
-            Exercise.date < end_of_day
-        ).all()
-        total_exercise = sum(exercise.duration for exercise in exercises)
+        totals = rollup_totals(db.session.get(DailyRollup, (current_user.id, target_date)))
 
         # Return progress data with default goals
         return jsonify({
             'calories': {
-                'current': total_calories,
-                'goal': 2000  # Default daily calorie goal
+                'current': totals['calories'],
+                'goal': DEFAULT_GOALS['calories']
             },
             'water': {
-                'current': total_water,
-                'goal': 2000  # Default daily water goal in ml
+                'current': totals['water'],
+                'goal': DEFAULT_GOALS['water']
             },
             'exercise': {
-                'current': total_exercise,
-                'goal': 30  # Default daily exercise goal in minutes
+                'current': totals['exercise'],
+                'goal': DEFAULT_GOALS['exercise']
             }
         })
 
@@ -594,6 +977,45 @@ def get_daily_progress():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/get_progress_range')
+@login_required
+@read_only
+def get_progress_range():
+    start_str = request.args.get('start')
+    end_str = request.args.get('end')
+    if not start_str or not end_str:
+        return jsonify({'error': 'Start and end parameters are required'}), 400
+
+    try:
+        # Both ends are inclusive calendar days
+        start_date = datetime.strptime(start_str, '%Y-%m-%d').date()
+        end_date = datetime.strptime(end_str, '%Y-%m-%d').date()
+        num_days = (end_date - start_date).days + 1
+        if num_days < 1:
+            return jsonify({'error': 'End date must not be before start date'}), 400
+        if num_days > MAX_PROGRESS_RANGE_DAYS:
+            return jsonify({'error': f'Date range is limited to {MAX_PROGRESS_RANGE_DAYS} days'}), 400
+
+        rollups = {
+            rollup.day: rollup for rollup in DailyRollup.query.filter(
+                DailyRollup.user_id == current_user.id,
+                DailyRollup.day >= start_date,
+                DailyRollup.day <= end_date
+            )
+        }
+
+        days = []
+        for offset in range(num_days):
+            day = start_date + timedelta(days=offset)
+            days.append({'date': day.isoformat(), **rollup_totals(rollups.get(day))})
+
+        return jsonify({'days': days, 'goals': DEFAULT_GOALS})
+
+    except ValueError:
+        return jsonify({'error': 'Invalid date format'}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/log_water', methods=['POST'])
 @login_required
 def log_water():
@@ -614,6 +1036,7 @@ def log_water():
         )
         
         db.session.add(water_entry)
+        add_to_daily_rollup(current_user.id, water_entry.date.date(), water_ml=amount_ml)
         db.session.commit()
         
         return jsonify({
@@ -628,50 +1051,257 @@ def log_water():
             'message': str(e)
         }), 500
 
-if __name__ == '__main__':
-    with app.app_context():
-        db.create_all()
-    app.run(debug=True)
-
-@app.route('/summary')
-def get_health_summary():
+@app.route('/log_meal', methods=['POST'])
+@login_required
+def log_meal():
     try:
-        # Get today's date
-        today = date.today()
+        data = request.get_json()
+        calories = data.get('calories')
         
-        # Get latest health metrics
-        health_metrics = HealthMetrics.query.order_by(HealthMetrics.date.desc()).first()
+        if not isinstance(calories, int) or isinstance(calories, bool) or calories <= 0:
+            return jsonify({'success': False, 'message': 'Invalid calorie amount'}), 400
+
+        meal = Meal(
+            user_id=current_user.id,
+            date=datetime.now(),
+            calories=calories
+        )
         
-        # Get today's water intake
-        water_intake = WaterIntake.query.filter_by(date=today).first()
+        db.session.add(meal)
+        add_to_daily_rollup(current_user.id, meal.date.date(), calories=calories)
+        db.session.commit()
         
-        # Get today's exercise
-        exercise = Exercise.query.filter_by(date=today).all()
-        total_exercise_duration = sum(e.duration for e in exercise) if exercise else 0
+        return jsonify({
+            'success': True,
+            'message': f'Successfully logged {calories} calories'
+        })
         
-        # Get today's meals
-        meals = MealLog.query.filter_by(date=today).all()
-        total_calories = sum(meal.calories for meal in meals) if meals else 0
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 500
+
+@app.route('/log_exercise', methods=['POST'])
+@login_required
+def log_exercise():
+    try:
+        data = request.get_json()
+        duration = data.get('duration')
         
-        # Get today's sleep
-        sleep = Sleep.query.filter_by(date=today).first()
+        if not isinstance(duration, int) or isinstance(duration, bool) or duration <= 0:
+            return jsonify({'success': False, 'message': 'Invalid exercise duration'}), 400
+
+        exercise = Exercise(
+            user_id=current_user.id,
+            date=datetime.now(),
+            duration=duration
+        )
+        
+        db.session.add(exercise)
+        add_to_daily_rollup(current_user.id, exercise.date.date(), exercise_min=duration)
+        db.session.commit()
+        
+        return jsonify({
+            'success': True,
+            'message': f'Successfully logged {duration} minutes of exercise'
+        })
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 500
+
+# Largest number of entries a single /log_batch request may carry
+MAX_BATCH_ENTRIES = 500
+
+def parse_entry_date(value):
+    # Offline clients send when the entry happened; default to now for live logging
+    if value is None:
+        return datetime.now()
+    if not isinstance(value, str):
+        raise ValueError('date must be an ISO 8601 string')
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+# Largest value one /log_batch entry may carry per field, so typos and garbage are
+# reported per item instead of overflowing the integer columns or the rollups
+MAX_ENTRY_VALUES = {
+    'amount': 40,          # glasses (10 L)
+    'calories': 20000,     # kcal
+    'duration': 24 * 60,   # minutes
+    'weight': 1000,        # kg
+    'height': 300,         # cm
+    'systolic': 300,       # mmHg
+    'diastolic': 300,      # mmHg
+    'heart_rate': 300,     # bpm
+    'sleep_hours': 24
+}
+
+def is_finite_number(value, valid_types):
+    # bool is an int subclass; NaN and Infinity are floats that Flask's JSON parser accepts
+    if not isinstance(value, valid_types) or isinstance(value, bool):
+        return False
+    return not isinstance(value, float) or math.isfinite(value)
+
+def positive_number(entry, field, integer=False):
+    value = entry.get(field)
+    valid_types = (int,) if integer else (int, float)
+    if not is_finite_number(value, valid_types) or not 0 < value <= MAX_ENTRY_VALUES[field]:
+        kind = 'integer' if integer else 'number'
+        raise ValueError(f'{field} must be a positive {kind} no greater than {MAX_ENTRY_VALUES[field]}')
+    return value
+
+def optional_number(entry, field):
+    value = entry.get(field)
+    if value is None:
+        return None
+    if not is_finite_number(value, (int, float)) or not 0 <= value <= MAX_ENTRY_VALUES[field]:
+        raise ValueError(f'{field} must be a non-negative number no greater than {MAX_ENTRY_VALUES[field]}')
+    return value
+
+def build_water_row(entry):
+    # Same unit as /log_water: amount is in glasses of 250ml
+    amount_ml = int(positive_number(entry, 'amount') * 250)
+    if amount_ml < 1:
+        raise ValueError('amount must be at least 1 ml (0.004 glasses)')
+    return WaterIntake, {'amount': amount_ml}, {'water_ml': amount_ml}
+
+def build_meal_row(entry):
+    calories = positive_number(entry, 'calories', integer=True)
+    return Meal, {'calories': calories}, {'calories': calories}
+
+def build_exercise_row(entry):
+    duration = positive_number(entry, 'duration', integer=True)
+    return Exercise, {'duration': duration}, {'exercise_min': duration}
+
+def build_metrics_row(entry):
+    values = {
+        'weight': optional_number(entry, 'weight'),
+        'height': optional_number(entry, 'height'),
+        'blood_pressure_sys': optional_number(entry, 'systolic'),
+        'blood_pressure_dia': optional_number(entry, 'diastolic'),
+        'heart_rate': optional_number(entry, 'heart_rate'),
+        'sleep_hours': optional_number(entry, 'sleep_hours')
+    }
+    if all(value is None for value in values.values()):
+        raise ValueError('metrics entry has no values')
+    deltas = {'sleep_h': values['sleep_hours']} if values['sleep_hours'] else {}
+    return HealthMetric, values, deltas
+
+BATCH_ENTRY_BUILDERS = {
+    'water': build_water_row,
+    'meal': build_meal_row,
+    'exercise': build_exercise_row,
+    'metrics': build_metrics_row
+}
+
+def stored_batch_response(user_id, idempotency_key):
+    batch = db.session.get(IngestBatch, (user_id, idempotency_key))
+    return json.loads(batch.response) if batch else None
+
+@app.route('/log_batch', methods=['POST'])
+@login_required
+def log_batch():
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not isinstance(data.get('entries'), list):
+        return jsonify({'success': False, 'message': 'Expected a JSON object with an entries list'}), 400
+
+    entries = data['entries']
+    if len(entries) > MAX_BATCH_ENTRIES:
+        return jsonify({'success': False, 'message': f'At most {MAX_BATCH_ENTRIES} entries per batch'}), 400
+
+    idempotency_key = request.headers.get('Idempotency-Key') or data.get('idempotency_key')
+    if idempotency_key is not None and (not isinstance(idempotency_key, str) or not 0 < len(idempotency_key) <= 128):
+        return jsonify({'success': False, 'message': 'Invalid idempotency key'}), 400
+
+    try:
+        if idempotency_key:
+            previous = stored_batch_response(current_user.id, idempotency_key)
+            if previous is not None:
+                return jsonify({**previous, 'replayed': True})
+
+        # Validate everything up front, grouping valid rows per table for bulk inserts
+        results = []
+        rows_by_model = {}
+        rollup_deltas = {}
+        for index, entry in enumerate(entries):
+            try:
+                if not isinstance(entry, dict) or entry.get('type') not in BATCH_ENTRY_BUILDERS:
+                    raise ValueError(f'type must be one of {", ".join(BATCH_ENTRY_BUILDERS)}')
+                entry_date = parse_entry_date(entry.get('date'))
+                model, values, deltas = BATCH_ENTRY_BUILDERS[entry['type']](entry)
+            except ValueError as e:
+                results.append({'index': index, 'status': 'error', 'message': str(e)})
+                continue
+            
+            rows_by_model.setdefault(model, []).append({'user_id': current_user.id, 'date': entry_date, **values})
+            day_deltas = rollup_deltas.setdefault(entry_date.date(), {})
+            for column, delta in deltas.items():
+                day_deltas[column] = day_deltas.get(column, 0) + delta
+            results.append({'index': index, 'status': 'ok'})
+
+        inserted = sum(len(rows) for rows in rows_by_model.values())
+        response = {
+            'success': True,
+            'inserted': inserted,
+            'failed': len(entries) - inserted,
+            'results': results
+        }
+
+        # One transaction: an executemany per table, one rollup upsert per day touched
+        for model, rows in rows_by_model.items():
+            db.session.execute(db.insert(model), rows)
+        for day, deltas in rollup_deltas.items():
+            if deltas:
+                add_to_daily_rollup(current_user.id, day, **deltas)
+        if idempotency_key:
+            db.session.add(IngestBatch(
+                user_id=current_user.id,
+                idempotency_key=idempotency_key,
+                response=json.dumps(response)
+            ))
+        db.session.commit()
         
-        # Get user's goals
-        user = User.query.first()  # Get first user since we removed user_id
+        return jsonify(response)
+
+    except IntegrityError:
+        # A concurrent retry with the same key committed first; return its result
+        db.session.rollback()
+        previous = stored_batch_response(current_user.id, idempotency_key) if idempotency_key else None
+        if previous is not None:
+            return jsonify({**previous, 'replayed': True})
+        return jsonify({'success': False, 'message': 'Batch conflicted with existing data'}), 409
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 500
+
+@app.route('/summary')
+@login_required
+@read_only
+def get_health_summary():
+    try:
+        # Today's totals are a single primary-key lookup on the rollup table
+        totals = rollup_totals(db.session.get(DailyRollup, (current_user.id, date.today())))
         
         return jsonify({
             'status': 'success',
-            'weight': health_metrics.weight if health_metrics else None,
-            'blood_pressure': f"{health_metrics.blood_pressure_sys}/{health_metrics.blood_pressure_dia}" if health_metrics else None,
-            'heart_rate': health_metrics.heart_rate if health_metrics else None,
-            'water_intake': water_intake.amount if water_intake else 0,
-            'exercise_duration': total_exercise_duration,
-            'calories_consumed': total_calories,
-            'sleep_duration': sleep.duration if sleep else 0,
-            'daily_water_goal': user.daily_water_goal,
-            'daily_exercise_goal': user.daily_exercise_goal,
-            'daily_calorie_goal': user.daily_calorie_goal,
-            'daily_sleep_goal': user.daily_sleep_goal
+            'water_intake': totals['water'],
+            'exercise_duration': totals['exercise'],
+            'calories_consumed': totals['calories'],
+            'sleep_duration': totals['sleep'],
+            'daily_water_goal': DEFAULT_GOALS['water'],
+            'daily_exercise_goal': DEFAULT_GOALS['exercise'],
+            'daily_calorie_goal': DEFAULT_GOALS['calories'],
+            'daily_sleep_goal': DEFAULT_GOALS['sleep']
         })
     except Exception as e:
         return jsonify({
@@ -700,3 +1330,124 @@ def find_hospitals():
         return jsonify({
             'error': str(e)
         }), 500
+
+CACHES = {'chat_response': chat_response_cache, 'user': user_cache}
+
+def cache_samples(field):
+    return lambda: {(('cache', name),): cache.stats()[field] for name, cache in CACHES.items()}
+
+def chat_history_samples():
+    stats = chat_history_buffer.stats()
+    return {(('outcome', outcome),): stats[outcome] for outcome in ('written', 'dropped', 'failed')}
+
+# Stats the components already keep, read at scrape time
+metrics.registry.register_collector(
+    'healthcare_cache_entries', 'Entries in each in-process cache', cache_samples('size'))
+metrics.registry.register_collector(
+    'healthcare_cache_hits_total', 'Cache lookups served from the cache', cache_samples('hits'), kind='counter')
+metrics.registry.register_collector(
+    'healthcare_cache_misses_total', 'Cache lookups that missed', cache_samples('misses'), kind='counter')
+metrics.registry.register_collector(
+    'healthcare_cache_invalidations_total', 'Entries invalidated before expiry', cache_samples('invalidations'), kind='counter')
+metrics.registry.register_collector(
+    'healthcare_chat_history_queue_depth', 'Chat turns waiting to be written',
+    lambda: {(): chat_history_buffer.stats()['queue_depth']})
+metrics.registry.register_collector(
+    'healthcare_chat_history_rows_total', 'Chat turns by write-behind outcome', chat_history_samples, kind='counter')
+metrics.registry.register_collector(
+    'healthcare_password_hash_rejected_total', 'Logins and registrations rejected with the hashing pool full',
+    lambda: {(): password_hasher.rejected}, kind='counter')
+metrics.registry.register_collector(
+    'healthcare_replica_requests_total', 'Read-only requests run on the read replica',
+    lambda: {(): replica_router.replica_requests}, kind='counter')
+metrics.registry.register_collector(
+    'healthcare_replica_fallbacks_total', 'Read-only requests moved to the primary after a replica failure',
+    lambda: {(): replica_router.fallbacks}, kind='counter')
+
+@app.route('/metrics')
+def metrics_endpoint():
+    if not app.config['METRICS_ENABLED']:
+        abort(404)
+    return Response(metrics.registry.render(), mimetype='text/plain; version=0.0.4')
+
+if app.config['PROFILER_ENABLED']:
+    profiler = SamplingProfiler(
+        app.config['PROFILER_DIR'],
+        interval=app.config['PROFILER_INTERVAL'],
+        max_bytes=app.config['PROFILER_MAX_BYTES'],
+        backup_count=app.config['PROFILER_BACKUP_COUNT']
+    )
+    
+    def should_profile():
+        token = app.config['PROFILER_TOKEN']
+        if token and hmac.compare_digest(request.headers.get('X-Profile-Token', ''), token):
+            return True
+        return profiler.window_active() or random.random() < app.config['PROFILER_SAMPLE_RATE']
+    
+    @app.before_request
+    def start_profiling():
+        if should_profile():
+            route = request.url_rule.rule if request.url_rule else 'unmatched'
+            g.profile = ExitStack()
+            g.profile.enter_context(profiler.track(f'{request.method} {route}'))
+    
+    @app.teardown_request
+    def stop_profiling(exc):
+        profile = g.pop('profile', None)
+        if profile is not None:
+            profile.close()
+    
+    @app.route('/admin/profiler', methods=['GET', 'POST'])
+    @login_required
+    def profiler_control():
+        if current_user.username not in app.config['ADMIN_USERNAMES']:
+            abort(403)
+        if request.method == 'POST':
+            data = request.get_json(silent=True) or {}
+            if data.get('action') == 'start':
+                seconds = data.get('seconds', 60)
+                if not isinstance(seconds, (int, float)) or not 0 < seconds <= app.config['PROFILER_MAX_WINDOW']:
+                    return jsonify({
+                        'status': 'error',
+                        'message': f"seconds must be between 0 and {app.config['PROFILER_MAX_WINDOW']:g}"
+                    }), 400
+                profiler.start_window(seconds)
+            elif data.get('action') == 'stop':
+                profiler.stop_window()
+            else:
+                return jsonify({'status': 'error', 'message': "action must be 'start' or 'stop'"}), 400
+        return jsonify({'status': 'success', **profiler.stats()})
+
+def preload():
+    """Load everything the workers share, then freeze it for copy-on-write forking.
+
+    Call in the master of a preforking server after importing this module and
+    before the workers fork (gunicorn.conf.py does). The knowledge base and the
+    compiled symptom and routing indexes are built at import; this adds the
+    intent model and its NLTK data. ``gc.freeze()`` then moves every object
+    allocated so far into the collector's permanent generation, so garbage
+    collections in the workers don't write to (and so copy) the shared pages.
+    A model without intents raises RuntimeError before anything is frozen.
+    """
+    import model
+    model.preload()
+    gc.collect()
+    gc.freeze()
+
+if app.config['PRELOAD_MODEL']:
+    # Preload at import, e.g. for servers that fork after importing the app
+    preload()
+
+if __name__ == '__main__':
+    import argparse
+    
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--preload', action='store_true', help='load and warm the intent model before serving')
+    args = parser.parse_args()
+    
+    if args.preload and not app.config['PRELOAD_MODEL']:
+        preload()
+    
+    with app.app_context():
+        db.create_all(bind_key=None)  # Tables live on the primary; a replica gets them by replication
+    app.run(debug=True)
@@ -0,0 +1,90 @@
+"""Per-message latency of the compiled chat router against the original keyword cascade.
+
+Usage: python benchmarks/bench_chat_router.py [--messages 3000] [--repeat 5] [--seed 0]
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import app
+from app import BASIC_RESPONSES, HEALTH_KEYWORDS, HEALTH_RESPONSES
+from test_chat_router import generate_messages
+
+
+def legacy_route_chat_message(message):
+    """The pre-router cascade, kept as the reference (one rescan of the message per pass)."""
+    for key in HEALTH_RESPONSES:
+        if message.count(key) == 1 and len(message.split()) <= 4:
+            return app.health_advice(key)
+
+    symptom_response = app.check_symptoms(message)
+    if symptom_response:
+        return symptom_response
+
+    for key in BASIC_RESPONSES:
+        if key in message:
+            return BASIC_RESPONSES[key]
+
+    for key in HEALTH_RESPONSES:
+        if key in message:
+            return app.health_advice(key)
+
+    if 'headache' in message and ('3 days' in message or 'persistent' in message):
+        return app.PERSISTENT_HEADACHE_RESPONSE
+
+    if any(keyword in message for keyword in HEALTH_KEYWORDS):
+        return app.HEALTH_CONCERN_RESPONSE
+
+    return app.DEFAULT_CHAT_RESPONSE
+
+
+def latencies(func, messages, repeat):
+    samples = []
+    results = []
+    for _ in range(repeat):
+        results = []
+        for message in messages:
+            start = time.perf_counter()
+            results.append(func(message))
+            samples.append(time.perf_counter() - start)
+    samples.sort()
+    return samples, results
+
+
+def percentile(samples, pct):
+    return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+
+
+def report(name, samples):
+    mean = sum(samples) / len(samples)
+    print(f"{name:<16}{mean * 1e6:8.1f} us/msg  p50 {percentile(samples, 50) * 1e6:7.1f} us"
+          f"  p99 {percentile(samples, 99) * 1e6:7.1f} us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--messages', type=int, default=3000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    messages = generate_messages(args.messages, args.seed)
+    legacy_samples, legacy_results = latencies(legacy_route_chat_message, messages, args.repeat)
+    router_samples, router_results = latencies(app.route_chat_message, messages, args.repeat)
+
+    mismatches = sum(1 for a, b in zip(legacy_results, router_results) if a != b)
+    print(f"messages:       {len(messages)} x {args.repeat}")
+    report('legacy cascade:', legacy_samples)
+    report('intent router:', router_samples)
+    print(f"speedup:        {sum(legacy_samples) / sum(router_samples):.2f}x")
+    print(f"mismatches:     {mismatches}")
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
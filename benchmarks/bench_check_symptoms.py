@@ -0,0 +1,111 @@
+"""Compare the compiled SymptomIndex against the original check_symptoms scan.
+
+Usage: python benchmarks/bench_check_symptoms.py [--messages 10000] [--seed 0]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import app
+from app import check_symptom_duration, format_response_list, get_severity_level, training_data
+
+FILLER = ['i', 'have', 'had', 'a', 'bad', 'really', 'since', 'yesterday', 'and', 'my',
+          'with', 'some', 'feel', 'been', 'having', 'today', 'also', 'lots', 'of', 'the']
+DURATIONS = ['for 2 days', 'for 3 weeks', 'for 20 days', 'for 2 months', '']
+
+
+def legacy_check_symptoms(message):
+    """The pre-index implementation, kept verbatim as the reference."""
+    user_symptoms = set()
+    for item in training_data:
+        if 'symptoms' in item:
+            for symptom in item['symptoms']:
+                if symptom.lower() in message.lower():
+                    user_symptoms.add(symptom)
+
+    if user_symptoms:
+        possible_matches = []
+        for item in training_data:
+            if 'symptoms' not in item:
+                continue
+
+            matching_symptoms = set(s.lower() for s in user_symptoms) & set(s.lower() for s in item['symptoms'])
+            if matching_symptoms:
+                possible_matches.append({
+                    'disease': item['disease'],
+                    'treatment': item['treatment'],
+                    'advice': item['advice'],
+                    'match_count': len(matching_symptoms),
+                    'total_symptoms': len(item['symptoms'])
+                })
+
+        if possible_matches:
+            possible_matches.sort(key=lambda x: x['match_count'], reverse=True)
+            best_match = possible_matches[0]
+
+            severity_level, severity_color, severity_message = get_severity_level(user_symptoms)
+            has_long_duration, duration_message = check_symptom_duration(message)
+
+            response = [
+                f"<div class='diagnosis-header'>Based on your symptoms ({', '.join(sorted(user_symptoms))}), you may have:</div>",
+                f"<div class='disease-name' style='border-left: 4px solid {severity_color}'>{best_match['disease']}</div>",
+                f"<div class='severity-message' style='color: {severity_color}'>{severity_message}</div>",
+                "<div class='section-header'>Recommended treatments:</div>",
+                f"<ul class='treatment-list'>{format_response_list(best_match['treatment'])}</ul>",
+                "<div class='section-header'>Advice:</div>",
+                f"<div class='advice-text'>{best_match['advice']}</div>"
+            ]
+
+            if has_long_duration:
+                response.insert(3, f"<div class='duration-warning'>{duration_message}</div>")
+
+            return '\n'.join(response)
+    return None
+
+
+def synthetic_messages(count, seed):
+    rng = random.Random(seed)
+    symptoms = sorted({s for item in training_data for s in item.get('symptoms', [])})
+    messages = []
+    for _ in range(count):
+        words = rng.choices(FILLER, k=rng.randint(2, 12))
+        for symptom in rng.sample(symptoms, rng.randint(0, 4)):
+            words.insert(rng.randint(0, len(words)), symptom)
+        words.append(rng.choice(DURATIONS))
+        messages.append(' '.join(words).strip().lower())
+    return messages
+
+
+def timed(func, messages):
+    start = time.perf_counter()
+    results = [func(message) for message in messages]
+    return time.perf_counter() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--messages', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    messages = synthetic_messages(args.messages, args.seed)
+    legacy_time, legacy_results = timed(legacy_check_symptoms, messages)
+    index_time, index_results = timed(app.check_symptoms, messages)
+
+    mismatches = sum(1 for a, b in zip(legacy_results, index_results) if a != b)
+    print(f"messages:       {len(messages)}")
+    print(f"legacy scan:    {legacy_time * 1000:.1f} ms ({legacy_time / len(messages) * 1e6:.1f} us/msg)")
+    print(f"symptom index:  {index_time * 1000:.1f} ms ({index_time / len(messages) * 1e6:.1f} us/msg)")
+    print(f"speedup:        {legacy_time / index_time:.2f}x")
+    print(f"mismatches:     {mismatches}")
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,169 @@
+"""Side-by-side accuracy, latency and memory of the intent classifier engines.
+
+Trains each engine on a synthetic intent corpus built from training_data.json
+(one intent per disease, patterns phrased from its symptoms), then loads the
+saved model in a fresh process to measure per-message latency and RSS, so the
+numbers reflect what a serving worker would pay.
+
+Usage: python benchmarks/bench_classifiers.py [--engines lstm,linear] [--epochs 30] [--predictions 500]
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+TEMPLATES = [
+    'i have {}',
+    'i have been having {}',
+    'my symptoms are {}',
+    'suffering from {} since yesterday',
+    'what could cause {}',
+    '{} for a few days now',
+    'i feel awful, {}',
+    'help, {}',
+]
+
+
+def join_symptoms(symptoms):
+    return symptoms[0] if len(symptoms) == 1 else ', '.join(symptoms[:-1]) + ' and ' + symptoms[-1]
+
+
+def synthetic_corpus(patterns_per_intent=24, seed=0):
+    """Return ``(intents, test_examples)``: training intents plus held-out ``(text, tag)`` pairs."""
+    with open('training_data.json') as f:
+        catalogue = [item for item in json.load(f)['training_data'] if 'symptoms' in item]
+
+    rng = random.Random(seed)
+    intents = {}
+    test = []
+    for item in catalogue:
+        tag = item['disease']
+        intent = intents.setdefault(tag, {'tag': tag, 'patterns': [], 'responses': [item['advice']]})
+        symptoms = [s.lower() for s in item['symptoms']]
+        for i in range(patterns_per_intent):
+            chosen = rng.sample(symptoms, rng.randint(1, min(3, len(symptoms))))
+            text = rng.choice(TEMPLATES).format(join_symptoms(chosen))
+            # Every fourth phrasing is held out for scoring
+            if i % 4 == 3:
+                test.append((text, tag))
+            else:
+                intent['patterns'].append(text)
+    return {'intents': list(intents.values())}, test
+
+
+def rss_mb():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def percentile(samples, pct):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+
+
+def train(engine, workdir, epochs):
+    from model import HealthcareBot
+
+    intents, _ = synthetic_corpus()
+    corpus_path = os.path.join(workdir, 'intents.json')
+    with open(corpus_path, 'w') as f:
+        json.dump(intents, f)
+
+    bot = HealthcareBot(engine=engine)
+    start = time.perf_counter()
+    X, y = bot.load_training_data(corpus_path)
+    bot.build_model(bot.vocab_size(), len(bot.intent_names))
+    bot.train(X, y, epochs=epochs, batch_size=32)
+    elapsed = time.perf_counter() - start
+    bot.save_model(os.path.join(workdir, f'{engine}.model'), os.path.join(workdir, f'{engine}.tokenizer'))
+    return {'train_s': elapsed}
+
+
+def serve(engine, workdir, predictions):
+    baseline = rss_mb()
+    from model import HealthcareBot
+
+    bot = HealthcareBot(engine=engine)
+    bot.load_model(os.path.join(workdir, f'{engine}.model'), os.path.join(workdir, f'{engine}.tokenizer'))
+    bot.engine.warm_up()
+
+    _, test = synthetic_corpus()
+    processed = [bot.preprocess_text(text) for text, _ in test]
+    predicted = bot.engine.predict_proba(processed).argmax(axis=1)
+    correct = sum(bot.intent_names[index] == tag for index, (_, tag) in zip(predicted, test))
+
+    # Latency of one message at a time, preprocessing excluded (it is shared by every engine)
+    samples = []
+    for i in range(predictions):
+        text = processed[i % len(processed)]
+        start = time.perf_counter()
+        bot.engine.predict_proba([text])
+        samples.append(time.perf_counter() - start)
+
+    return {
+        'accuracy': correct / len(test),
+        'p50_us': percentile(samples, 50) * 1e6,
+        'p99_us': percentile(samples, 99) * 1e6,
+        'rss_mb': rss_mb(),
+        'model_rss_mb': rss_mb() - baseline
+    }
+
+
+def run_child(*args):
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), *args],
+        capture_output=True, text=True, env={**os.environ, 'TF_CPP_MIN_LOG_LEVEL': '3'}
+    )
+    if result.returncode != 0:
+        return None, (result.stderr.strip().splitlines() or ['no output'])[-1]
+    return json.loads(result.stdout.strip().splitlines()[-1]), None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--engines', default='lstm,linear')
+    parser.add_argument('--epochs', type=int, default=30)
+    parser.add_argument('--predictions', type=int, default=500)
+    parser.add_argument('--child', nargs=3, metavar=('STEP', 'ENGINE', 'WORKDIR'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        step, engine, workdir = args.child
+        if step == 'train':
+            result = train(engine, workdir, args.epochs)
+        else:
+            result = serve(engine, workdir, args.predictions)
+        print(json.dumps(result))
+        return 0
+
+    print(f"{'engine':8} {'train s':>8} {'accuracy':>9} {'p50 us':>9} {'p99 us':>9} {'RSS MB':>8} {'model MB':>9}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for engine in args.engines.split(','):
+            trained, error = run_child('--epochs', str(args.epochs), '--child', 'train', engine, workdir)
+            if not error:
+                served, error = run_child('--predictions', str(args.predictions), '--child', 'serve', engine, workdir)
+            if error:
+                print(f'{engine:8} failed: {error}')
+                continue
+            print(f"{engine:8} {trained['train_s']:8.1f} {served['accuracy']:9.3f} {served['p50_us']:9.1f} "
+                  f"{served['p99_us']:9.1f} {served['rss_mb']:8.1f} {served['model_rss_mb']:9.1f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
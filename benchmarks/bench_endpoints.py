@@ -0,0 +1,339 @@
+"""Throughput and latency percentiles of the main endpoints under a mixed load.
+
+``run`` seeds a database with --users users and --days days of meals, water
+and exercise (plus their daily rollups), then drives a fixed mix of /chat,
+/log_water, /get_daily_progress, /book_appointment and /login traffic from
+--concurrency closed-loop clients (threads driving the Flask test client,
+each logged in as its own user) for --duration seconds. Requests per second
+and p50/p95/p99 latency per route are printed and written to --output as
+JSON. The seed, mix and data are fixed, so runs are comparable across commits.
+Uses a fresh local SQLite file unless --database-url points elsewhere (e.g. a
+scratch PostgreSQL database; its tables are dropped and reseeded).
+
+``compare`` reads two result files and flags every route whose throughput
+fell, or whose latency rose, by more than --threshold percent; it exits with
+status 1 if any did.
+
+Usage:
+    python benchmarks/bench_endpoints.py run [--concurrency 8] [--duration 30] [--output results.json]
+    python benchmarks/bench_endpoints.py compare baseline.json results.json [--threshold 10]
+"""
+import argparse
+from datetime import date, datetime, timedelta
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+INVOKED_FROM = os.getcwd()  # Result paths are relative to where the script was run
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+PASSWORD = 'bench password'
+CHUNK = 50000
+
+# Relative weight of each route in the traffic mix
+MIX = {
+    '/chat': 40,
+    '/get_daily_progress': 25,
+    '/log_water': 20,
+    '/book_appointment': 10,
+    '/login': 5,
+}
+
+CHAT_MESSAGES = [
+    'hello',
+    'hi there',
+    'I have a headache and a fever',
+    'I have had a cough and a sore throat for 3 days',
+    'I feel dizzy and nauseous',
+    'what should I eat to lose weight',
+    'how much water should I drink',
+    'tips for better sleep',
+    'I am feeling stressed and anxious',
+    'my stomach hurts after eating',
+    'thank you',
+    'bye',
+]
+
+APPOINTMENT_TYPES = ['General Checkup', 'Follow-up', 'Specialist Consultation', 'Vaccination']
+
+LATENCY_METRICS = ('p50_ms', 'p95_ms', 'p99_ms')
+
+
+def percentile(samples, pct):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def seed(app_module, users, days, rng):
+    """Users sharing one password, each with ``days`` days of tracking data ending yesterday."""
+    db = app_module.db
+    first_day = date.today() - timedelta(days=days)
+
+    db.drop_all(bind_key=None)
+    db.create_all(bind_key=None)
+    # One hash for everyone so seeding doesn't take users x PBKDF2
+    pwhash = app_module.password_hasher.hash(PASSWORD)
+    db.session.execute(db.insert(app_module.User), [
+        {'id': i, 'username': f'bench_user_{i}', 'email': f'bench_user_{i}@example.com', 'password_hash': pwhash}
+        for i in range(1, users + 1)
+    ])
+
+    def entries(per_day, column, value):
+        for user_id in range(1, users + 1):
+            for day in range(days):
+                midnight = datetime.combine(first_day + timedelta(days=day), datetime.min.time())
+                for _ in range(rng.randint(*per_day)):
+                    yield {
+                        'user_id': user_id,
+                        'date': midnight + timedelta(minutes=rng.randrange(7 * 60, 23 * 60)),
+                        column: value()
+                    }
+
+    tables = [
+        (app_module.Meal, entries((2, 4), 'calories', lambda: rng.randint(150, 900))),
+        (app_module.WaterIntake, entries((3, 8), 'amount', lambda: 250 * rng.randint(1, 2))),
+        (app_module.Exercise, entries((0, 1), 'duration', lambda: rng.randint(10, 90))),
+    ]
+    for model, rows in tables:
+        count = 0
+        while True:
+            chunk = [row for _, row in zip(range(CHUNK), rows)]
+            if not chunk:
+                break
+            db.session.execute(db.insert(model), chunk)
+            count += len(chunk)
+        db.session.commit()
+        print(f'seeded {count} {model.__tablename__} rows')
+
+    result = app_module.app.test_cli_runner().invoke(args=['rebuild-rollups'])
+    print(result.output.strip())
+
+
+class Worker(threading.Thread):
+    def __init__(self, app, index, args, results, lock):
+        super().__init__(name=f'load-{index}')
+        self.app = app
+        self.user_id = index % args.users + 1
+        self.args = args
+        self.rng = random.Random(args.seed * 1000 + index)
+        self.results = results
+        self.lock = lock
+        self.routes = list(MIX)
+        self.weights = [MIX[route] for route in self.routes]
+        self.client = app.test_client()
+        self.deadline = None
+        self.record_after = None
+
+    def login(self, client, user_id):
+        return client.post('/login', data={'username': f'bench_user_{user_id}', 'password': PASSWORD})
+
+    def request(self, route):
+        rng = self.rng
+        if route == '/chat':
+            return self.client.post('/chat', json={'message': rng.choice(CHAT_MESSAGES)})
+        if route == '/get_daily_progress':
+            day = date.today() - timedelta(days=rng.randint(0, self.args.days))
+            return self.client.get('/get_daily_progress', query_string={'date': day.isoformat()})
+        if route == '/log_water':
+            return self.client.post('/log_water', json={'amount': rng.randint(1, 2)})
+        if route == '/book_appointment':
+            day = date.today() + timedelta(days=rng.randint(1, 60))
+            return self.client.post('/book_appointment', json={
+                'appointmentType': rng.choice(APPOINTMENT_TYPES),
+                'appointmentDate': day.isoformat(),
+                'appointmentTime': f'{rng.randint(8, 17):02d}:{rng.choice(["00", "30"])}',
+                'appointmentNotes': ''
+            })
+        # A fresh session, like a user arriving at the login page
+        return self.login(self.app.test_client(), rng.randint(1, self.args.users))
+
+    def run(self):
+        while time.perf_counter() < self.deadline:
+            route = self.rng.choices(self.routes, self.weights)[0]
+            start = time.perf_counter()
+            response = self.request(route)
+            end = time.perf_counter()
+            failed = response.status_code >= 400
+            if route == '/login' and not failed:
+                failed = response.json.get('status') != 'success'
+            if start < self.record_after:
+                continue  # Warm-up
+            with self.lock:
+                latencies, errors = self.results[route]
+                if failed:
+                    errors.append(response.status_code)
+                else:
+                    latencies.append(end - start)
+
+
+def summarize(latencies, errors, elapsed):
+    summary = {
+        'requests': len(latencies) + len(errors),
+        'errors': len(errors),
+        'rps': round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+    }
+    if latencies:
+        summary['mean_ms'] = round(sum(latencies) / len(latencies) * 1000, 2)
+        for metric, pct in zip(LATENCY_METRICS, (50, 95, 99)):
+            summary[metric] = round(percentile(latencies, pct) * 1000, 2)
+    return summary
+
+
+def run(args):
+    if args.database_url is None:
+        args.database_url = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+    os.environ['DATABASE_URL'] = args.database_url
+    if args.iterations:
+        os.environ['PASSWORD_HASH_ITERATIONS'] = str(args.iterations)
+
+    import app as app_module
+    app = app_module.app
+    app.config['WTF_CSRF_ENABLED'] = False
+    app.logger.setLevel(logging.ERROR)  # Every login is a "slow request" at the production work factor
+
+    with app.app_context():
+        seed(app_module, args.users, args.days, random.Random(args.seed))
+
+    results = {route: ([], []) for route in MIX}
+    lock = threading.Lock()
+    workers = [Worker(app, i, args, results, lock) for i in range(args.concurrency)]
+    for worker in workers:
+        response = worker.login(worker.client, worker.user_id)
+        if response.json.get('status') != 'success':
+            raise SystemExit(f'Could not log in bench_user_{worker.user_id}: {response.json}')
+    # One request per route first, so lazy loading (the intent model) is not measured
+    for route in MIX:
+        workers[0].request(route)
+
+    started = time.perf_counter()
+    for worker in workers:
+        worker.record_after = started + args.warmup
+        worker.deadline = started + args.warmup + args.duration
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    # Requests still in flight at the deadline finish late, so rates use the real wall time
+    elapsed = time.perf_counter() - started - args.warmup
+
+    with app.app_context():
+        dialect = app_module.db.engine.dialect.name
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'database': dialect,
+            'concurrency': args.concurrency,
+            'duration': args.duration,
+            'users': args.users,
+            'days': args.days,
+            'seed': args.seed,
+            'password_hash_iterations': app_module.password_hasher.iterations,
+            'mix': MIX,
+        },
+        'routes': {route: summarize(latencies, errors, elapsed) for route, (latencies, errors) in results.items()},
+        'total': summarize(
+            [latency for latencies, _ in results.values() for latency in latencies],
+            [error for _, errors in results.values() for error in errors],
+            elapsed
+        ),
+    }
+
+    print(f"{'route':<20} {'requests':>9} {'errors':>7} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for route, summary in list(report['routes'].items()) + [('total', report['total'])]:
+        latency = ''.join(f'{summary.get(metric, float("nan")):9.1f}' for metric in LATENCY_METRICS)
+        print(f"{route:<20} {summary['requests']:9} {summary['errors']:7} {summary['rps']:8.1f}{latency}")
+
+    output = os.path.join(INVOKED_FROM, args.output)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'Wrote {output}')
+    return 0
+
+
+def compare(args):
+    with open(os.path.join(INVOKED_FROM, args.baseline)) as f:
+        baseline = json.load(f)
+    with open(os.path.join(INVOKED_FROM, args.current)) as f:
+        current = json.load(f)
+
+    for key in ('concurrency', 'duration', 'database', 'cpus', 'password_hash_iterations'):
+        if baseline['meta'].get(key) != current['meta'].get(key):
+            print(f"warning: {key} differs ({baseline['meta'].get(key)} vs {current['meta'].get(key)})")
+
+    limit = args.threshold / 100
+    regressions = 0
+    print(f"{'route':<20} {'metric':<7} {'baseline':>10} {'current':>10} {'change':>8}")
+    routes = [(route, baseline['routes'][route], current['routes'].get(route, {})) for route in baseline['routes']]
+    for route, before, after in routes + [('total', baseline['total'], current['total'])]:
+        for metric in ('rps',) + LATENCY_METRICS:
+            if metric not in before or metric not in after or not before[metric]:
+                continue
+            change = after[metric] / before[metric] - 1
+            if metric == 'rps':
+                regressed = change < -limit
+            else:
+                # Sub-millisecond shifts are noise, whatever the ratio
+                regressed = change > limit and after[metric] - before[metric] >= args.min_ms
+            regressions += regressed
+            flag = '  REGRESSION' if regressed else ''
+            print(f'{route:<20} {metric:<7} {before[metric]:10.2f} {after[metric]:10.2f} {change:+8.1%}{flag}')
+        if after.get('errors', 0) > before.get('errors', 0):
+            print(f"{route:<20} errors  {before.get('errors', 0):10} {after['errors']:10}")
+
+    if regressions:
+        print(f'{regressions} regression(s) beyond {args.threshold:g}%')
+        return 1
+    print(f'No regressions beyond {args.threshold:g}%')
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='seed a database and measure the endpoint mix')
+    run_parser.add_argument('--database-url', default=None, help='default: a fresh SQLite file')
+    run_parser.add_argument('--concurrency', type=int, default=8)
+    run_parser.add_argument('--duration', type=float, default=30, help='measured seconds')
+    run_parser.add_argument('--warmup', type=float, default=3, help='unmeasured seconds before that')
+    run_parser.add_argument('--users', type=int, default=100)
+    run_parser.add_argument('--days', type=int, default=90, help='days of tracking data per user')
+    run_parser.add_argument('--iterations', type=int, default=None, help='PBKDF2 work factor (default: config)')
+    run_parser.add_argument('--seed', type=int, default=0)
+    run_parser.add_argument('--output', default='bench_endpoints.json')
+    run_parser.set_defaults(func=run)
+
+    compare_parser = commands.add_parser('compare', help='flag regressions between two result files')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=10, help='percent')
+    compare_parser.add_argument('--min-ms', type=float, default=1.0, help='smallest latency increase flagged')
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
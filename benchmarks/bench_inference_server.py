@@ -0,0 +1,155 @@
+"""Memory and throughput of N web workers with their own model vs one shared inference daemon.
+
+For each worker count, starts N worker processes that classify synthetic
+symptom messages one at a time for a fixed duration, either with a model
+loaded in every worker ('local') or through InferenceClient against a single
+inference_server.py process ('daemon'). Reports total RSS and PSS (shared pages
+split between processes) over all processes, daemon included, and the
+combined predictions per second.
+Needs the trained model and the NLTK data (`python model.py --download-nltk`).
+
+Usage: python benchmarks/bench_inference_server.py [--workers 1,4,16] [--modes local,daemon] [--duration 10]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from bench_classifiers import synthetic_corpus
+
+
+def memory_mb(pid='self'):
+    """``(rss, pss)`` of a process in MB; PSS falls back to RSS without smaps_rollup."""
+    values = {}
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as f:
+            for line in f:
+                fields = line.split()
+                if fields[0] in ('Rss:', 'Pss:'):
+                    values[fields[0]] = int(fields[1]) / 1024
+    except OSError:
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        return rss, rss
+    return values['Rss:'], values['Pss:']
+
+
+def worker(mode, socket_path, duration):
+    if mode == 'daemon':
+        from inference_server import InferenceClient
+        predictor = InferenceClient(socket_path, timeout=30)
+    else:
+        import model
+        predictor = model.preload()
+
+    messages = [text for text, _ in synthetic_corpus()[1]]
+    predictor.predict(messages[0])
+    print('ready', flush=True)
+    sys.stdin.readline()  # Start together with the other workers
+
+    predictions = 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        predictor.predict(messages[predictions % len(messages)])
+        predictions += 1
+    rss, pss = memory_mb()
+    return {'predictions': predictions, 'rss_mb': rss, 'pss_mb': pss}
+
+
+def wait_for_socket(daemon, socket_path, timeout=120):
+    from inference_server import InferenceClient
+
+    client = InferenceClient(socket_path, timeout=1)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if daemon.poll() is not None:
+            raise RuntimeError(f'Inference server exited: {daemon.stderr.read().strip()[-500:]}')
+        if client.ping():
+            client.close()
+            return
+        time.sleep(0.2)
+    raise RuntimeError('Inference server did not start')
+
+
+def run(mode, workers, duration, socket_path):
+    env = {**os.environ, 'TF_CPP_MIN_LOG_LEVEL': '3'}
+    daemon = None
+    if mode == 'daemon':
+        daemon = subprocess.Popen([sys.executable, 'inference_server.py', '--socket', socket_path],
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, env=env)
+        wait_for_socket(daemon, socket_path)
+
+    try:
+        children = [
+            subprocess.Popen([sys.executable, os.path.abspath(__file__), '--duration', str(duration),
+                              '--child', mode, socket_path],
+                             stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, env=env)
+            for _ in range(workers)
+        ]
+        for child in children:
+            if child.stdout.readline().strip() != 'ready':
+                raise RuntimeError(f'Worker failed: {child.stderr.read().strip()[-500:]}')
+        for child in children:
+            child.stdin.write('go\n')
+            child.stdin.flush()
+
+        # Sample the daemon while the workers are still running
+        daemon_memory = (0.0, 0.0)
+        if daemon is not None:
+            time.sleep(duration / 2)
+            daemon_memory = memory_mb(daemon.pid)
+
+        results = []
+        for child in children:
+            stdout, stderr = child.communicate()
+            if child.returncode != 0:
+                raise RuntimeError(f'Worker failed: {stderr.strip()[-500:]}')
+            results.append(json.loads(stdout.strip().splitlines()[-1]))
+    finally:
+        if daemon is not None:
+            daemon.terminate()
+            daemon.wait()
+
+    return {
+        'rss_mb': sum(result['rss_mb'] for result in results) + daemon_memory[0],
+        'pss_mb': sum(result['pss_mb'] for result in results) + daemon_memory[1],
+        'predictions_per_s': sum(result['predictions'] for result in results) / duration
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', default='1,4,16')
+    parser.add_argument('--modes', default='local,daemon')
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--child', nargs=2, metavar=('MODE', 'SOCKET'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(worker(*args.child, args.duration)))
+        return 0
+
+    print(f"{'workers':>7} {'mode':7} {'total RSS MB':>13} {'total PSS MB':>13} {'predictions/s':>14}")
+    with tempfile.TemporaryDirectory() as workdir:
+        socket_path = os.path.join(workdir, 'inference.sock')
+        for workers in [int(count) for count in args.workers.split(',')]:
+            for mode in args.modes.split(','):
+                try:
+                    result = run(mode, workers, args.duration, socket_path)
+                except RuntimeError as e:
+                    print(f'{workers:7} {mode:7} failed: {e}')
+                    continue
+                print(f"{workers:7} {mode:7} {result['rss_mb']:13.1f} {result['pss_mb']:13.1f} "
+                      f"{result['predictions_per_s']:14.0f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
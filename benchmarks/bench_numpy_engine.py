@@ -0,0 +1,133 @@
+"""Keras vs NumPy runtime for the LSTM: load time, RSS and per-message latency.
+
+Also measures the int8 and float16 quantized NumPy weights (quantized here from
+healthcare_model.npz), with artifact size and top-1 agreement with float32.
+Each runtime is measured in a fresh process so imports and memory don't leak
+between them. Preprocessing is left out; every runtime shares it.
+Usage: python benchmarks/bench_numpy_engine.py [--predictions 500] [--batch-size 32]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+MESSAGES = [
+    'headache dizzy',
+    'hello',
+    'throat sore fever',
+    'back pain',
+    'thanks help',
+    'coughing three days',
+    'feeling tired time',
+    'chest pain shortness breath',
+]
+
+
+def rss_mb():
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024
+    return float('nan')
+
+
+def percentile(samples, pct):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+
+
+def measure(runtime, model_path, predictions, batch_size):
+    baseline = rss_mb()
+    start = time.perf_counter()
+    from model import LSTMEngine, TOKENIZER_PATH
+
+    if runtime in ('keras', 'numpy'):
+        engine = LSTMEngine(runtime=runtime, quantization='')
+    else:
+        engine = LSTMEngine(runtime='numpy', quantization=runtime)
+    engine.load(model_path, TOKENIZER_PATH)
+    engine.warm_up()
+    load_s = time.perf_counter() - start
+
+    samples = []
+    for i in range(predictions):
+        text = MESSAGES[i % len(MESSAGES)]
+        start = time.perf_counter()
+        engine.predict_proba([text])
+        samples.append(time.perf_counter() - start)
+
+    batch = [MESSAGES[i % len(MESSAGES)] for i in range(batch_size)]
+    rounds = max(1, predictions // batch_size)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        engine.predict_proba(batch)
+    batch_s = (time.perf_counter() - start) / rounds
+
+    return {
+        'load_s': load_s,
+        'p50_us': percentile(samples, 50) * 1e6,
+        'p99_us': percentile(samples, 99) * 1e6,
+        'batch_us_per_msg': batch_s / batch_size * 1e6,
+        'rss_mb': rss_mb(),
+        'added_rss_mb': rss_mb() - baseline,
+        'tensorflow_imported': 'tensorflow' in sys.modules
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--predictions', type=int, default=500)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--child', nargs=2, metavar=('RUNTIME', 'MODEL_PATH'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(*args.child, args.predictions, args.batch_size)))
+        return 0
+
+    import numpy as np
+    import numpy_engine
+    from model import MODEL_PATH, numpy_weights_path
+
+    with tempfile.TemporaryDirectory() as workdir:
+        reference, tokenizer = numpy_engine.load(numpy_weights_path(MODEL_PATH))
+        inputs = np.random.default_rng(0).integers(0, reference.layers[0]['weights'][0].shape[0], size=(1000, 20))
+        expected = reference(inputs)
+
+        quantized_path = os.path.join(workdir, os.path.basename(MODEL_PATH))
+        notes = {'keras': '', 'numpy': f'{os.path.getsize(numpy_weights_path(MODEL_PATH)) / 1024:7.0f} KB'}
+        for mode in numpy_engine.QUANTIZATION_MODES:
+            model = numpy_engine.quantize(reference, mode)
+            numpy_engine.save(model, tokenizer, numpy_weights_path(quantized_path, mode))
+            outputs = model(inputs)
+            agreement = np.mean(outputs.argmax(axis=1) == expected.argmax(axis=1))
+            notes[mode] = (f'{os.path.getsize(numpy_weights_path(quantized_path, mode)) / 1024:7.0f} KB  '
+                           f'top-1 agreement {agreement:.3f}  max |dp| {np.abs(outputs - expected).max():.4f}')
+
+        print(f"{'runtime':8} {'load s':>7} {'p50 us':>9} {'p99 us':>9} {f'batch{args.batch_size} us/msg':>16} "
+              f"{'RSS MB':>8} {'added MB':>9}  {'TF':5} artifact")
+        for runtime in ('keras', 'numpy') + numpy_engine.QUANTIZATION_MODES:
+            model_path = MODEL_PATH if runtime in ('keras', 'numpy') else quantized_path
+            result = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--child', runtime, model_path,
+                 '--predictions', str(args.predictions), '--batch-size', str(args.batch_size)],
+                capture_output=True, text=True, env={**os.environ, 'TF_CPP_MIN_LOG_LEVEL': '3'}
+            )
+            if result.returncode != 0:
+                print(f'{runtime:8} failed: {(result.stderr.strip().splitlines() or ["no output"])[-1]}')
+                continue
+            r = json.loads(result.stdout.strip().splitlines()[-1])
+            print(f"{runtime:8} {r['load_s']:7.2f} {r['p50_us']:9.1f} {r['p99_us']:9.1f} {r['batch_us_per_msg']:16.1f} "
+                  f"{r['rss_mb']:8.1f} {r['added_rss_mb']:9.1f}  {str(r['tensorflow_imported']):5} {notes[runtime]}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
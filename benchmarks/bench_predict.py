@@ -0,0 +1,88 @@
+"""Throughput of single vs batched HealthcareBot predictions on CPU.
+
+Usage: python benchmarks/bench_predict.py [--requests 512] [--batch-size 32] [--threads 16]
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from model import HealthcareBot, MicroBatcher, pad_sequences
+
+MESSAGES = [
+    'I have a headache and feel dizzy',
+    'hello there',
+    'my throat is sore and I have a fever',
+    'what should I do about back pain',
+    'thanks for the help',
+    'I have been coughing for three days',
+    'feeling tired all the time',
+    'chest pain and shortness of breath',
+]
+
+
+def load_bot():
+    bot = HealthcareBot()
+    bot.load_model('healthcare_model.h5', 'tokenizer.vocab')
+    return bot
+
+
+def rate(count, seconds):
+    return f'{count / seconds:9.1f} predictions/s'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=512)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--max-wait-ms', type=float, default=5)
+    args = parser.parse_args()
+
+    bot = load_bot()
+    rng = random.Random(0)
+    texts = [rng.choice(MESSAGES) for _ in range(args.requests)]
+    bot.predict_batch(texts[:args.batch_size])  # warm up
+
+    start = time.perf_counter()
+    for text in texts:
+        sequence = bot.tokenizer.texts_to_sequences([bot.preprocess_text(text)])
+        bot.model.predict(pad_sequences(sequence, maxlen=bot.max_sequence_length), verbose=0)
+    print(f'model.predict per call   {rate(len(texts), time.perf_counter() - start)}')
+
+    start = time.perf_counter()
+    for text in texts:
+        bot.predict(text)
+    print(f'bot.predict per call     {rate(len(texts), time.perf_counter() - start)}')
+
+    start = time.perf_counter()
+    for i in range(0, len(texts), args.batch_size):
+        bot.predict_batch(texts[i:i + args.batch_size])
+    print(f'predict_batch({args.batch_size:<3})       {rate(len(texts), time.perf_counter() - start)}')
+
+    batcher = MicroBatcher(bot, max_batch_size=args.batch_size, max_wait_ms=args.max_wait_ms)
+    per_thread = len(texts) // args.threads
+
+    def worker(chunk):
+        for text in chunk:
+            batcher.predict(text)
+
+    threads = [threading.Thread(target=worker, args=(texts[i * per_thread:(i + 1) * per_thread],))
+               for i in range(args.threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print(f'MicroBatcher x{args.threads:<3} threads {rate(per_thread * args.threads, time.perf_counter() - start)}')
+    batcher.close()
+
+
+if __name__ == '__main__':
+    main()
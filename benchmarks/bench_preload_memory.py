@@ -0,0 +1,128 @@
+"""Per-worker unique memory (USS) of forked workers with and without preloading.
+
+Each mode runs in a fresh master process that imports app.py, then forks N
+workers the way gunicorn does:
+
+- lazy: every worker loads the intent model itself after the fork
+- preload: the master loads the model first (model.preload()), without gc.freeze()
+- preload+freeze: the master runs app.preload(), which also calls gc.freeze()
+
+Each worker answers some chat messages and predictions and runs a full garbage
+collection, then the master measures USS and PSS of every worker while they are
+all still alive. Needs the trained model and the NLTK data (`python model.py --download-nltk`).
+
+Usage: python benchmarks/bench_preload_memory.py [--workers 4] [--modes lazy,preload,preload+freeze] [--messages 200]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+MODES = ('lazy', 'preload', 'preload+freeze')
+
+
+def work(messages):
+    import gc
+    import app
+    import model
+
+    predictor = model.get_predictor()
+    for message in messages:
+        app.chat_response(message.lower(), 'bench')
+        predictor.predict(message)
+    # A full collection visits every tracked object, writing to its header unless frozen
+    gc.collect()
+
+
+def master(mode, workers, message_count):
+    import app
+    import model
+    from bench_classifiers import synthetic_corpus
+    from process_memory import memory_usage
+
+    messages = [text for text, _ in synthetic_corpus()[1]][:message_count]
+    if mode == 'preload':
+        model.preload()
+    elif mode == 'preload+freeze':
+        app.preload()
+
+    children = []
+    for _ in range(workers):
+        ready_read, ready_write = os.pipe()
+        release_read, release_write = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(ready_read)
+            os.close(release_write)
+            status = 0
+            try:
+                if mode == 'lazy':
+                    model.preload()
+                work(messages)
+            except BaseException:
+                import traceback
+                traceback.print_exc()
+                status = 1
+            os.write(ready_write, b'1')
+            # Stay alive until the master has measured every worker
+            os.read(release_read, 1)
+            os._exit(status)
+        os.close(ready_write)
+        os.close(release_read)
+        children.append((pid, ready_read, release_write))
+
+    for _, ready_read, _ in children:
+        os.read(ready_read, 1)
+    usage = [memory_usage(pid) for pid, _, _ in children]
+    master_usage = memory_usage()
+
+    failed = False
+    for pid, _, release_write in children:
+        os.write(release_write, b'1')
+        _, status = os.waitpid(pid, 0)
+        failed = failed or status != 0
+    if failed:
+        raise SystemExit('A worker failed')
+
+    return {
+        'uss_mb': sum(u['uss'] for u in usage) / workers,
+        'rss_mb': sum(u['rss'] for u in usage) / workers,
+        'total_pss_mb': sum(u['pss'] for u in usage) + master_usage['pss']
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--modes', default=','.join(MODES))
+    parser.add_argument('--messages', type=int, default=200)
+    parser.add_argument('--child', choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(master(args.child, args.workers, args.messages)))
+        return 0
+
+    print(f"{'mode':15} {'USS MB/worker':>14} {'RSS MB/worker':>14} {'total PSS MB':>13}")
+    for mode in args.modes.split(','):
+        result = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--workers', str(args.workers),
+             '--messages', str(args.messages), '--child', mode],
+            capture_output=True, text=True,
+            env={**os.environ, 'TF_CPP_MIN_LOG_LEVEL': '3', 'PRELOAD_MODEL': ''}
+        )
+        if result.returncode != 0:
+            print(f'{mode:15} failed: {(result.stderr.strip().splitlines() or ["no output"])[-1]}')
+            continue
+        stats = json.loads(result.stdout.strip().splitlines()[-1])
+        print(f"{mode:15} {stats['uss_mb']:14.1f} {stats['rss_mb']:14.1f} {stats['total_pss_mb']:13.1f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
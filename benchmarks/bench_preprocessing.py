@@ -0,0 +1,92 @@
+"""Tokens/sec of the original preprocess_text against TextPreprocessor's modes.
+
+Needs the NLTK data (`python model.py --download-nltk`). Checks that compat mode
+reproduces the original output exactly and reports how often fast mode yields
+the same model tokens (after the Keras tokenizer's punctuation filter).
+Usage: python benchmarks/bench_preprocessing.py [--messages 5000] [--seed 0]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from text_preprocessing import TextPreprocessor
+from test_chat_router import generate_messages
+from vocab import VocabTokenizer
+
+KERAS_FILTERS = '!"#$%&()*+,-./:;<=>?@[\\]^_`{|}~\t\n'
+DECORATIONS = ["I don't know, ", "It's been ", 'Help!! ', "I can't sleep; ", '', '', '']
+
+
+def original_preprocess_text(text):
+    """The original HealthcareBot.preprocess_text, stopword set rebuilt per call as it was."""
+    from nltk.corpus import stopwords
+    from nltk.stem import WordNetLemmatizer
+    from nltk.tokenize import word_tokenize
+
+    tokens = word_tokenize(text.lower())
+    stop_words = set(stopwords.words('english'))
+    return ' '.join(_lemmatizer.lemmatize(token) for token in tokens if token not in stop_words)
+
+
+_lemmatizer = None
+
+
+def synthetic_messages(count, seed):
+    rng = random.Random(seed)
+    return [rng.choice(DECORATIONS) + message + rng.choice(['', '.', '?', ' for 3 days!'])
+            for message in rng.choices(generate_messages(), k=count)]
+
+
+def timed(func, messages):
+    start = time.perf_counter()
+    results = func(messages)
+    return time.perf_counter() - start, results
+
+
+def main():
+    global _lemmatizer
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--messages', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    messages = synthetic_messages(args.messages, args.seed)
+    tokens = sum(len(message.split()) for message in messages)
+
+    from nltk.stem import WordNetLemmatizer
+    _lemmatizer = WordNetLemmatizer()
+    compat, fast = TextPreprocessor('compat'), TextPreprocessor('fast')
+    # Load NLTK and WordNet up front so no variant pays for it inside the timing
+    for preprocessor in (compat, fast):
+        preprocessor.preprocess('warm up')
+    original_preprocess_text('warm up')
+
+    variants = [
+        ('original', lambda texts: [original_preprocess_text(text) for text in texts]),
+        ('compat', lambda texts: [compat.preprocess(text) for text in texts]),
+        ('compat many', compat.preprocess_many),
+        ('fast', lambda texts: [fast.preprocess(text) for text in texts]),
+        ('fast many', fast.preprocess_many),
+    ]
+    results = {}
+    for name, func in variants:
+        elapsed, results[name] = timed(func, messages)
+        print(f'{name:12} {tokens / elapsed:12,.0f} tokens/s  ({elapsed / len(messages) * 1e6:7.1f} us/msg)')
+
+    words = VocabTokenizer({}, KERAS_FILTERS).text_to_word_sequence
+    compat_mismatches = sum(a != b for a, b in zip(results['original'], results['compat']))
+    fast_agreement = sum(words(a) == words(b) for a, b in zip(results['original'], results['fast']))
+    print(f'compat mismatches:   {compat_mismatches}')
+    print(f'fast agreement:      {fast_agreement / len(messages):.2%} of messages give the same model tokens')
+    print(f'lemma cache:         {fast.cache_info()}')
+    return 1 if compat_mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""Latency of raw progress aggregation with and without the (user_id, date) indexes.
+
+Seeds the tracking tables with --rows rows in total (1M by default), then
+times the per-user aggregation that rebuilds and checks DailyRollup
+(/get_daily_progress itself reads the rollup) with the composite indexes
+dropped and again with them in place. Uses a local SQLite file unless --database-url points elsewhere
+(e.g. a scratch PostgreSQL database; its tables are reseeded).
+
+Usage: python benchmarks/bench_progress_indexes.py [--rows 1000000] [--users 1000] [--requests 200]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+CHUNK = 50000
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database-url', default='sqlite:///' + os.path.join(tempfile.gettempdir(), 'bench_progress.db'))
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--days', type=int, default=180)
+    parser.add_argument('--requests', type=int, default=200, help='aggregations timed per phase')
+    parser.add_argument('--reseed', action='store_true', help='drop and reseed even if data exists')
+    return parser.parse_args()
+
+
+def seed(app_module, args):
+    db = app_module.db
+    rng = random.Random(0)
+    start = datetime(2025, 1, 1)
+
+    db.drop_all()
+    db.create_all()
+    db.session.execute(db.insert(app_module.User), [
+        {'id': i, 'username': f'user{i}', 'email': f'user{i}@example.com', 'password_hash': 'x'}
+        for i in range(1, args.users + 1)
+    ])
+
+    tables = [
+        (app_module.Meal, 'calories', lambda: rng.randint(100, 900)),
+        (app_module.WaterIntake, 'amount', lambda: 250 * rng.randint(1, 3)),
+        (app_module.Exercise, 'duration', lambda: rng.randint(10, 90)),
+    ]
+    per_table = args.rows // len(tables)
+    for model, column, value in tables:
+        for offset in range(0, per_table, CHUNK):
+            db.session.execute(db.insert(model), [
+                {
+                    'user_id': rng.randint(1, args.users),
+                    'date': start + timedelta(minutes=rng.randrange(args.days * 24 * 60)),
+                    column: value()
+                }
+                for _ in range(min(CHUNK, per_table - offset))
+            ])
+        db.session.commit()
+        print(f'seeded {per_table} {model.__tablename__} rows')
+
+
+def time_requests(app_module, args):
+    rng = random.Random(1)
+    latencies = []
+    for _ in range(args.requests):
+        user_id = rng.randint(1, args.users)
+        start = time.perf_counter()
+        app_module.raw_daily_totals([user_id])
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return statistics.median(latencies), latencies[int(len(latencies) * 0.95) - 1]
+
+
+def main():
+    args = parse_args()
+    os.environ['DATABASE_URL'] = args.database_url
+    import app as app_module
+    db = app_module.db
+    indexed_tables = [app_module.Meal, app_module.WaterIntake, app_module.Exercise]
+
+    with app_module.app.app_context():
+        db.create_all()
+        if args.reseed or not db.session.query(app_module.Meal.id).limit(1).first():
+            seed(app_module, args)
+
+        for model in indexed_tables:
+            for index in model.__table__.indexes:
+                index.drop(db.engine, checkfirst=True)
+        before = time_requests(app_module, args)
+
+        for model in indexed_tables:
+            for index in model.__table__.indexes:
+                index.create(db.engine)
+        db.session.execute(db.text('ANALYZE'))
+        db.session.commit()
+        after = time_requests(app_module, args)
+
+    print(f'without indexes: p50 {before[0]:8.2f} ms  p95 {before[1]:8.2f} ms')
+    print(f'with indexes:    p50 {after[0]:8.2f} ms  p95 {after[1]:8.2f} ms')
+    print(f'p50 speedup:     {before[0] / after[0]:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""Cold-start timings: fresh interpreter to import, to warm model, to first response.
+
+Each step runs in a new subprocess so nothing is cached between runs.
+Usage: python benchmarks/bench_startup.py [--runs 3] [--max-import-ms 2000]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Each probe prints the elapsed seconds since interpreter start-up as its last line
+PROBES = {
+    'import model': 'import model',
+    'import app': 'import app',
+    'model.preload()': 'import model; model.preload()',
+    'first predict()': 'import model; model.get_bot().predict("hello")',
+}
+
+TEMPLATE = """
+import time
+_start = time.perf_counter()
+{code}
+print(time.perf_counter() - _start)
+"""
+
+
+def run_probe(code):
+    result = subprocess.run(
+        [sys.executable, '-c', TEMPLATE.format(code=code)],
+        cwd=ROOT, capture_output=True, text=True, env={**os.environ, 'TF_CPP_MIN_LOG_LEVEL': '3'}
+    )
+    if result.returncode != 0:
+        return None, result.stderr.strip().splitlines()[-1]
+    return float(result.stdout.strip().splitlines()[-1]), None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--max-import-ms', type=float, default=None,
+                        help='exit non-zero if `import model` takes longer than this (median)')
+    args = parser.parse_args()
+
+    medians = {}
+    for name, code in PROBES.items():
+        timings = []
+        for _ in range(args.runs):
+            elapsed, error = run_probe(code)
+            if error:
+                print(f'{name:18} failed: {error}')
+                break
+            timings.append(elapsed)
+        if timings:
+            medians[name] = statistics.median(timings) * 1000
+            print(f'{name:18} median {medians[name]:8.1f} ms  (runs: {", ".join(f"{t * 1000:.0f}" for t in timings)})')
+
+    if args.max_import_ms is not None and medians.get('import model', float('inf')) > args.max_import_ms:
+        print(f'regression: import model exceeded {args.max_import_ms:.0f} ms')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
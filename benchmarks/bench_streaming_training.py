@@ -0,0 +1,118 @@
+"""Peak memory and throughput of in-memory vs streaming LSTM training as the corpus grows.
+
+Writes synthetic sharded JSONL corpora of increasing size (phrasings of the
+symptoms in training_data.json), then trains one epoch on each in a fresh
+process, either through load_training_data + train (the whole corpus as
+lists and arrays) or through train_corpus (the tf.data pipeline). Peak RSS
+should grow with the corpus for the former and stay roughly flat for the latter.
+Needs TensorFlow and the NLTK data (`python model.py --download-nltk`).
+
+Usage: python benchmarks/bench_streaming_training.py [--sizes 20000,100000,400000] [--shards 4] [--modes memory,stream]
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from bench_classifiers import TEMPLATES, join_symptoms
+
+
+def write_corpus(directory, size, shards, seed=0):
+    with open('training_data.json') as f:
+        catalogue = [item for item in json.load(f)['training_data'] if 'symptoms' in item]
+
+    rng = random.Random(seed)
+    handles = [open(os.path.join(directory, f'part-{i:03d}.jsonl'), 'w') for i in range(shards)]
+    try:
+        for i in range(size):
+            item = rng.choice(catalogue)
+            symptoms = [s.lower() for s in item['symptoms']]
+            chosen = rng.sample(symptoms, rng.randint(1, min(3, len(symptoms))))
+            record = {'tag': item['disease'], 'pattern': rng.choice(TEMPLATES).format(join_symptoms(chosen))}
+            handles[i % shards].write(json.dumps(record) + '\n')
+    finally:
+        for handle in handles:
+            handle.close()
+
+
+def to_intents_json(directory, path):
+    # The in-memory path reads the original {"intents": [...]} layout
+    import corpus
+
+    intents = {}
+    for text, tag in corpus.iter_examples(directory):
+        intents.setdefault(tag, {'tag': tag, 'patterns': [], 'responses': []})['patterns'].append(text)
+    with open(path, 'w') as f:
+        json.dump({'intents': list(intents.values())}, f)
+
+
+def train(mode, workdir, size, batch_size):
+    from model import HealthcareBot
+
+    bot = HealthcareBot(engine='lstm')
+    start = time.perf_counter()
+    if mode == 'stream':
+        bot.train_corpus(os.path.join(workdir, 'shards'), epochs=1, batch_size=batch_size)
+    else:
+        X, y = bot.load_training_data(os.path.join(workdir, 'intents.json'))
+        bot.build_model(bot.vocab_size(), len(bot.intent_names))
+        bot.train(X, y, epochs=1, batch_size=batch_size)
+    elapsed = time.perf_counter() - start
+    return {
+        'examples_per_s': size / elapsed,
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    }
+
+
+def run_child(*args):
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), *args],
+        capture_output=True, text=True, env={**os.environ, 'TF_CPP_MIN_LOG_LEVEL': '3'}
+    )
+    if result.returncode != 0:
+        return None, (result.stderr.strip().splitlines() or ['no output'])[-1]
+    return json.loads(result.stdout.strip().splitlines()[-1]), None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='20000,100000,400000')
+    parser.add_argument('--shards', type=int, default=4)
+    parser.add_argument('--modes', default='memory,stream')
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--child', nargs=3, metavar=('MODE', 'WORKDIR', 'SIZE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        mode, workdir, size = args.child
+        print(json.dumps(train(mode, workdir, int(size), args.batch_size)))
+        return 0
+
+    print(f"{'patterns':>9} {'mode':7} {'examples/s':>11} {'peak RSS MB':>12}")
+    for size in [int(size) for size in args.sizes.split(',')]:
+        with tempfile.TemporaryDirectory() as workdir:
+            shards = os.path.join(workdir, 'shards')
+            os.mkdir(shards)
+            write_corpus(shards, size, args.shards)
+            for mode in args.modes.split(','):
+                if mode == 'memory':
+                    to_intents_json(shards, os.path.join(workdir, 'intents.json'))
+                result, error = run_child('--batch-size', str(args.batch_size), '--child', mode, workdir, str(size))
+                if error:
+                    print(f'{size:9} {mode:7} failed: {error}')
+                    continue
+                print(f"{size:9} {mode:7} {result['examples_per_s']:11.0f} {result['peak_rss_mb']:12.1f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
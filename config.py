@@ -3,6 +3,28 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+def env_flag(name, default=''):
+    return os.getenv(name, default).lower() in ('1', 'true', 'yes')
+
+def engine_options(uri):
+    """SQLAlchemy engine options for ``uri`` from the DB_* environment variables."""
+    options = {'pool_pre_ping': env_flag('DB_POOL_PRE_PING')}
+    if env_flag('DB_PGBOUNCER'):
+        # PgBouncer in transaction mode pools the server connections; holding them in a
+        # client-side pool as well would pin them. The statement timeout is set per
+        # transaction instead (PgBouncer rejects the startup option), see db_routing.py
+        from sqlalchemy.pool import NullPool
+        options['poolclass'] = NullPool
+        return options
+    if not uri.startswith('sqlite'):
+        options['pool_size'] = int(os.getenv('DB_POOL_SIZE', 5))
+        options['max_overflow'] = int(os.getenv('DB_MAX_OVERFLOW', 10))
+        options['pool_recycle'] = int(os.getenv('DB_POOL_RECYCLE', -1))  # seconds; -1 never recycles
+    statement_timeout = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', 0))
+    if statement_timeout and uri.startswith('postgresql'):
+        options['connect_args'] = {'options': f'-c statement_timeout={statement_timeout}'}
+    return options
+
 class Config:
     # Database configuration
     DB_USER = 'postgres'
@@ -12,11 +34,74 @@ class Config:
     DB_NAME = 'healthcare_assistant'
     
     # SQLAlchemy configuration
-    SQLALCHEMY_DATABASE_URI = f'postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}'
+    SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', f'postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
+    
+    # Connection pooling (see engine_options): DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_PRE_PING,
+    # DB_POOL_RECYCLE, DB_STATEMENT_TIMEOUT_MS, and DB_PGBOUNCER=1 behind PgBouncer transaction pooling
+    DB_PGBOUNCER = env_flag('DB_PGBOUNCER')
+    DB_STATEMENT_TIMEOUT_MS = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', 0))
+    
+    # Optional read replica for read-only views; they fall back to the primary while it is
+    # unreachable, retrying it after DB_REPLICA_RETRY_INTERVAL seconds. Replica lag means
+    # those views may briefly miss the latest writes.
+    SQLALCHEMY_REPLICA_URI = os.getenv('DATABASE_REPLICA_URL', '')
+    SQLALCHEMY_BINDS = {
+        'replica': dict(engine_options(SQLALCHEMY_REPLICA_URI), url=SQLALCHEMY_REPLICA_URI)
+    } if SQLALCHEMY_REPLICA_URI else {}
+    DB_REPLICA_RETRY_INTERVAL = float(os.getenv('DB_REPLICA_RETRY_INTERVAL', 30))
     
     # Security
     SECRET_KEY = 'dev-secret-key-123'  # Fixed secret key for development
     
+    # Run app.preload() at import time, for preforking servers without a preload hook
+    # (gunicorn.conf.py calls it itself before forking)
+    PRELOAD_MODEL = env_flag('PRELOAD_MODEL')
+    
+    # Chat history is written behind the request by a background thread
+    CHAT_HISTORY_QUEUE_SIZE = int(os.getenv('CHAT_HISTORY_QUEUE_SIZE', 10000))  # turns buffered before dropping
+    CHAT_HISTORY_BATCH_SIZE = int(os.getenv('CHAT_HISTORY_BATCH_SIZE', 200))    # rows per bulk insert
+    CHAT_HISTORY_FLUSH_INTERVAL = float(os.getenv('CHAT_HISTORY_FLUSH_INTERVAL', 1.0))  # seconds
+    
+    # Shared /chat response cache keyed by normalized message (size 0 disables it)
+    CHAT_CACHE_SIZE = int(os.getenv('CHAT_CACHE_SIZE', 1024))
+    CHAT_CACHE_TTL = float(os.getenv('CHAT_CACHE_TTL', 300))  # seconds
+    
+    # Per-process cache of logged-in user identities, so @login_required skips the user query
+    USER_CACHE_ENABLED = env_flag('USER_CACHE_ENABLED', '1')
+    USER_CACHE_SIZE = int(os.getenv('USER_CACHE_SIZE', 4096))
+    USER_CACHE_TTL = float(os.getenv('USER_CACHE_TTL', 60))  # seconds; bounds staleness across workers
+    
+    # Password hashing: PBKDF2-SHA256 work factor for new hashes (older hashes are upgraded at
+    # login), threads hashing in parallel, and hashes allowed in flight before logins get a 503
+    PASSWORD_HASH_ITERATIONS = int(os.getenv('PASSWORD_HASH_ITERATIONS', 600000))
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', os.cpu_count() or 1))
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv('PASSWORD_HASH_MAX_PENDING', 64))
+    PASSWORD_HASH_TIMEOUT = float(os.getenv('PASSWORD_HASH_TIMEOUT', 10))  # seconds
+    
+    # Request metrics served on /metrics in the Prometheus text format (per worker process).
+    # Requests slower than SLOW_REQUEST_MS are logged with their SQL breakdown; routine
+    # debug events are logged for a LOG_SAMPLE_RATE fraction of requests
+    METRICS_ENABLED = env_flag('METRICS_ENABLED', '1')
+    SLOW_REQUEST_MS = float(os.getenv('SLOW_REQUEST_MS', 500))
+    LOG_SAMPLE_RATE = float(os.getenv('LOG_SAMPLE_RATE', 0.01))
+    
+    # Opt-in sampling profiler (profiler.py). When PROFILER_ENABLED is off no hooks or routes are
+    # registered at all. When on, a PROFILER_SAMPLE_RATE fraction of requests, requests sending
+    # X-Profile-Token: PROFILER_TOKEN, and every request during a capture window started by an
+    # admin on /admin/profiler are sampled into collapsed-stack files in PROFILER_DIR
+    PROFILER_ENABLED = env_flag('PROFILER_ENABLED')
+    PROFILER_SAMPLE_RATE = float(os.getenv('PROFILER_SAMPLE_RATE', 0))
+    PROFILER_TOKEN = os.getenv('PROFILER_TOKEN', '')
+    PROFILER_DIR = os.getenv('PROFILER_DIR', 'profiles')
+    PROFILER_INTERVAL = float(os.getenv('PROFILER_INTERVAL', 0.005))  # seconds between samples
+    PROFILER_MAX_BYTES = int(os.getenv('PROFILER_MAX_BYTES', 10 * 1024 * 1024))  # per file before rotating
+    PROFILER_BACKUP_COUNT = int(os.getenv('PROFILER_BACKUP_COUNT', 5))
+    PROFILER_MAX_WINDOW = float(os.getenv('PROFILER_MAX_WINDOW', 300))  # seconds
+    
+    # Comma-separated usernames allowed on the /admin endpoints
+    ADMIN_USERNAMES = set(filter(None, (name.strip() for name in os.getenv('ADMIN_USERNAMES', '').split(','))))
+    
     # Google Maps API Key - Replace with your properly configured API key
     MAPS_API_KEY = os.getenv('GOOGLE_MAPS_API_KEY', '')  # Get from environment variable
@@ -0,0 +1,59 @@
+"""Streaming reader for JSONL intent corpora.
+
+Each line is one JSON object, either a whole intent in the training JSON shape
+(``{"tag": ..., "patterns": [...], "responses": [...]}``) or a single example
+(``{"tag": ..., "pattern": ...}``, optionally with ``"responses"``). A corpus is
+any mix of files, directories and glob patterns (shards); ``.gz`` files are
+decompressed on the fly. Nothing is held in memory beyond the current line.
+"""
+import glob
+import gzip
+import json
+import os
+import zlib
+
+
+def corpus_files(paths):
+    """Expand files, directories and glob patterns into a sorted list of shard files."""
+    if isinstance(paths, str):
+        paths = [paths]
+    files = set()
+    for path in paths:
+        if os.path.isdir(path):
+            files.update(glob.glob(os.path.join(path, '*.jsonl')))
+            files.update(glob.glob(os.path.join(path, '*.jsonl.gz')))
+        elif glob.has_magic(path):
+            files.update(glob.glob(path))
+        else:
+            files.add(path)
+    if not files:
+        raise FileNotFoundError(f'No corpus files found in {paths}')
+    return sorted(files)
+
+
+def iter_records(paths):
+    for file_path in corpus_files(paths):
+        opener = gzip.open if file_path.endswith('.gz') else open
+        with opener(file_path, 'rt', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError as e:
+                    raise ValueError(f'{file_path}:{line_number}: invalid JSON ({e})') from None
+
+
+def in_validation_split(text, validation_fraction):
+    # Hash-based, so the split is stable across epochs, restarts and shard layouts
+    return zlib.crc32(text.encode('utf-8')) % 10000 < validation_fraction * 10000
+
+
+def iter_examples(paths, split=None, validation_fraction=0.0):
+    """Yield ``(pattern, tag)`` pairs; ``split`` is None (all), 'train' or 'validation'."""
+    for record in iter_records(paths):
+        patterns = record['patterns'] if 'patterns' in record else [record['pattern']]
+        for pattern in patterns:
+            if split is not None and in_validation_split(pattern, validation_fraction) != (split == 'validation'):
+                continue
+            yield pattern, record['tag']
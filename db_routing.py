@@ -0,0 +1,96 @@
+"""Read-replica routing for Flask-SQLAlchemy.
+
+Views wrapped in ``ReplicaRouter.read_only`` run their queries against the
+``replica`` bind (``SQLALCHEMY_BINDS['replica']``) instead of the primary.
+If the replica can't be connected to, or the view fails with a connection
+error, the view runs on the primary instead and the replica is skipped for
+``retry_interval`` seconds.
+"""
+from functools import wraps
+import logging
+import threading
+import time
+
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.exc import InterfaceError, OperationalError
+
+logger = logging.getLogger(__name__)
+
+REPLICA_BIND = 'replica'
+
+
+class RoutingSession(Session):
+    """Sends default-bind reads to the replica while ``info['use_replica']`` is set.
+
+    Flushes, explicit binds and models with their own ``__bind_key__`` are never rerouted.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        engine = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        if bind is None and self.info.get('use_replica') and not self._flushing:
+            engines = self._db.engines
+            if engine is engines.get(None) and REPLICA_BIND in engines:
+                return engines[REPLICA_BIND]
+        return engine
+
+
+class ReplicaRouter:
+    def __init__(self, db, retry_interval=30):
+        self.db = db
+        self.retry_interval = retry_interval
+        self.replica_requests = 0
+        self.fallbacks = 0
+        self._down_until = 0.0
+        self._lock = threading.Lock()
+
+    def available(self):
+        return REPLICA_BIND in self.db.engines and time.monotonic() >= self._down_until
+
+    def mark_down(self):
+        with self._lock:
+            self.fallbacks += 1
+            self._down_until = time.monotonic() + self.retry_interval
+
+    def read_only(self, view):
+        """Decorate a view that only reads, so it can run on the replica (and be rerun on failure)."""
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not self.available():
+                return view(*args, **kwargs)
+            session = self.db.session()
+            try:
+                # Check out a replica connection first, so an unreachable replica is
+                # detected before the view runs (and before its own error handling)
+                session.connection(bind_arguments={'bind': self.db.engines[REPLICA_BIND]})
+                session.info['use_replica'] = True
+                self.replica_requests += 1
+                return view(*args, **kwargs)
+            except (OperationalError, InterfaceError) as e:
+                logger.warning('Read replica failed (%s); using the primary for %ss', e.orig, self.retry_interval)
+                self.mark_down()
+                session.info.pop('use_replica', None)
+                session.rollback()
+                return view(*args, **kwargs)
+            finally:
+                session.info.pop('use_replica', None)
+        return wrapper
+
+    def stats(self):
+        return {
+            'configured': REPLICA_BIND in self.db.engines,
+            'available': self.available(),
+            'replica_requests': self.replica_requests,
+            'fallbacks': self.fallbacks
+        }
+
+
+def set_statement_timeout_per_transaction(engine, timeout_ms):
+    """Apply ``statement_timeout`` with SET LOCAL at the start of every transaction.
+
+    For PgBouncer transaction pooling, where a session-level SET would leak to
+    other clients sharing the server connection.
+    """
+    @event.listens_for(engine, 'begin')
+    def set_timeout(connection):
+        connection.exec_driver_sql(f'SET LOCAL statement_timeout = {int(timeout_ms)}')
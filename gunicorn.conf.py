@@ -0,0 +1,31 @@
+"""Gunicorn settings: build everything once in the master so forked workers share it.
+
+Usage: gunicorn -c gunicorn.conf.py app:app
+"""
+import gc
+import multiprocessing
+import os
+
+from process_memory import memory_usage
+
+bind = os.getenv('GUNICORN_BIND', '127.0.0.1:8000')
+workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+
+# Import app.py (knowledge base, indexes) in the master rather than in every worker
+preload_app = True
+
+
+def when_ready(server):
+    # Master only, after the app is imported and before the first worker forks
+    import app
+    app.preload()
+    usage = memory_usage()
+    server.log.info('Preloaded app: %d objects frozen, master RSS %.1f MB',
+                    gc.get_freeze_count(), usage['rss'])
+
+
+def post_worker_init(worker):
+    usage = memory_usage()
+    worker.log.info('Worker %s started: RSS %.1f MB, PSS %.1f MB, USS %.1f MB (shared with master %.1f MB)',
+                    worker.pid, usage['rss'], usage['pss'], usage['uss'],
+                    usage['shared_clean'] + usage['shared_dirty'])
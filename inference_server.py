@@ -0,0 +1,241 @@
+"""Local inference daemon: one model process shared by every web worker.
+
+The daemon loads the intent model once and answers classification requests
+on a Unix domain socket. Requests from all connections go through one
+``MicroBatcher``, so concurrent workers share forward passes. Workers use
+``InferenceClient``, which has the same ``predict``/``predict_batch``
+interface as ``HealthcareBot``.
+
+Wire format (little-endian): every message is a uint32 body length followed by
+the body. A request body is ``uint8 op, uint16 count`` and ``count`` strings;
+a response body is ``uint8 status, uint16 count`` and ``count`` strings (the
+replies, or one error message). Each string is a uint32 byte length and UTF-8.
+
+Usage: python inference_server.py [--socket PATH] [--max-batch-size 32] [--max-wait-ms 5]
+"""
+import logging
+import os
+import signal
+import socket
+import socketserver
+import struct
+import threading
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOCKET_PATH = '/tmp/healthcare-inference.sock'
+
+LENGTH = struct.Struct('<I')
+HEADER = struct.Struct('<BH')
+OP_PREDICT = 1
+OP_PING = 2
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+# Per message; a request can carry at most 65535 texts anyway
+MAX_MESSAGE_SIZE = 16 * 1024 * 1024
+
+
+class InferenceError(Exception):
+    """The daemon could not be reached or failed to classify a request."""
+
+
+def encode(kind, strings):
+    parts = [HEADER.pack(kind, len(strings))]
+    for string in strings:
+        data = string.encode('utf-8')
+        parts.append(LENGTH.pack(len(data)))
+        parts.append(data)
+    body = b''.join(parts)
+    return LENGTH.pack(len(body)) + body
+
+
+def decode(body):
+    kind, count = HEADER.unpack_from(body)
+    strings = []
+    offset = HEADER.size
+    for _ in range(count):
+        length, = LENGTH.unpack_from(body, offset)
+        offset += LENGTH.size
+        if offset + length > len(body):
+            raise ValueError('Truncated message')
+        strings.append(body[offset:offset + length].decode('utf-8'))
+        offset += length
+    return kind, strings
+
+
+def read_message(sock):
+    """Return one message body, or None if the peer closed the connection cleanly."""
+    header = _read_exactly(sock, LENGTH.size, allow_eof=True)
+    if header is None:
+        return None
+    length, = LENGTH.unpack(header)
+    if length > MAX_MESSAGE_SIZE:
+        raise ValueError(f'Message of {length} bytes exceeds the {MAX_MESSAGE_SIZE} byte limit')
+    return _read_exactly(sock, length)
+
+
+def _read_exactly(sock, size, allow_eof=False):
+    buffer = bytearray()
+    while len(buffer) < size:
+        chunk = sock.recv(size - len(buffer))
+        if not chunk:
+            if allow_eof and not buffer:
+                return None
+            raise ConnectionError('Connection closed mid-message')
+        buffer += chunk
+    return bytes(buffer)
+
+
+class _RequestHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        batcher = self.server.batcher
+        while True:
+            try:
+                body = read_message(self.request)
+                if body is None:
+                    return
+                op, texts = decode(body)
+            except (ConnectionError, ValueError, struct.error) as e:
+                logger.warning('Dropping inference connection: %s', e)
+                return
+
+            if op == OP_PING:
+                reply = encode(STATUS_OK, [])
+            elif op == OP_PREDICT:
+                # Queue every text before waiting, so they can share one batch
+                futures = [batcher.submit(text) for text in texts]
+                try:
+                    reply = encode(STATUS_OK, [future.result() for future in futures])
+                except Exception as e:
+                    logger.exception('Inference failed')
+                    reply = encode(STATUS_ERROR, [str(e)])
+            else:
+                reply = encode(STATUS_ERROR, [f'Unknown op {op}'])
+            self.request.sendall(reply)
+
+
+class InferenceServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Serves ``bot.predict_batch`` on ``socket_path``, one thread per connection."""
+
+    daemon_threads = True
+
+    def __init__(self, bot, socket_path=DEFAULT_SOCKET_PATH, max_batch_size=32, max_wait_ms=5):
+        from model import MicroBatcher
+
+        if os.path.exists(socket_path):
+            # A stale socket from a previous run; refuse if a daemon is still answering on it
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(socket_path)
+            except OSError:
+                os.unlink(socket_path)
+            else:
+                raise OSError(f'An inference server is already listening on {socket_path}')
+            finally:
+                probe.close()
+
+        self.socket_path = socket_path
+        self.batcher = MicroBatcher(bot, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+        super().__init__(socket_path, _RequestHandler)
+        # Owner and group (the web workers) only
+        os.chmod(socket_path, 0o660)
+
+    def server_close(self):
+        super().server_close()
+        self.batcher.close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+class InferenceClient:
+    """``predict``/``predict_batch`` over the daemon's socket.
+
+    Each thread keeps its own connection, reconnecting after errors. Every
+    request is bounded by ``timeout`` seconds. If the daemon is unreachable,
+    times out or reports an error, ``fallback(texts)`` answers instead when
+    given; otherwise ``InferenceError`` is raised.
+    """
+
+    def __init__(self, socket_path=DEFAULT_SOCKET_PATH, timeout=2.0, fallback=None):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.fallback = fallback
+        self.fallbacks = 0
+        self._local = threading.local()
+
+    def predict(self, text):
+        return self.predict_batch([text])[0]
+
+    def predict_batch(self, texts):
+        if not texts:
+            return []
+        try:
+            return self._request(OP_PREDICT, list(texts))
+        except InferenceError:
+            if self.fallback is None:
+                raise
+            self.fallbacks += 1
+            logger.warning('Inference server unavailable; using the fallback', exc_info=True)
+            return self.fallback(list(texts))
+
+    def ping(self):
+        try:
+            self._request(OP_PING, [])
+            return True
+        except InferenceError:
+            return False
+
+    def close(self):
+        sock = getattr(self._local, 'sock', None)
+        if sock is not None:
+            sock.close()
+            self._local.sock = None
+
+    def _request(self, op, texts):
+        try:
+            sock = getattr(self._local, 'sock', None)
+            if sock is None:
+                sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                sock.settimeout(self.timeout)
+                sock.connect(self.socket_path)
+                self._local.sock = sock
+            sock.sendall(encode(op, texts))
+            body = read_message(sock)
+            if body is None:
+                raise ConnectionError('Inference server closed the connection')
+            status, strings = decode(body)
+        except (OSError, ValueError, struct.error) as e:
+            # The connection may hold half a reply; start over on the next request
+            self.close()
+            raise InferenceError(f'Inference server at {self.socket_path} failed: {e}') from e
+        if status != STATUS_OK:
+            raise InferenceError(strings[0] if strings else 'Inference failed')
+        return strings
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Serve the intent model to local web workers')
+    parser.add_argument('--socket', default=os.getenv('HEALTHCARE_INFERENCE_SOCKET') or DEFAULT_SOCKET_PATH)
+    parser.add_argument('--max-batch-size', type=int, default=32)
+    parser.add_argument('--max-wait-ms', type=float, default=5)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+
+    import model
+    bot = model.get_bot()
+    bot.engine.warm_up()
+
+    server = InferenceServer(bot, args.socket, args.max_batch_size, args.max_wait_ms)
+    # shutdown() blocks until serve_forever() returns, so call it from another thread
+    signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=server.shutdown).start())
+    logger.info('Serving %s model on %s', bot.engine.name, args.socket)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
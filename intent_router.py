@@ -0,0 +1,123 @@
+from symptom_index import PatternAutomaton
+
+
+class Rule:
+    """One declarative routing rule.
+
+    ``patterns`` are tried in order and the first that qualifies is reported to
+    ``respond``. A pattern qualifies when it occurs at least once, or exactly once
+    with ``exactly_once`` (occurrences counted like ``str.count``). With
+    ``word_boundary`` an occurrence must not be flanked by word characters.
+    ``max_tokens`` limits the whitespace-separated token count of the message and
+    ``requires_any`` lists patterns of which at least one must also occur.
+
+    ``respond(message, match)`` builds the reply; ``match`` has the first
+    qualifying ``pattern`` and all qualifying ``patterns`` in rule order.
+    """
+
+    def __init__(self, name, priority, patterns, respond, exactly_once=False,
+                 word_boundary=False, max_tokens=None, requires_any=()):
+        self.name = name
+        self.priority = priority
+        self.patterns = list(patterns)
+        self.respond = respond
+        self.exactly_once = exactly_once
+        self.word_boundary = word_boundary
+        self.max_tokens = max_tokens
+        self.requires_any = list(requires_any)
+
+
+class RouteMatch:
+    def __init__(self, rule, patterns):
+        self.rule = rule
+        self.patterns = patterns
+        self.pattern = patterns[0]
+
+
+class IntentRouter:
+    """Compiles a rules table into a single Aho-Corasick matcher.
+
+    Routing a message scans it once for every pattern of every rule, then
+    resolves the rules in priority order from the recorded occurrences.
+    """
+
+    def __init__(self, rules, default):
+        self.rules = sorted(rules, key=lambda rule: rule.priority)
+        self.default = default
+
+        pattern_ids = {}
+        for rule in self.rules:
+            for pattern in rule.patterns + rule.requires_any:
+                pattern_ids.setdefault(pattern, len(pattern_ids))
+        self.pattern_ids = pattern_ids
+        self.automaton = PatternAutomaton(pattern_ids, dense=True)
+
+        self._lengths = [len(pattern) for pattern in pattern_ids]
+        # Per rule: the ids of its patterns, each pattern's position in the rule,
+        # and the ids of its requires_any patterns
+        self._compiled = []
+        for rule in self.rules:
+            order = {pattern_ids[pattern]: index for index, pattern in enumerate(rule.patterns)}
+            self._compiled.append((
+                rule,
+                frozenset(order),
+                order,
+                frozenset(pattern_ids[pattern] for pattern in rule.requires_any),
+                rule.max_tokens,
+                rule.exactly_once or rule.word_boundary
+            ))
+
+    def route(self, message):
+        """Return ``(rule_name, response)``; ``rule_name`` is None for the default reply."""
+        positions = self.automaton.find_positions(message)
+        if not positions:
+            return None, self.default
+
+        num_tokens = None
+        for rule, rule_ids, order, requires_any, max_tokens, check_occurrences in self._compiled:
+            found = rule_ids.intersection(positions)
+            if not found:
+                continue
+            if max_tokens is not None:
+                if num_tokens is None:
+                    num_tokens = len(message.split())
+                if num_tokens > max_tokens:
+                    continue
+            if requires_any and requires_any.isdisjoint(positions):
+                continue
+
+            if check_occurrences:
+                found = [pattern_id for pattern_id in found if self._qualifies(rule, message, pattern_id, positions[pattern_id])]
+                if not found:
+                    continue
+            if len(found) > 1:
+                found = sorted(found, key=order.__getitem__)
+            matched = [rule.patterns[order[pattern_id]] for pattern_id in found]
+            return rule.name, rule.respond(message, RouteMatch(rule, matched))
+
+        return None, self.default
+
+    def _qualifies(self, rule, message, pattern_id, ends):
+        length = self._lengths[pattern_id]
+        if rule.word_boundary:
+            ends = [end for end in ends if _on_word_boundary(message, end - length, end)]
+        if rule.exactly_once:
+            return _count_non_overlapping(ends, length) == 1
+        return bool(ends)
+
+
+def _count_non_overlapping(ends, length):
+    # Same counting as str.count: leftmost occurrences, skipping overlaps
+    count = 0
+    last_end = -1
+    for end in ends:
+        if end - length >= last_end:
+            count += 1
+            last_end = end
+    return count
+
+
+def _on_word_boundary(text, start, end):
+    before = text[start - 1] if start > 0 else ' '
+    after = text[end] if end < len(text) else ' '
+    return not (before.isalnum() or before == '_') and not (after.isalnum() or after == '_')
@@ -0,0 +1,172 @@
+"""In-process metrics in the Prometheus text format, and sampled structured logging.
+
+``Counter`` and ``Histogram`` keep their values per label combination;
+``Registry.render()`` writes everything registered, plus the samples returned
+by collector callbacks (for values that live elsewhere, such as cache stats),
+in the text exposition format served on ``/metrics``.
+
+Values are per process: behind a preforking server each worker reports its
+own, identified by the ``pid`` label ``render()`` adds.
+"""
+from bisect import bisect_left
+from contextlib import contextmanager
+import json
+import logging
+import math
+import os
+import random
+import threading
+import time
+
+# Seconds; from sub-millisecond SQL up to multi-second requests
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(pairs):
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.family = name + '_total'
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(tuple(labels[name] for name in self.labelnames), 0)
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield self.family, list(zip(self.labelnames, key)), value
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.family = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}  # label values -> [per-bucket counts..., count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                state[index] += 1
+            state[-2] += 1
+            state[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels):
+        state = self._values.get(tuple(labels[name] for name in self.labelnames))
+        return state[-2] if state else 0
+
+    def samples(self):
+        with self._lock:
+            items = [(key, list(state)) for key, state in self._values.items()]
+        for key, state in items:
+            pairs = list(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                yield self.name + '_bucket', pairs + [('le', _format_value(bound))], cumulative
+            yield self.name + '_bucket', pairs + [('le', '+Inf')], state[-2]
+            yield self.name + '_count', pairs, state[-2]
+            yield self.name + '_sum', pairs, state[-1]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def counter(self, name, help, labelnames=()):
+        metric = Counter(name, help, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        metric = Histogram(name, help, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, name, help, collect, kind='gauge'):
+        """Export ``collect()``'s ``{((label, value), ...): sample}`` dict under ``name`` on every scrape."""
+        self._collectors.append((name, help, kind, collect))
+
+    def render(self):
+        pid = ('pid', str(os.getpid()))
+        lines = []
+        for metric in self._metrics:
+            lines.append(f'# HELP {metric.family} {metric.help}')
+            lines.append(f'# TYPE {metric.family} {metric.kind}')
+            for name, pairs, value in metric.samples():
+                lines.append(f'{name}{_labels([pid] + pairs)} {_format_value(value)}')
+        for name, help, kind, collect in self._collectors:
+            lines.append(f'# HELP {name} {help}')
+            lines.append(f'# TYPE {name} {kind}')
+            for pairs, value in collect().items():
+                lines.append(f'{name}{_labels([pid] + list(pairs))} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+# Shared by app.py and model.py
+symptom_check_seconds = registry.histogram(
+    'healthcare_symptom_check_seconds',
+    'Time spent matching and ranking symptoms in a chat message (routing included for routed messages)')
+model_inference_seconds = registry.histogram(
+    'healthcare_model_inference_seconds', 'Intent model forward pass time per batch', ['engine'])
+model_batch_size = registry.histogram(
+    'healthcare_model_batch_size', 'Messages per intent model forward pass', ['engine'],
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128))
+
+
+def log_event(logger, event, level=logging.INFO, sample_rate=1.0, **fields):
+    """Log ``event`` and ``fields`` as one JSON object, for a ``sample_rate`` fraction of calls."""
+    if sample_rate < 1.0 and random.random() >= sample_rate:
+        return
+    if logger.isEnabledFor(level):
+        logger.log(level, json.dumps({'event': event, **fields}, default=str))
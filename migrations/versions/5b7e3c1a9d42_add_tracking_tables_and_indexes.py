@@ -0,0 +1,81 @@
+"""add tracking tables and composite user/date indexes
+
+Revision ID: 5b7e3c1a9d42
+Revises: 10d428d035fd
+Create Date: 2026-10-18 19:30:12.418305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b7e3c1a9d42'
+down_revision = '10d428d035fd'
+branch_labels = None
+depends_on = None
+
+# (index name, table, columns) for the range lookups every progress read does
+INDEXES = [
+    ('ix_appointment_patient_id_appointment_date', 'appointment', ['patient_id', 'appointment_date']),
+    ('ix_meal_user_id_date', 'meal', ['user_id', 'date']),
+    ('ix_water_intake_user_id_date', 'water_intake', ['user_id', 'date']),
+    ('ix_exercise_user_id_date', 'exercise', ['user_id', 'date']),
+]
+
+
+def upgrade():
+    # Databases bootstrapped with db.create_all() may already have these tables,
+    # so only create what is missing
+    inspector = sa.inspect(op.get_bind())
+    existing_tables = set(inspector.get_table_names())
+
+    if 'appointment' not in existing_tables:
+        op.create_table('appointment',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('patient_id', sa.Integer(), nullable=False),
+        sa.Column('appointment_type', sa.String(length=120), nullable=False),
+        sa.Column('appointment_date', sa.DateTime(), nullable=False),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('status', sa.String(length=120), nullable=False),
+        sa.ForeignKeyConstraint(['patient_id'], ['user.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+    if 'meal' not in existing_tables:
+        op.create_table('meal',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('date', sa.DateTime(), nullable=False),
+        sa.Column('calories', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+    if 'water_intake' not in existing_tables:
+        op.create_table('water_intake',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('date', sa.DateTime(), nullable=False),
+        sa.Column('amount', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+    if 'exercise' not in existing_tables:
+        op.create_table('exercise',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('date', sa.DateTime(), nullable=False),
+        sa.Column('duration', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+    for name, table, columns in INDEXES:
+        existing = {index['name'] for index in inspector.get_indexes(table)} if table in existing_tables else set()
+        if name not in existing:
+            op.create_index(name, table, columns, unique=False)
+
+
+def downgrade():
+    # Tables may predate this revision (db.create_all()), so only the indexes are removed
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
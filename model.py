@@ -1,38 +1,461 @@
 import numpy as np
-import nltk
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
-from tensorflow.keras.models import Sequential, load_model
-from tensorflow.keras.layers import Dense, LSTM, Embedding, Dropout
-from tensorflow.keras.preprocessing.text import Tokenizer
-from tensorflow.keras.preprocessing.sequence import pad_sequences
+from concurrent.futures import Future
+import importlib.util
+import itertools
 import json
-import pickle
+import os
+import queue
+import threading
+import time
 
-# Download required NLTK data
-nltk.download('punkt')
-nltk.download('stopwords')
-nltk.download('wordnet')
+import corpus
+import metrics
+import numpy_engine
+from text_preprocessing import TextPreprocessor, ensure_nltk_data
+from vocab import VocabTokenizer, load_tokenizer, pad_sequences
 
-class HealthcareBot:
-    def __init__(self):
-        self.lemmatizer = WordNetLemmatizer()
+# Classifier backend: 'lstm' (Keras, needs TensorFlow) or 'linear' (scikit-learn TF-IDF + logistic regression)
+MODEL_ENGINE = os.getenv('HEALTHCARE_MODEL_ENGINE', 'lstm')
+DEFAULT_MODEL_PATHS = {
+    'lstm': 'healthcare_model.h5',
+    'linear': 'healthcare_linear.npz'
+}
+LINEAR_FORMAT_VERSION = 1  # Layout of the linear engine's .npz file
+MODEL_PATH = os.getenv('HEALTHCARE_MODEL_PATH', DEFAULT_MODEL_PATHS.get(MODEL_ENGINE, 'healthcare_model.h5'))
+TOKENIZER_PATH = os.getenv('HEALTHCARE_TOKENIZER_PATH', 'tokenizer.vocab')
+# 'fast' (regex tokenizer) or 'compat' (NLTK word_tokenize, identical to the original preprocessing)
+PREPROCESSING_MODE = os.getenv('HEALTHCARE_PREPROCESSING', 'fast')
+# How the LSTM runs at serve time: 'keras', 'numpy' (exported .npz weights, no
+# TensorFlow) or 'auto' (Keras when TensorFlow is installed, NumPy otherwise)
+LSTM_RUNTIME = os.getenv('HEALTHCARE_LSTM_RUNTIME', 'auto')
+# Serve quantized LSTM weights ('int8' or 'float16'; NumPy runtime only), and how much
+# held-out accuracy quantizing may cost before training refuses to publish the artifact
+LSTM_QUANTIZATION = os.getenv('HEALTHCARE_LSTM_QUANTIZATION', '')
+QUANTIZATION_MAX_ACCURACY_DROP = float(os.getenv('HEALTHCARE_QUANTIZATION_MAX_DROP', '0.01'))
+# Unix socket of a shared inference daemon (python inference_server.py); when set, workers
+# classify through it instead of loading their own model, and only load one if it fails
+INFERENCE_SOCKET = os.getenv('HEALTHCARE_INFERENCE_SOCKET', '')
+INFERENCE_TIMEOUT = float(os.getenv('HEALTHCARE_INFERENCE_TIMEOUT', '2.0'))  # seconds
+
+_keras = None
+_bot = None
+_bot_lock = threading.Lock()
+_predictor = None
+
+def keras():
+    """Import TensorFlow/Keras on first use so importing this module stays cheap."""
+    global _keras
+    if _keras is None:
+        from tensorflow import keras as tf_keras
+        _keras = tf_keras
+    return _keras
+
+def tensorflow_available():
+    return importlib.util.find_spec('tensorflow') is not None
+
+def numpy_weights_path(model_path, quantization=None):
+    suffix = f'.{quantization}.npz' if quantization else '.npz'
+    return os.path.splitext(model_path)[0] + suffix
+
+def model_intents_path(model_path):
+    # Intent names (one per output column) and their responses, shared by every runtime of a model
+    return os.path.splitext(model_path)[0] + '.intents.json'
+
+def holdout_split(X, y, fraction=0.2):
+    """The trailing ``fraction`` of the data, i.e. what Keras' ``validation_split`` holds out."""
+    count = max(1, int(len(X) * fraction))
+    return X[-count:], y[-count:]
+
+class LSTMEngine:
+    """Embedding + two LSTM layers over padded token sequences (Keras)."""
+
+    name = 'lstm'
+
+    def __init__(self, max_sequence_length=20, runtime=None, quantization=None):
+        self.max_sequence_length = max_sequence_length
+        self.runtime = runtime or LSTM_RUNTIME
+        self.quantization = LSTM_QUANTIZATION if quantization is None else quantization
         self.tokenizer = None
         self.model = None
+
+    def fit_features(self, texts, labels, num_classes):
+        # Create tokenizer
+        self.tokenizer = keras().preprocessing.text.Tokenizer()
+        self.tokenizer.fit_on_texts(texts)
+        
+        # Convert text to sequences
+        sequences = self.tokenizer.texts_to_sequences(texts)
+        padded_sequences = pad_sequences(sequences, maxlen=self.max_sequence_length)
+        
+        # Integer labels (sparse_categorical_crossentropy), not a one-hot matrix
+        y = np.asarray(labels, dtype=np.int32)
+        
+        return padded_sequences, y
+
+    def fit_vocabulary(self, texts, chunk_size=10000):
+        """Fit the tokenizer on an iterable of preprocessed texts, ``chunk_size`` at a time.
+
+        Memory grows with the vocabulary, not with the number of texts.
+        """
+        self.tokenizer = keras().preprocessing.text.Tokenizer()
+        chunk = []
+        for text in texts:
+            chunk.append(text)
+            if len(chunk) >= chunk_size:
+                self.tokenizer.fit_on_texts(chunk)
+                chunk = []
+        if chunk:
+            self.tokenizer.fit_on_texts(chunk)
+
+    def vocab_size(self):
+        return len(self.tokenizer.word_index) + 1
+
+    def build(self, vocab_size, num_classes):
+        layers = keras().layers
+        model = keras().models.Sequential([
+            layers.Embedding(vocab_size, 128, input_length=self.max_sequence_length),
+            layers.LSTM(64, return_sequences=True),
+            layers.LSTM(64),
+            layers.Dense(64, activation='relu'),
+            layers.Dropout(0.5),
+            layers.Dense(num_classes, activation='softmax')
+        ])
+        
+        model.compile(optimizer='adam',
+                     loss='sparse_categorical_crossentropy',
+                     metrics=['accuracy'])
+        
+        self.model = model
+        return model
+
+    def callbacks(self, checkpoint_dir=None, patience=None, monitor='val_loss'):
+        callbacks = []
+        if patience:
+            callbacks.append(keras().callbacks.EarlyStopping(
+                monitor=monitor, patience=patience, restore_best_weights=True))
+        if checkpoint_dir:
+            os.makedirs(checkpoint_dir, exist_ok=True)
+            # Best model so far, plus per-epoch model/optimizer state that a rerun resumes from
+            callbacks.append(keras().callbacks.ModelCheckpoint(
+                os.path.join(checkpoint_dir, 'best.h5'), monitor=monitor, save_best_only=True))
+            callbacks.append(keras().callbacks.BackupAndRestore(os.path.join(checkpoint_dir, 'backup')))
+        return callbacks
+
+    def train(self, X, y, epochs=100, batch_size=32, checkpoint_dir=None, patience=None):
+        self.model.fit(X, y,
+                      epochs=epochs,
+                      batch_size=batch_size,
+                      validation_split=0.2,
+                      callbacks=self.callbacks(checkpoint_dir, patience))
+
+    def dataset(self, files, examples, label_ids, preprocess_many, batch_size=32, shuffle_buffer=None):
+        """A ``tf.data`` pipeline of ``(padded_sequences, labels)`` batches.
+
+        ``examples(path)`` yields ``(text, tag)`` pairs from one corpus shard.
+        Shards are read in parallel and interleaved; each batch is preprocessed
+        and tokenized as a whole on the tf.data thread pool and prefetched, so
+        only a few batches are in memory at a time.
+        """
+        import tensorflow as tf
+
+        def generate(path):
+            for text, tag in examples(path.decode('utf-8')):
+                yield text, label_ids[tag]
+
+        def encode(texts):
+            texts = preprocess_many([text.decode('utf-8') for text in texts.numpy()])
+            return pad_sequences(self.tokenizer.texts_to_sequences(texts), self.max_sequence_length)
+
+        def encode_batch(texts, labels):
+            padded = tf.py_function(encode, [texts], tf.int32)
+            padded.set_shape([None, self.max_sequence_length])
+            return padded, labels
+
+        signature = (tf.TensorSpec((), tf.string), tf.TensorSpec((), tf.int32))
+        ds = tf.data.Dataset.from_tensor_slices(list(files)).interleave(
+            lambda path: tf.data.Dataset.from_generator(generate, output_signature=signature, args=(path,)),
+            cycle_length=min(len(files), 4),
+            num_parallel_calls=tf.data.AUTOTUNE
+        )
+        if shuffle_buffer:
+            ds = ds.shuffle(shuffle_buffer)
+        return ds.batch(batch_size).map(encode_batch, num_parallel_calls=tf.data.AUTOTUNE).prefetch(tf.data.AUTOTUNE)
+
+    def train_dataset(self, train_ds, val_ds=None, epochs=100, checkpoint_dir=None, patience=None):
+        self.model.fit(train_ds,
+                      validation_data=val_ds,
+                      epochs=epochs,
+                      callbacks=self.callbacks(checkpoint_dir, patience, 'val_loss' if val_ds is not None else 'loss'))
+
+    def predict_proba(self, texts):
+        # Pad once for a single forward pass
+        sequences = self.tokenizer.texts_to_sequences(texts)
+        padded_sequences = pad_sequences(sequences, maxlen=self.max_sequence_length)
+        
+        # Calling the model directly skips the per-call setup of model.predict()
+        return np.asarray(self.model(padded_sequences, training=False))
+
+    def warm_up(self):
+        # One forward pass builds the model's call graph so the first request doesn't pay for it
+        self.model(np.zeros((1, self.max_sequence_length), dtype=np.int32), training=False)
+
+    def save(self, model_path, tokenizer_path):
+        # Save the model
+        self.model.save(model_path)
+        
+        # Save the tokenizer as a serving vocabulary (word ids and settings only)
+        VocabTokenizer.from_keras(self.tokenizer).save(tokenizer_path)
+        
+        # Export the weights for the NumPy runtime alongside
+        numpy_engine.export_model(self.model, self.tokenizer, numpy_weights_path(model_path))
+
+    def publish_quantized(self, model_path, X_val, y_val, mode='int8', max_accuracy_drop=None):
+        """Write quantized NumPy weights next to ``model_path`` if they keep held-out accuracy.
+
+        Raises ValueError, writing nothing, when accuracy on ``X_val``/``y_val``
+        falls more than ``max_accuracy_drop`` below the float model's.
+        """
+        if max_accuracy_drop is None:
+            max_accuracy_drop = QUANTIZATION_MAX_ACCURACY_DROP
+        reference = numpy_engine.from_keras(self.model)
+        quantized = numpy_engine.quantize(reference, mode)
+        baseline = numpy_engine.accuracy(reference, X_val, y_val)
+        score = numpy_engine.accuracy(quantized, X_val, y_val)
+        if baseline - score > max_accuracy_drop:
+            raise ValueError(
+                f'{mode} model accuracy {score:.4f} is more than {max_accuracy_drop:.4f} below '
+                f'the float model ({baseline:.4f}); not publishing it'
+            )
+        
+        path = numpy_weights_path(model_path, mode)
+        numpy_engine.save(quantized, VocabTokenizer.from_keras(self.tokenizer), path)
+        return path, baseline, score
+
+    def load(self, model_path, tokenizer_path):
+        runtime = self.runtime
+        if runtime == 'auto':
+            # Quantized weights only exist for the NumPy runtime
+            runtime = 'keras' if tensorflow_available() and not self.quantization else 'numpy'
+        if runtime == 'numpy':
+            # Model and tokenizer both come from the .npz, so TensorFlow is never imported
+            self.model, self.tokenizer = numpy_engine.load(numpy_weights_path(model_path, self.quantization))
+            return
+        if runtime != 'keras':
+            raise ValueError(f"Unknown LSTM runtime {runtime!r}; expected 'keras', 'numpy' or 'auto'")
+        if self.quantization:
+            raise ValueError('Quantized weights need the NumPy runtime (HEALTHCARE_LSTM_RUNTIME=numpy)')
+        
+        # Load the model
+        self.model = keras().models.load_model(model_path)
+        
+        # Load the tokenizer (a .vocab file; legacy .pickle files still load)
+        self.tokenizer = load_tokenizer(tokenizer_path)
+
+    def num_classes(self):
+        return self.model.output_shape[-1]
+
+class LinearEngine:
+    """TF-IDF features + multinomial logistic regression (scikit-learn, no TensorFlow).
+
+    Training goes through the scikit-learn pipeline. Prediction skips it: the
+    fitted vocabulary, idf weights and coefficients are copied into plain
+    dicts/arrays, so scoring a message is a few dict lookups and one small
+    matrix product instead of sklearn's per-call validation.
+    """
+
+    name = 'linear'
+
+    def __init__(self, C=10.0, ngram_range=(1, 2)):
+        self.C = C
+        self.ngram_range = ngram_range
+        self.vectorizer = None
+        self.model = None
+        self.classes = 0
+        self._analyzer = None
+        self._columns = None
+
+    def fit_features(self, texts, labels, num_classes):
+        self.classes = num_classes
+        return list(texts), np.asarray(labels)
+
+    def vocab_size(self):
+        return len(self.vectorizer.vocabulary_) if self.vectorizer is not None else None
+
+    def build(self, vocab_size=None, num_classes=None):
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.linear_model import LogisticRegression
+        
+        if num_classes is not None:
+            self.classes = num_classes
+        self.vectorizer = TfidfVectorizer(ngram_range=self.ngram_range, sublinear_tf=True)
+        self.model = LogisticRegression(C=self.C, max_iter=1000)
+        return self.model
+
+    def train(self, X, y, epochs=None, batch_size=None, checkpoint_dir=None, patience=None):
+        # Epochs, batches and checkpoints only apply to the LSTM; the solver runs to convergence
+        self.model.fit(self.vectorizer.fit_transform(X), y)
+        self._compile()
+
+    def _compile(self):
+        self._analyzer = self.vectorizer.build_analyzer()
+        idf = self.vectorizer.idf_
+        
+        # Scores for every intent, including any with no training examples
+        coef = np.zeros((len(self.vectorizer.vocabulary_), self.classes))
+        intercept = np.full(self.classes, -np.inf)
+        classes = self.model.classes_
+        if len(classes) == 2:
+            # Binary logistic regression stores one column for the positive class
+            coef[:, classes[1]] = self.model.coef_[0]
+            intercept[classes] = [0.0, self.model.intercept_[0]]
+        else:
+            coef[:, classes] = self.model.coef_.T
+            intercept[classes] = self.model.intercept_
+        self._intercept = intercept
+        
+        # feature -> (idf, coefficient row), so a token needs a single lookup
+        self._columns = {
+            term: (idf[index], coef[index])
+            for term, index in self.vectorizer.vocabulary_.items()
+        }
+
+    def decision_function(self, texts):
+        scores = np.tile(self._intercept, (len(texts), 1))
+        for row, text in enumerate(texts):
+            counts = {}
+            for term in self._analyzer(text):
+                if term in self._columns:
+                    counts[term] = counts.get(term, 0) + 1
+            if not counts:
+                continue
+            weights = []
+            rows = []
+            for term, count in counts.items():
+                idf, coef = self._columns[term]
+                weights.append((1.0 + np.log(count)) * idf)
+                rows.append(coef)
+            weights = np.asarray(weights)
+            scores[row] += (weights / np.sqrt(weights @ weights)) @ np.asarray(rows)
+        return scores
+
+    def predict_proba(self, texts):
+        scores = self.decision_function(texts)
+        if len(self.model.classes_) == 2:
+            # Match LogisticRegression: sigmoid of the positive-class margin
+            classes = self.model.classes_
+            margin = scores[:, classes[1]] - scores[:, classes[0]]
+            proba = np.zeros_like(scores)
+            proba[:, classes[1]] = 1.0 / (1.0 + np.exp(-margin))
+            proba[:, classes[0]] = 1.0 - proba[:, classes[1]]
+            return proba
+        scores = scores - scores.max(axis=1, keepdims=True)
+        proba = np.exp(scores)
+        return proba / proba.sum(axis=1, keepdims=True)
+
+    def warm_up(self):
+        self.predict_proba([''])
+
+    def save(self, model_path, tokenizer_path=None):
+        # Settings as JSON and the fitted state as plain arrays, so loading needs no
+        # unpickling; the vocabulary lives in the same file, tokenizer_path is unused
+        vocabulary = self.vectorizer.vocabulary_
+        meta = {
+            'version': LINEAR_FORMAT_VERSION,
+            'C': self.C,
+            'ngram_range': list(self.ngram_range),
+            'classes': self.classes
+        }
+        # A file object, so numpy doesn't append .npz to the path
+        with open(model_path, 'wb') as handle:
+            np.savez_compressed(
+                handle,
+                meta=np.array(json.dumps(meta)),
+                terms=np.array(sorted(vocabulary, key=vocabulary.get)),
+                idf=self.vectorizer.idf_,
+                coef=self.model.coef_,
+                intercept=self.model.intercept_,
+                model_classes=self.model.classes_
+            )
+
+    def load(self, model_path, tokenizer_path=None):
+        with np.load(model_path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            if meta['version'] != LINEAR_FORMAT_VERSION:
+                raise ValueError(f'Unsupported linear model file version {meta["version"]}')
+            self.C = meta['C']
+            self.ngram_range = tuple(meta['ngram_range'])
+            self.build(num_classes=meta['classes'])
+            
+            # Refit-free: restore what fit() learned onto fresh estimators
+            self.vectorizer.vocabulary_ = {str(term): index for index, term in enumerate(data['terms'])}
+            self.vectorizer.idf_ = data['idf']
+            self.model.coef_ = data['coef']
+            self.model.intercept_ = data['intercept']
+            self.model.classes_ = data['model_classes']
+            self.model.n_features_in_ = self.model.coef_.shape[1]
+        self._compile()
+
+    def num_classes(self):
+        return self.classes
+
+ENGINES = {
+    'lstm': LSTMEngine,
+    'linear': LinearEngine
+}
+
+def training_intents(data):
+    """Intents (``tag``, ``patterns``, ``responses``) from a training JSON file.
+
+    Accepts the intents shape, or the knowledge base shipped as
+    training_data.json: each disease becomes an intent whose patterns are its
+    symptom list and that list with each symptom left out, and each
+    conversational entry (``{"greeting": [...], "response": ...}``) an intent
+    named after its key.
+    """
+    if 'intents' in data:
+        return data['intents']
+    intents = {}
+    for item in data['training_data']:
+        if 'disease' not in item:
+            tag = next(key for key in item if key != 'response')
+            patterns, response = item[tag], item['response']
+        else:
+            tag, symptoms, response = item['disease'], item['symptoms'], item['advice']
+            patterns = [' '.join(symptoms)]
+            if len(symptoms) > 2:
+                patterns += [' '.join(symptoms[:i] + symptoms[i + 1:]) for i in range(len(symptoms))]
+        # A disease listed twice becomes one intent with both symptom sets
+        intent = intents.setdefault(tag, {'tag': tag, 'patterns': [], 'responses': []})
+        intent['patterns'] += patterns
+        if response not in intent['responses']:
+            intent['responses'].append(response)
+    return list(intents.values())
+
+class HealthcareBot:
+    def __init__(self, engine=None, preprocessing=None):
+        self.preprocessor = TextPreprocessor(preprocessing or PREPROCESSING_MODE)
         self.responses = None
+        self.intent_responses = {}
         self.max_sequence_length = 20
         self.intent_names = []
+        
+        engine = engine or MODEL_ENGINE
+        if isinstance(engine, str):
+            if engine not in ENGINES:
+                raise ValueError(f"Unknown model engine {engine!r}; expected one of {', '.join(ENGINES)}")
+            engine = ENGINES[engine]()
+        self.engine = engine
+
+    @property
+    def model(self):
+        return self.engine.model
+
+    @property
+    def tokenizer(self):
+        return getattr(self.engine, 'tokenizer', None)
 
     def preprocess_text(self, text):
-        # Tokenize the text
-        tokens = word_tokenize(text.lower())
-        
-        # Remove stopwords and lemmatize
-        stop_words = set(stopwords.words('english'))
-        tokens = [self.lemmatizer.lemmatize(token) for token in tokens if token not in stop_words]
-        
-        return ' '.join(tokens)
+        return self.preprocessor.preprocess(text)
 
     def load_training_data(self, file_path):
         with open(file_path, 'r') as file:
@@ -43,102 +466,317 @@ class HealthcareBot:
         labels = []
         self.responses = {}
         
-        for intent in self.training_data['intents']:
+        for intent in training_intents(self.training_data):
             self.intent_names.append(intent['tag'])
+            self.intent_responses[intent['tag']] = intent['responses']
             for pattern in intent['patterns']:
-                patterns.append(self.preprocess_text(pattern))
+                patterns.append(pattern)
                 labels.append(len(self.intent_names) - 1)  # Use index as label
                 self.responses[pattern] = intent['responses']
         
-        # Create tokenizer
-        self.tokenizer = Tokenizer()
-        self.tokenizer.fit_on_texts(patterns)
-        
-        # Convert text to sequences
-        sequences = self.tokenizer.texts_to_sequences(patterns)
-        padded_sequences = pad_sequences(sequences, maxlen=self.max_sequence_length)
-        
-        # Convert labels to categorical format
-        y = np.zeros((len(labels), len(self.intent_names)))
-        for i, label in enumerate(labels):
-            y[i][label] = 1
-        
-        return padded_sequences, y
+        # Keras' validation_split holds out the trailing examples; shuffling (with a
+        # fixed seed) spreads that across intents instead of dropping the last ones
+        order = np.random.default_rng(0).permutation(len(patterns))
+        patterns = self.preprocessor.preprocess_many([patterns[i] for i in order])
+        labels = [labels[i] for i in order]
+        return self.engine.fit_features(patterns, labels, len(self.intent_names))
+
+    def vocab_size(self):
+        return self.engine.vocab_size()
 
     def build_model(self, vocab_size, num_classes):
-        model = Sequential([
-            Embedding(vocab_size, 128, input_length=self.max_sequence_length),
-            LSTM(64, return_sequences=True),
-            LSTM(64),
-            Dense(64, activation='relu'),
-            Dropout(0.5),
-            Dense(num_classes, activation='softmax')
-        ])
-        
-        model.compile(optimizer='adam',
-                     loss='categorical_crossentropy',
-                     metrics=['accuracy'])
-        
-        self.model = model
-        return model
+        return self.engine.build(vocab_size, num_classes)
 
-    def train(self, X, y, epochs=100, batch_size=32):
-        self.model.fit(X, y,
-                      epochs=epochs,
-                      batch_size=batch_size,
-                      validation_split=0.2)
+    def train(self, X, y, epochs=100, batch_size=32, checkpoint_dir=None, patience=None):
+        self.engine.train(X, y, epochs=epochs, batch_size=batch_size,
+                          checkpoint_dir=checkpoint_dir, patience=patience)
 
-    def predict(self, text):
-        # Preprocess input text
-        processed_text = self.preprocess_text(text)
+    def train_corpus(self, paths, epochs=100, batch_size=32, validation_fraction=0.2,
+                     checkpoint_dir=None, patience=None, shuffle_buffer=10000):
+        """Train on a JSONL corpus (files, directories or shard globs) without loading it into memory.
+
+        One streaming pass collects the intents and fits the tokenizer; training
+        then streams the corpus again every epoch. Examples are split into
+        training and validation by a hash of their text. With ``checkpoint_dir``
+        the vocabulary and intents are saved there, and rerunning the same
+        command resumes from the last finished epoch.
+        """
+        if not hasattr(self.engine, 'train_dataset'):
+            raise ValueError(f'Streaming training is not supported by the {self.engine.name} engine')
+        files = corpus.corpus_files(paths)
+        vocab_path = os.path.join(checkpoint_dir, 'tokenizer.vocab') if checkpoint_dir else None
+        intents_path = os.path.join(checkpoint_dir, 'intents.json') if checkpoint_dir else None
         
-        # Convert to sequence
-        sequence = self.tokenizer.texts_to_sequences([processed_text])
-        padded_sequence = pad_sequences(sequence, maxlen=self.max_sequence_length)
+        if vocab_path and os.path.exists(vocab_path) and os.path.exists(intents_path):
+            # Resuming: reuse the vocabulary the checkpointed weights were trained with
+            with open(intents_path) as f:
+                intents = json.load(f)
+            self.intent_names = intents['names']
+            self.intent_responses = intents['responses']
+            self.engine.tokenizer = VocabTokenizer.from_file(vocab_path)
+        else:
+            self.intent_names = []
+            self.intent_responses = {}
+            
+            def texts():
+                batch = []
+                for record in corpus.iter_records(files):
+                    tag = record['tag']
+                    if tag not in self.intent_responses:
+                        self.intent_names.append(tag)
+                        self.intent_responses[tag] = []
+                    for response in record.get('responses', ()):
+                        if response not in self.intent_responses[tag]:
+                            self.intent_responses[tag].append(response)
+                    batch.extend(record['patterns'] if 'patterns' in record else [record['pattern']])
+                    if len(batch) >= 1000:
+                        yield from self.preprocessor.preprocess_many(batch)
+                        batch = []
+                yield from self.preprocessor.preprocess_many(batch)
+            
+            self.engine.fit_vocabulary(texts())
+            if checkpoint_dir:
+                os.makedirs(checkpoint_dir, exist_ok=True)
+                VocabTokenizer.from_keras(self.engine.tokenizer).save(vocab_path)
+                with open(intents_path, 'w') as f:
+                    json.dump({'names': self.intent_names, 'responses': self.intent_responses}, f)
         
-        # Get prediction
-        prediction = self.model.predict(padded_sequence)
+        if self.engine.model is None:
+            self.engine.build(self.vocab_size(), len(self.intent_names))
         
-        # Get the intent with highest probability
-        intent_index = np.argmax(prediction)
+        label_ids = {tag: index for index, tag in enumerate(self.intent_names)}
         
-        # Get random response from the predicted intent
-        intent_tag = self.intent_names[intent_index]
-        for intent in self.training_data['intents']:
-            if intent['tag'] == intent_tag:
-                return np.random.choice(intent['responses'])
+        def split(name):
+            return lambda path: corpus.iter_examples([path], name, validation_fraction)
         
-        return "I'm sorry, I don't understand. Could you please rephrase that?"
+        train_ds = self.engine.dataset(files, split('train'), label_ids, self.preprocessor.preprocess_many,
+                                       batch_size, shuffle_buffer)
+        val_ds = None
+        if validation_fraction:
+            val_ds = self.engine.dataset(files, split('validation'), label_ids, self.preprocessor.preprocess_many,
+                                         batch_size)
+        self.engine.train_dataset(train_ds, val_ds, epochs, checkpoint_dir, patience)
 
-    def save_model(self, model_path, tokenizer_path):
-        # Save the model
-        self.model.save(model_path)
+    def predict(self, text):
+        return self.predict_batch([text])[0]
+
+    def predict_proba_batch(self, texts):
+        # Preprocess every input, then score them together
+        processed = self.preprocessor.preprocess_many(texts)
+        metrics.model_batch_size.observe(len(texts), engine=self.engine.name)
+        with metrics.model_inference_seconds.time(engine=self.engine.name):
+            return self.engine.predict_proba(processed)
+
+    def predict_batch(self, texts):
+        if not texts:
+            return []
         
-        # Save the tokenizer
-        with open(tokenizer_path, 'wb') as handle:
-            pickle.dump(self.tokenizer, handle, protocol=pickle.HIGHEST_PROTOCOL)
+        predictions = self.predict_proba_batch(texts)
+        
+        # Get a random response for the most likely intent of each input
+        responses = []
+        for intent_index in np.argmax(predictions, axis=1):
+            intent_name = self.intent_names[intent_index] if intent_index < len(self.intent_names) else None
+            intent_responses = self.intent_responses.get(intent_name)
+            if intent_responses:
+                responses.append(np.random.choice(intent_responses))
+            else:
+                responses.append("I'm sorry, I don't understand. Could you please rephrase that?")
+        return responses
+
+    def save_model(self, model_path, tokenizer_path):
+        self.engine.save(model_path, tokenizer_path)
+        with open(model_intents_path(model_path), 'w') as f:
+            json.dump({'names': self.intent_names, 'responses': self.intent_responses}, f)
+
+    def publish_quantized(self, model_path, X_val, y_val, mode='int8', max_accuracy_drop=None):
+        if not hasattr(self.engine, 'publish_quantized'):
+            raise ValueError(f'Quantization is not supported by the {self.engine.name} engine')
+        return self.engine.publish_quantized(model_path, X_val, y_val, mode, max_accuracy_drop)
 
     def load_model(self, model_path, tokenizer_path):
-        # Load the model
-        self.model = load_model(model_path)
-        
-        # Load the tokenizer
-        with open(tokenizer_path, 'rb') as handle:
-            self.tokenizer = pickle.load(handle)
+        self.engine.load(model_path, tokenizer_path)
+        with open(model_intents_path(model_path)) as f:
+            intents = json.load(f)
+        if len(intents['names']) != self.engine.num_classes():
+            raise ValueError(f"{model_intents_path(model_path)} lists {len(intents['names'])} intents "
+                             f'but the model has {self.engine.num_classes()} outputs')
+        self.intent_names = intents['names']
+        self.intent_responses = intents['responses']
+
+class MicroBatcher:
+    """Collects concurrent predict() calls into shared forward passes.
+
+    Callers block on their own result while a worker thread drains the queue,
+    waiting at most ``max_wait_ms`` to fill a batch of ``max_batch_size``.
+    If a batch raises, its texts are retried one at a time, so the error only
+    reaches the callers whose text caused it.
+    """
+
+    def __init__(self, bot, max_batch_size=32, max_wait_ms=5):
+        self.bot = bot
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, text):
+        future = Future()
+        self._queue.put((text, future))
+        return future
+
+    def predict(self, text, timeout=None):
+        return self.submit(text).result(timeout=timeout)
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            
+            try:
+                results = self.bot.predict_batch([text for text, _ in batch])
+            except Exception:
+                # Rerun the texts one by one, so only the callers whose text fails get the error
+                for text, future in batch:
+                    try:
+                        future.set_result(self.bot.predict_batch([text])[0])
+                    except Exception as e:
+                        future.set_exception(e)
+            else:
+                for (_, future), result in zip(batch, results):
+                    future.set_result(result)
+
+def get_bot():
+    """Return the process-wide bot, loading the saved model on first use."""
+    global _bot
+    if _bot is None:
+        with _bot_lock:
+            if _bot is None:
+                bot = HealthcareBot()
+                bot.load_model(MODEL_PATH, TOKENIZER_PATH)
+                _bot = bot
+    return _bot
+
+def get_predictor():
+    """Return what the web workers classify with: the inference daemon's client, or the local bot."""
+    global _predictor
+    if _predictor is None:
+        if INFERENCE_SOCKET:
+            from inference_server import InferenceClient
+            _predictor = InferenceClient(INFERENCE_SOCKET, timeout=INFERENCE_TIMEOUT,
+                                         fallback=lambda texts: get_bot().predict_batch(texts))
+        else:
+            _predictor = get_bot()
+    return _predictor
+
+def preload():
+    """Load and warm the model and preprocessing, e.g. in a server master process before workers fork."""
+    if INFERENCE_SOCKET:
+        # The daemon owns the model; workers only need the client
+        return get_predictor()
+    bot = get_bot()
+    if not any(bot.intent_responses.get(name) for name in bot.intent_names):
+        # Sharing a model that can only give the fallback reply would hide the problem
+        raise RuntimeError(f'The model loaded from {MODEL_PATH} has no intents to answer with; '
+                           f'retrain it with `python model.py`')
+    bot.engine.warm_up()
+    # Loads the NLTK data the preprocessing needs
+    bot.preprocess_text('warm up')
+    return bot
 
 if __name__ == '__main__':
-    # Example usage
-    bot = HealthcareBot()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Train the healthcare intent model')
+    parser.add_argument('--download-nltk', action='store_true',
+                        help='download missing NLTK data into $NLTK_DATA (or the NLTK default) and exit')
+    parser.add_argument('--engine', choices=sorted(ENGINES), default=MODEL_ENGINE,
+                        help='classifier backend to train (default: $HEALTHCARE_MODEL_ENGINE or lstm)')
+    parser.add_argument('--quantize', choices=numpy_engine.QUANTIZATION_MODES,
+                        help='also publish quantized weights for the NumPy runtime (lstm only)')
+    parser.add_argument('--max-accuracy-drop', type=float, default=QUANTIZATION_MAX_ACCURACY_DROP,
+                        help='refuse to publish quantized weights that lose more held-out accuracy than this')
+    parser.add_argument('--corpus', nargs='+',
+                        help='stream training examples from JSONL files, directories or shard globs '
+                             '(lstm only) instead of loading training_data.json')
+    parser.add_argument('--epochs', type=int, default=100)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--validation-fraction', type=float, default=0.2,
+                        help='share of a streamed corpus held out for validation')
+    parser.add_argument('--patience', type=int,
+                        help='stop after this many epochs without validation improvement')
+    parser.add_argument('--checkpoint-dir',
+                        help='save the best model and per-epoch state here; rerun to resume')
+    args = parser.parse_args()
     
-    # Load and preprocess training data
-    X, y = bot.load_training_data('training_data.json')
+    if args.download_nltk:
+        ensure_nltk_data(download=True)
+        raise SystemExit(0)
     
-    # Build and train the model
-    vocab_size = len(bot.tokenizer.word_index) + 1
-    num_classes = len(bot.intent_names)
+    # Example usage
+    bot = HealthcareBot(engine=args.engine)
     
-    bot.build_model(vocab_size, num_classes)
-    bot.train(X, y, epochs=100, batch_size=32)
+    if args.corpus:
+        try:
+            bot.train_corpus(args.corpus, epochs=args.epochs, batch_size=args.batch_size,
+                             validation_fraction=args.validation_fraction,
+                             checkpoint_dir=args.checkpoint_dir, patience=args.patience)
+        except ValueError as e:
+            raise SystemExit(str(e))
+    else:
+        # Load and preprocess training data
+        X, y = bot.load_training_data('training_data.json')
+        
+        # Build and train the model
+        vocab_size = bot.vocab_size()
+        num_classes = len(bot.intent_names)
+        
+        bot.build_model(vocab_size, num_classes)
+        bot.train(X, y, epochs=args.epochs, batch_size=args.batch_size,
+                  checkpoint_dir=args.checkpoint_dir, patience=args.patience)
     
     # Save the model
-    bot.save_model('healthcare_model.h5', 'tokenizer.pickle')
+    model_path = DEFAULT_MODEL_PATHS[args.engine]
+    bot.save_model(model_path, 'tokenizer.vocab')
+    
+    if args.quantize:
+        if args.corpus:
+            # Gate on (up to 10000 of) the streamed validation examples
+            label_ids = {tag: index for index, tag in enumerate(bot.intent_names)}
+            held_out = list(itertools.islice(
+                corpus.iter_examples(args.corpus, 'validation', args.validation_fraction), 10000))
+            if not held_out:
+                raise SystemExit('No validation examples to check the quantized model against')
+            texts = bot.preprocessor.preprocess_many([text for text, _ in held_out])
+            X_val = pad_sequences(bot.tokenizer.texts_to_sequences(texts), bot.engine.max_sequence_length)
+            y_val = np.asarray([label_ids[tag] for _, tag in held_out])
+        else:
+            # Gate on the same trailing split train() held out for validation
+            X_val, y_val = holdout_split(X, y)
+        try:
+            path, baseline, score = bot.publish_quantized(model_path, X_val, y_val, args.quantize,
+                                                         args.max_accuracy_drop)
+        except ValueError as e:
+            raise SystemExit(str(e))
+        print(f'Wrote {path} (held-out accuracy {score:.4f} vs {baseline:.4f} float)')
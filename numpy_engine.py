@@ -0,0 +1,270 @@
+"""NumPy-only inference for the Keras intent model.
+
+``export_model`` writes the Embedding/LSTM/Dense weights and the tokenizer
+settings of a trained model into one ``.npz`` file; ``load`` reads it back into
+a ``NumpyModel`` and ``VocabTokenizer`` that reproduce the Keras forward pass
+and ``Tokenizer.texts_to_sequences`` without importing TensorFlow.
+
+``quantize`` stores the embedding and kernel matrices as int8 (symmetric,
+one scale per output channel or embedding row) or float16. They stay
+quantized in memory and are dequantized on the fly, one matrix at a time and
+once per forward pass (the LSTM kernels before the step loop).
+
+Usage: python numpy_engine.py [healthcare_model.h5] [tokenizer.vocab] [healthcare_model.npz]
+"""
+import json
+
+import numpy as np
+
+from vocab import VocabTokenizer, load_tokenizer
+
+FORMAT_VERSION = 1
+QUANTIZATION_MODES = ('int8', 'float16')
+
+
+def sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def relu(x):
+    return np.maximum(x, 0)
+
+
+def softmax(x):
+    e = np.exp(x - x.max(axis=-1, keepdims=True))
+    return e / e.sum(axis=-1, keepdims=True)
+
+
+ACTIVATIONS = {
+    'linear': lambda x: x,
+    'relu': relu,
+    'sigmoid': sigmoid,
+    'softmax': softmax,
+    'tanh': np.tanh
+}
+
+
+class Int8Weight:
+    """Symmetric int8 matrix; ``scale`` broadcasts against ``q`` (per row or per column)."""
+
+    def __init__(self, q, scale):
+        self.q = q
+        self.scale = scale
+
+    @classmethod
+    def quantize(cls, weight, axis):
+        # One scale per slice along ``axis`` (reduced over every other axis)
+        reduce_axes = tuple(i for i in range(weight.ndim) if i != axis % weight.ndim)
+        scale = np.abs(weight).max(axis=reduce_axes, keepdims=True) / 127.0
+        scale[scale == 0] = 1.0
+        q = np.clip(np.round(weight / scale), -127, 127).astype(np.int8)
+        return cls(q, scale.astype(np.float32))
+
+    @property
+    def shape(self):
+        return self.q.shape
+
+    @property
+    def nbytes(self):
+        return self.q.nbytes + self.scale.nbytes
+
+
+def matmul(x, weight):
+    if isinstance(weight, Int8Weight):
+        # Per-column scales factor out of the product
+        return (x @ weight.q.astype(np.float32)) * weight.scale
+    if weight.dtype != np.float32:
+        # numpy has no fast float16 matmul; widen just this matrix
+        return x @ weight.astype(np.float32)
+    return x @ weight
+
+
+def dequantize(weight):
+    """A float32 array of ``weight`` (float32 weights are returned as they are)."""
+    if isinstance(weight, Int8Weight):
+        return weight.q.astype(np.float32) * weight.scale
+    return weight.astype(np.float32, copy=False)
+
+
+def gather(weight, ids):
+    if isinstance(weight, Int8Weight):
+        return weight.q[ids].astype(np.float32) * weight.scale[ids]
+    return weight[ids].astype(np.float32, copy=False)
+
+
+class NumpyModel:
+    """Forward pass of a Sequential Embedding -> LSTM... -> Dense... stack.
+
+    Callable like a Keras model (``model(padded, training=False)``) and returns
+    the output probabilities as a float32 array.
+    """
+
+    def __init__(self, layers):
+        self.layers = layers
+        units = [layer['weights'][-1].shape[-1] for layer in layers if layer['type'] == 'dense']
+        self.output_shape = (None, units[-1])
+
+    def __call__(self, inputs, training=False):
+        x = np.asarray(inputs)
+        for layer in self.layers:
+            weights = layer['weights']
+            if layer['type'] == 'embedding':
+                x = gather(weights[0], x)
+            elif layer['type'] == 'lstm':
+                x = lstm(x, *weights, return_sequences=layer['return_sequences'])
+            else:
+                x = ACTIVATIONS[layer['activation']](matmul(x, weights[0]) + weights[1])
+        return x
+
+    @property
+    def nbytes(self):
+        return sum(weight.nbytes for layer in self.layers for weight in layer['weights'])
+
+
+def lstm(x, kernel, recurrent_kernel, bias, return_sequences=False):
+    """Keras LSTM (tanh activation, sigmoid recurrent activation, gates ordered i, f, c, o)."""
+    batch, steps, _ = x.shape
+    units = recurrent_kernel.shape[0]
+    # Widen quantized kernels once per forward pass, not once per timestep
+    kernel = dequantize(kernel)
+    recurrent_kernel = dequantize(recurrent_kernel)
+    # Input projections for every timestep in one matrix product; only the
+    # recurrent part has to run step by step
+    projected = x @ kernel + bias
+    h = np.zeros((batch, units), dtype=x.dtype)
+    c = np.zeros((batch, units), dtype=x.dtype)
+    outputs = np.empty((batch, steps, units), dtype=x.dtype) if return_sequences else None
+
+    for step in range(steps):
+        z = projected[:, step] + h @ recurrent_kernel
+        i = sigmoid(z[:, :units])
+        f = sigmoid(z[:, units:2 * units])
+        g = np.tanh(z[:, 2 * units:3 * units])
+        o = sigmoid(z[:, 3 * units:])
+        c = f * c + i * g
+        h = o * np.tanh(c)
+        if return_sequences:
+            outputs[:, step] = h
+    return outputs if return_sequences else h
+
+
+def from_keras(model):
+    """Build a ``NumpyModel`` holding the float32 weights of a Keras model."""
+    layers = []
+    for layer in model.layers:
+        kind = type(layer).__name__
+        config = layer.get_config()
+        if kind == 'Dropout':
+            continue  # Inference-time no-op
+        if kind == 'Embedding':
+            if config.get('mask_zero'):
+                raise ValueError('Masked embeddings are not supported')
+            spec = {'type': 'embedding'}
+        elif kind == 'LSTM':
+            if (config['activation'], config['recurrent_activation']) != ('tanh', 'sigmoid') or config['go_backwards']:
+                raise ValueError(f'Unsupported LSTM configuration in layer {layer.name}')
+            spec = {'type': 'lstm', 'return_sequences': config['return_sequences']}
+        elif kind == 'Dense':
+            if config['activation'] not in ACTIVATIONS or not config['use_bias']:
+                raise ValueError(f'Unsupported Dense configuration in layer {layer.name}')
+            spec = {'type': 'dense', 'activation': config['activation']}
+        else:
+            raise ValueError(f'Unsupported layer type {kind}')
+
+        spec['weights'] = [weight.astype(np.float32) for weight in layer.get_weights()]
+        layers.append(spec)
+    return NumpyModel(layers)
+
+
+def quantize(model, mode='int8'):
+    """Return a copy of ``model`` with embedding and kernel matrices quantized; biases stay float32."""
+    if mode not in QUANTIZATION_MODES:
+        raise ValueError(f"Unknown quantization {mode!r}; expected one of {', '.join(QUANTIZATION_MODES)}")
+    layers = []
+    for layer in model.layers:
+        weights = []
+        for weight in layer['weights']:
+            if isinstance(weight, Int8Weight) or weight.ndim < 2:
+                weights.append(weight)
+            elif mode == 'float16':
+                weights.append(weight.astype(np.float16))
+            else:
+                # Embeddings are read a row at a time, kernels a column per output unit
+                weights.append(Int8Weight.quantize(weight, axis=0 if layer['type'] == 'embedding' else -1))
+        layers.append(dict(layer, weights=weights))
+    return NumpyModel(layers)
+
+
+def accuracy(model, inputs, labels):
+    """Top-1 accuracy of ``model`` on padded ``inputs`` against integer or one-hot ``labels``."""
+    labels = np.asarray(labels)
+    if labels.ndim > 1:
+        labels = labels.argmax(axis=1)
+    return float(np.mean(model(inputs).argmax(axis=1) == labels))
+
+
+def save(model, tokenizer, npz_path):
+    """Write a ``NumpyModel`` and ``VocabTokenizer`` to ``npz_path``."""
+    specs = []
+    arrays = {}
+    for index, layer in enumerate(model.layers):
+        spec = dict(layer, weights=len(layer['weights']))
+        for position, weight in enumerate(layer['weights']):
+            if isinstance(weight, Int8Weight):
+                arrays[f'layer{index}_{position}'] = weight.q
+                arrays[f'layer{index}_{position}_scale'] = weight.scale
+            else:
+                arrays[f'layer{index}_{position}'] = weight
+        specs.append(spec)
+
+    meta = {
+        'version': FORMAT_VERSION,
+        'layers': specs,
+        'tokenizer': tokenizer.to_config()
+    }
+    np.savez_compressed(npz_path, meta=np.array(json.dumps(meta)), **arrays)
+
+
+def export_model(model, tokenizer, npz_path):
+    """Write a Keras model's weights and its tokenizer settings to ``npz_path``."""
+    save(from_keras(model), VocabTokenizer.from_keras(tokenizer), npz_path)
+
+
+def export_h5(model_path, tokenizer_path, npz_path):
+    from tensorflow import keras
+
+    model = keras.models.load_model(model_path)
+    export_model(model, load_tokenizer(tokenizer_path), npz_path)
+
+
+def load(npz_path):
+    """Return ``(NumpyModel, VocabTokenizer)`` from an exported ``.npz`` file."""
+    with np.load(npz_path, allow_pickle=False) as data:
+        meta = json.loads(str(data['meta']))
+        if meta['version'] != FORMAT_VERSION:
+            raise ValueError(f'Unsupported weights file version {meta["version"]}')
+        layers = []
+        for index, spec in enumerate(meta['layers']):
+            layer = dict(spec)
+            layer['weights'] = []
+            for position in range(spec['weights']):
+                key = f'layer{index}_{position}'
+                if f'{key}_scale' in data:
+                    layer['weights'].append(Int8Weight(data[key], data[f'{key}_scale']))
+                else:
+                    layer['weights'].append(data[key])
+            layers.append(layer)
+    return NumpyModel(layers), VocabTokenizer(**meta['tokenizer'])
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Export healthcare_model.h5 for NumPy-only inference')
+    parser.add_argument('model_path', nargs='?', default='healthcare_model.h5')
+    parser.add_argument('tokenizer_path', nargs='?', default='tokenizer.vocab')
+    parser.add_argument('npz_path', nargs='?', default='healthcare_model.npz')
+    args = parser.parse_args()
+
+    export_h5(args.model_path, args.tokenizer_path, args.npz_path)
+    print(f'Wrote {args.npz_path}')
@@ -0,0 +1,79 @@
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import os
+import threading
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+class HasherBusy(Exception):
+    """Too many password hashes are already queued; the caller should shed the request."""
+
+
+class PasswordHasher:
+    """Runs PBKDF2 password hashing on a bounded thread pool.
+
+    ``hashlib.pbkdf2_hmac`` releases the GIL, so up to ``max_workers`` hashes
+    run in parallel while request threads keep serving other work. At most
+    ``max_pending`` hashes may be running or queued; beyond that ``hash`` and
+    ``verify`` raise ``HasherBusy`` immediately instead of piling up behind a
+    login storm. ``iterations`` is the PBKDF2-SHA256 work factor for new hashes.
+    """
+
+    def __init__(self, iterations=600000, max_workers=None, max_pending=64, timeout=10.0):
+        self.iterations = iterations
+        self.method = f'pbkdf2:sha256:{iterations}'
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.rejected = 0
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+        # Verified against when the user doesn't exist, so unknown names take as long as wrong passwords.
+        # Made here, so no request thread pays for it
+        self._dummy_hash = generate_password_hash('dummy password', self.method)
+
+    def _submit(self, func, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise HasherBusy('Too many password checks in progress')
+        try:
+            future = self._pool().submit(func, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:  # Only an alias of the builtin TimeoutError from Python 3.11
+            raise HasherBusy(f'Password check took longer than {self.timeout}s') from None
+
+    def _pool(self):
+        # Threads don't survive fork, so a preforked worker starts its own pool
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix='password-hash')
+                    self._pid = os.getpid()
+        return self._executor
+
+    def hash(self, password):
+        return self._submit(generate_password_hash, password, self.method)
+
+    def verify(self, pwhash, password):
+        if pwhash is None:
+            self._submit(check_password_hash, self._dummy_hash, password)
+            return False
+        return self._submit(check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        """True if ``pwhash`` was made with a different method or work factor than new hashes."""
+        return not pwhash.startswith(self.method + '$')
+
+    def stats(self):
+        return {
+            'iterations': self.iterations,
+            'max_workers': self.max_workers,
+            'rejected': self.rejected
+        }
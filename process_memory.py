@@ -0,0 +1,29 @@
+"""Memory of a process as the kernel accounts it for forked workers.
+
+RSS counts every resident page, including those still shared with the
+master after fork; PSS splits shared pages between the processes sharing
+them; USS counts only the pages private to the process, i.e. what killing it
+would free. Linux only (``/proc/<pid>/smaps_rollup``, kernel 4.14+).
+"""
+import os
+
+FIELDS = {
+    'Rss:': 'rss',
+    'Pss:': 'pss',
+    'Private_Clean:': 'private_clean',
+    'Private_Dirty:': 'private_dirty',
+    'Shared_Clean:': 'shared_clean',
+    'Shared_Dirty:': 'shared_dirty'
+}
+
+
+def memory_usage(pid=None):
+    """Return rss, pss, uss and the shared/private breakdown of ``pid`` (default: this process) in MB."""
+    values = {}
+    with open(f'/proc/{pid or os.getpid()}/smaps_rollup') as f:
+        for line in f:
+            fields = line.split()
+            if fields[0] in FIELDS:
+                values[FIELDS[fields[0]]] = int(fields[1]) / 1024
+    values['uss'] = values['private_clean'] + values['private_dirty']
+    return values
@@ -0,0 +1,181 @@
+"""Low-overhead sampling profiler for selected requests.
+
+A background thread wakes every ``interval`` seconds and records the Python
+stack of each thread currently inside a profiled request (from
+``sys._current_frames()``); nothing runs in the profiled threads themselves.
+Samples are aggregated as collapsed stacks (``root;frame;frame count``, as
+read by flamegraph.pl and speedscope) and appended to
+``<output_dir>/profile-<pid>.collapsed`` every ``flush_interval`` seconds,
+rotating the file once it exceeds ``max_bytes``.
+
+Capture windows profile every request for a while. The window's end time is
+kept in ``<output_dir>/window`` so that starting one from any worker reaches
+all the workers sharing the directory (each rereads it at most once a second).
+
+The sampler thread only runs while something is being profiled, and starts
+per process, so a profiler created before a preforking server forks works in
+its workers.
+"""
+from contextlib import contextmanager
+import logging
+import os
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+WINDOW_POLL_INTERVAL = 1.0  # seconds between rereads of the shared window file
+
+
+def frame_label(frame):
+    code = frame.f_code
+    return f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
+
+
+def collapse(frame, root):
+    labels = []
+    while frame is not None:
+        labels.append(frame_label(frame))
+        frame = frame.f_back
+    labels.append(root)
+    return ';'.join(reversed(labels))
+
+
+class SamplingProfiler:
+    def __init__(self, output_dir, interval=0.01, flush_interval=10.0, max_bytes=10 * 1024 * 1024, backup_count=5):
+        self.output_dir = output_dir
+        self.interval = interval
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.samples_taken = 0
+        self.flushes = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._active = {}  # thread id -> root label of the request it is running
+        self._stacks = {}  # collapsed stack -> samples since the last flush
+        self._window_until = 0.0  # wall-clock time, shared through the window file
+        self._window_checked = -WINDOW_POLL_INTERVAL
+        self._pid = None
+
+    def window_active(self):
+        now = time.monotonic()
+        if now - self._window_checked >= WINDOW_POLL_INTERVAL:
+            self._window_checked = now
+            try:
+                with open(self._window_path()) as f:
+                    self._window_until = float(f.read())
+            except (OSError, ValueError):
+                self._window_until = 0.0
+        return time.time() < self._window_until
+
+    def start_window(self, seconds):
+        """Profile every request, in every process sharing ``output_dir``, for the next ``seconds``."""
+        self._set_window(time.time() + seconds)
+
+    def stop_window(self):
+        self._set_window(0.0)
+        self.flush()
+
+    @contextmanager
+    def track(self, label):
+        """Sample the current thread, under the root frame ``label``, until the block exits."""
+        if self._pid != os.getpid():
+            self._start()
+        thread_id = threading.get_ident()
+        with self._wake:
+            self._active[thread_id] = label
+            self._wake.notify()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._active.pop(thread_id, None)
+
+    def sample(self):
+        with self._lock:
+            active = dict(self._active)
+        if not active:
+            return
+        frames = sys._current_frames()
+        stacks = [collapse(frames[thread_id], label) for thread_id, label in active.items() if thread_id in frames]
+        with self._lock:
+            for stack in stacks:
+                self._stacks[stack] = self._stacks.get(stack, 0) + 1
+            self.samples_taken += len(stacks)
+
+    def flush(self):
+        with self._lock:
+            stacks, self._stacks = self._stacks, {}
+        if not stacks:
+            return None
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, f'profile-{os.getpid()}.collapsed')
+        if os.path.exists(path) and os.path.getsize(path) >= self.max_bytes:
+            self._rotate(path)
+        with open(path, 'a') as f:
+            f.writelines(f'{stack} {count}\n' for stack, count in stacks.items())
+        self.flushes += 1
+        return path
+
+    def stats(self):
+        return {
+            'window_active': self.window_active(),
+            'window_remaining': max(self._window_until - time.time(), 0.0),
+            'active_requests': len(self._active),
+            'samples': self.samples_taken,
+            'flushes': self.flushes
+        }
+
+    def _window_path(self):
+        return os.path.join(self.output_dir, 'window')
+
+    def _set_window(self, until):
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = self._window_path()
+        with open(f'{path}.{os.getpid()}', 'w') as f:
+            f.write(repr(until))
+        os.replace(f'{path}.{os.getpid()}', path)
+        self._window_until = until
+        self._window_checked = time.monotonic()
+
+    def _rotate(self, path):
+        # profile.collapsed -> .1 -> .2 ... dropping the oldest, like RotatingFileHandler
+        for index in range(self.backup_count - 1, 0, -1):
+            if os.path.exists(f'{path}.{index}'):
+                os.replace(f'{path}.{index}', f'{path}.{index + 1}')
+        if self.backup_count:
+            os.replace(path, f'{path}.1')
+        else:
+            os.remove(path)
+
+    def _start(self):
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            # Threads don't survive fork, so each process gets its own sampler
+            self._pid = os.getpid()
+            self._active = {}
+            self._stacks = {}
+            threading.Thread(target=self._run, name='sampling-profiler', daemon=True).start()
+
+    def _run(self):
+        next_flush = time.monotonic() + self.flush_interval
+        while True:
+            with self._wake:
+                while not self._active:
+                    remaining = next_flush - time.monotonic()
+                    if self._stacks and remaining <= 0:
+                        break
+                    # Idle: sleep until a request is tracked, or until pending samples are due
+                    self._wake.wait(remaining if self._stacks else None)
+            if self._active:
+                time.sleep(self.interval)
+                self.sample()
+            if time.monotonic() >= next_flush:
+                try:
+                    self.flush()
+                except OSError:
+                    logger.exception('Failed to write profile to %s', self.output_dir)
+                next_flush = time.monotonic() + self.flush_interval
@@ -0,0 +1,236 @@
+from collections import deque
+import json
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+
+class PatternAutomaton:
+    """Aho-Corasick automaton that reports every pattern found in a text in one pass.
+
+    Matching is plain substring matching (patterns may overlap or nest), which is
+    what the chat handlers have always used with ``pattern in message``.
+
+    With ``dense`` every state gets its full transition table (failure links
+    folded in), so scanning costs one dict lookup per character. That trades
+    memory for speed and suits small pattern sets such as the chat rules.
+    """
+
+    def __init__(self, patterns, dense=False):
+        self.patterns = list(patterns)
+        self.dense = dense
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+
+        for pattern_id, pattern in enumerate(self.patterns):
+            state = 0
+            for ch in pattern:
+                next_state = self._goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][ch] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                state = next_state
+            self._out[state] = self._out[state] + (pattern_id,)
+
+        # Breadth-first pass to wire failure links and merge the outputs of
+        # every suffix state, so matching never has to walk the links for output
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(ch, 0)
+                self._out[next_state] = self._out[next_state] + self._out[self._fail[next_state]]
+
+        if dense:
+            # Breadth-first order guarantees a state's failure target is already dense
+            queue = deque(self._goto[0].values())
+            while queue:
+                state = queue.popleft()
+                queue.extend(self._goto[state].values())
+                self._goto[state] = {**self._goto[self._fail[state]], **self._goto[state]}
+            self._fail = [0] * len(self._goto)
+
+    def iter_matches(self, text):
+        """Yield ``(end_index, pattern_id)`` for every occurrence, in text order."""
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for index, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for pattern_id in out[state]:
+                yield index + 1, pattern_id
+
+    def find_positions(self, text):
+        """Return ``{pattern_id: [end_index, ...]}`` for every pattern found in ``text``."""
+        goto, fail, out = self._goto, self._fail, self._out
+        positions = {}
+        state = 0
+        dense = self.dense
+        for index, ch in enumerate(text, 1):
+            if not dense:
+                while state and ch not in goto[state]:
+                    state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                for pattern_id in out[state]:
+                    if pattern_id in positions:
+                        positions[pattern_id].append(index)
+                    else:
+                        positions[pattern_id] = [index]
+        return positions
+
+    def find_all(self, text):
+        """Return the set of pattern ids that occur anywhere in ``text``."""
+        goto, fail, out = self._goto, self._fail, self._out
+        found = set()
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found.update(out[state])
+        return found
+
+
+class SymptomIndex:
+    """Inverted symptom -> disease index built once from ``training_data.json``.
+
+    Disease ids are positions in ``self.entries`` (the knowledge base entries that
+    carry symptoms, in file order), so ranking ties resolve the same way the
+    original list scan did.
+    """
+
+    def __init__(self, training_data):
+        self.entries = [item for item in training_data if 'symptoms' in item]
+        self.symptoms = []   # symptom id -> lowercase symptom
+        self.forms = []      # symptom id -> original spellings, for display
+        self.postings = []   # symptom id -> ids of the entries listing it
+        symptom_ids = {}
+
+        for entry_id, item in enumerate(self.entries):
+            seen = set()
+            for symptom in item['symptoms']:
+                key = symptom.lower()
+                symptom_id = symptom_ids.get(key)
+                if symptom_id is None:
+                    symptom_id = symptom_ids[key] = len(self.symptoms)
+                    self.symptoms.append(key)
+                    self.forms.append(set())
+                    self.postings.append([])
+                self.forms[symptom_id].add(symptom)
+                if symptom_id not in seen:
+                    seen.add(symptom_id)
+                    self.postings[symptom_id].append(entry_id)
+
+        self.symptom_ids = symptom_ids
+        self.matcher = PatternAutomaton(self.symptoms)
+
+    @classmethod
+    def from_file(cls, file_path):
+        with open(file_path, 'r') as f:
+            return cls(json.load(f)['training_data'])
+
+    def match(self, message):
+        """Return the ids of every known symptom mentioned in ``message``."""
+        return self.matcher.find_all(message.lower())
+
+    def original_forms(self, symptom_ids):
+        forms = set()
+        for symptom_id in symptom_ids:
+            forms.update(self.forms[symptom_id])
+        return forms
+
+    def rank(self, symptom_ids):
+        """Return ``[(entry, match_count), ...]`` best first.
+
+        Ties keep knowledge base order, matching the stable sort in the
+        original ``check_symptoms``.
+        """
+        counts = {}
+        for symptom_id in symptom_ids:
+            for entry_id in self.postings[symptom_id]:
+                counts[entry_id] = counts.get(entry_id, 0) + 1
+        ranked = sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))
+        return [(self.entries[entry_id], count) for entry_id, count in ranked]
+
+
+class RelatedConditions:
+    """Vectorized related-condition ranking over a SymptomIndex.
+
+    The disease x symptom relation is held as a sparse incidence matrix, so
+    scoring a request is one matrix-vector product plus boolean masks for the
+    category filters, independent of how many diseases the catalogue holds.
+    """
+
+    def __init__(self, index, respiratory_infections=(), chronic_respiratory=(),
+                 emergency_conditions=(), mild_symptoms=(), severe_symptoms=()):
+        self.index = index
+        self.mild_symptoms = frozenset(mild_symptoms)
+        self.severe_symptoms = frozenset(severe_symptoms)
+
+        rows = [entry_id for postings in index.postings for entry_id in postings]
+        cols = [symptom_id for symptom_id, postings in enumerate(index.postings) for _ in postings]
+        self.incidence = csr_matrix(
+            (np.ones(len(rows), dtype=np.int32), (rows, cols)),
+            shape=(len(index.entries), len(index.symptoms))
+        )
+
+        diseases = [item['disease'] for item in index.entries]
+        self.diseases = diseases
+        self.is_respiratory_infection = np.array([d in respiratory_infections for d in diseases], dtype=bool)
+        self.is_chronic_respiratory = np.array([d in chronic_respiratory for d in diseases], dtype=bool)
+        self.is_emergency = np.array([d in emergency_conditions for d in diseases], dtype=bool)
+
+        self.entries_by_disease = {}
+        for entry_id, disease in enumerate(diseases):
+            self.entries_by_disease.setdefault(disease, []).append(entry_id)
+
+        # Emergency outranks any match count; the reversed position breaks ties
+        # in catalogue order, like the stable sort this replaces
+        self._emergency_weight = len(index.symptoms) + 1
+        self._position_tiebreak = np.arange(len(diseases) - 1, -1, -1, dtype=np.int64)
+
+    def symptom_vector(self, symptoms):
+        vector = np.zeros(len(self.index.symptoms), dtype=np.int32)
+        ids = [self.index.symptom_ids[s] for s in symptoms if s in self.index.symptom_ids]
+        vector[ids] = 1
+        return vector
+
+    def top(self, user_symptoms, current_disease, limit=3):
+        """Return up to ``limit`` disease names related to ``user_symptoms``."""
+        user_symptoms_lower = set(s.lower() for s in user_symptoms)
+        has_mild = not user_symptoms_lower.isdisjoint(self.mild_symptoms)
+        has_severe = not user_symptoms_lower.isdisjoint(self.severe_symptoms)
+
+        counts = self.incidence @ self.symptom_vector(user_symptoms_lower)
+        keep = counts > 0
+        keep[self.entries_by_disease.get(current_disease, [])] = False
+
+        # Skip chronic conditions for mild symptoms, mild conditions for severe ones
+        if has_mild and not has_severe:
+            keep &= ~self.is_chronic_respiratory
+        if has_severe:
+            keep &= ~self.is_respiratory_infection
+
+        candidates = np.flatnonzero(keep)
+        if not len(candidates):
+            return []
+
+        score = self.is_emergency[candidates] * self._emergency_weight + counts[candidates]
+        key = score.astype(np.int64) * len(self.diseases) + self._position_tiebreak[candidates]
+        if len(candidates) > limit:
+            top = np.argpartition(-key, limit - 1)[:limit]
+        else:
+            top = np.arange(len(candidates))
+        top = top[np.argsort(-key[top])]
+        return [self.diseases[entry_id] for entry_id in candidates[top]]
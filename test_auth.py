@@ -0,0 +1,111 @@
+import threading
+
+import pytest
+from sqlalchemy import event
+
+import app as app_module
+from app import User, app, db
+import password_hashing
+from password_hashing import HasherBusy, PasswordHasher
+
+USERNAME = 'auth_test_user'
+EMAIL = 'auth_test@example.com'
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setitem(app.config, 'WTF_CSRF_ENABLED', False)
+    # A cheap work factor keeps the tests fast
+    monkeypatch.setattr(app_module, 'password_hasher', PasswordHasher(iterations=1000, max_workers=2))
+    with app.app_context():
+        db.create_all()
+        User.query.filter(User.username.like('auth_test%')).delete(synchronize_session=False)
+        db.session.commit()
+    yield app.test_client()
+    with app.app_context():
+        User.query.filter(User.username.like('auth_test%')).delete(synchronize_session=False)
+        db.session.commit()
+
+
+def register(client, username=USERNAME, email=EMAIL, password='secret pass'):
+    return client.post('/register', data={
+        'username': username, 'email': email, 'password': password, 'confirm_password': password
+    })
+
+
+def login(client, username=USERNAME, password='secret pass'):
+    return client.post('/login', data={'username': username, 'password': password})
+
+
+def test_register_checks_uniqueness_in_one_query(client):
+    assert register(client).json['status'] == 'success'
+
+    statements = []
+    record = lambda conn, cursor, statement, *args: statements.append(statement)
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        response = register(client)
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+
+    assert response.json['message'] == {
+        'username': ['Username already taken. Please choose a different one.'],
+        'email': ['Email already registered. Please use a different one.']
+    }
+    assert len([s for s in statements if s.lstrip().upper().startswith('SELECT')]) == 1
+
+    response = register(client, username='auth_test_other')
+    assert list(response.json['message']) == ['email']
+
+
+def test_login_and_rehash_on_work_factor_change(client, monkeypatch):
+    register(client)
+    assert login(client, password='wrong').json['message'] == 'Invalid username or password'
+    assert login(client, username='auth_test_nobody').json['message'] == 'Invalid username or password'
+    assert login(client).json['status'] == 'success'
+
+    monkeypatch.setattr(app_module, 'password_hasher', PasswordHasher(iterations=2000))
+    assert login(app.test_client()).json['status'] == 'success'
+    with app.app_context():
+        assert User.query.filter_by(username=USERNAME).one().password_hash.startswith('pbkdf2:sha256:2000$')
+    assert login(app.test_client()).json['status'] == 'success'
+
+
+def test_busy_hasher_sheds_logins(client, monkeypatch):
+    register(client)
+    hasher = PasswordHasher(iterations=1000, max_pending=1)
+    monkeypatch.setattr(app_module, 'password_hasher', hasher)
+    hasher._slots.acquire()  # One check already in flight
+    response = login(client)
+    assert response.status_code == 503
+    assert hasher.stats()['rejected'] == 1
+
+
+def test_hasher_runs_in_parallel_and_rejects_unknown_users():
+    hasher = PasswordHasher(iterations=1000, max_workers=4)
+    pwhash = hasher.hash('secret')
+    assert hasher.verify(pwhash, 'secret') and not hasher.verify(pwhash, 'other')
+    assert not hasher.verify(None, 'secret')
+    assert not hasher.needs_rehash(pwhash)
+    assert PasswordHasher(iterations=2000).needs_rehash(pwhash)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(hasher.verify(pwhash, 'secret'))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [True] * 8
+
+
+def test_slow_check_times_out_as_busy(monkeypatch):
+    hasher = PasswordHasher(iterations=1000, timeout=0.05)
+    assert hasher._dummy_hash.startswith('pbkdf2:sha256:1000$')  # Made up front, not by the first request
+    pwhash = hasher.hash('secret')
+    release = threading.Event()
+    monkeypatch.setattr(password_hashing, 'check_password_hash', lambda *args: release.wait(5))
+    with pytest.raises(HasherBusy, match='longer than 0.05s'):
+        hasher.verify(pwhash, 'secret')
+    release.set()
@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import ChatHistory, User, app, db
+
+USERNAME = 'history_test_user'
+
+
+def delete_test_user():
+    user = User.query.filter_by(username=USERNAME).first()
+    if user is not None:
+        ChatHistory.query.filter_by(user_id=user.id).delete()
+        db.session.delete(user)
+        db.session.commit()
+
+
+@pytest.fixture
+def client():
+    with app.app_context():
+        db.create_all()
+        delete_test_user()
+        user = User(username=USERNAME, email='history_test@example.com', password_hash='unused')
+        db.session.add(user)
+        db.session.commit()
+        # Seven turns, three of them sharing a timestamp, so pages must break ties on id
+        start = datetime(2025, 3, 1, 9, 0)
+        timestamps = [start, start + timedelta(minutes=1)] + [start + timedelta(minutes=2)] * 3 + [
+            start + timedelta(minutes=3), start + timedelta(minutes=4)]
+        db.session.execute(db.insert(ChatHistory), [
+            {'user_id': user.id, 'message': f'message {n}', 'response': f'response {n}', 'timestamp': timestamp}
+            for n, timestamp in enumerate(timestamps)
+        ])
+        db.session.commit()
+        user_id = user.id
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+    yield client
+    with app.app_context():
+        delete_test_user()
+
+
+def test_pages_cover_every_turn_once_newest_first(client):
+    seen = []
+    cursor = None
+    while True:
+        query = {'limit': 2, **({'cursor': cursor} if cursor else {})}
+        page = client.get('/chat_history', query_string=query).json
+        assert len(page['messages']) <= 2
+        seen.extend(message['message'] for message in page['messages'])
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+
+    assert seen == [f'message {n}' for n in (6, 5, 4, 3, 2, 1, 0)]
+
+
+def test_last_full_page_has_no_cursor(client):
+    page = client.get('/chat_history', query_string={'limit': 7}).json
+    assert len(page['messages']) == 7 and page['next_cursor'] is None
+
+
+@pytest.mark.parametrize('query', [
+    {'limit': 'ten'},
+    {'limit': 0},
+    {'limit': -5},
+    {'cursor': 'garbage'},
+    {'cursor': 'yesterday_3'},
+    {'cursor': '2025-03-01T09:02:00_abc'},
+])
+def test_bad_limit_or_cursor_is_rejected(client, query):
+    response = client.get('/chat_history', query_string=query)
+    assert response.status_code == 400
@@ -0,0 +1,66 @@
+import hashlib
+import json
+import random
+
+from app import BASIC_RESPONSES, HEALTH_KEYWORDS, HEALTH_RESPONSES, route_chat_message, training_data
+from intent_router import IntentRouter, Rule
+
+GOLDEN_PATH = 'fixtures/chat_routes_golden.json'
+
+FILLER = ['i', 'have', 'a', 'my', 'this', 'think', 'shipping', 'since', 'really', 'bad',
+          'and', 'for', 'the', 'ok', 'what', 'about', 'something', 'everything', 'while']
+EXTRAS = ['3 days', '20 days', '3 weeks', '2 months', 'persistent', 'headaches', 'pains',
+          'coughing', 'cold cold', 'flu flu', 'hurting', 'thank', 'hello hi', 'byebye']
+
+
+def digest(response):
+    return hashlib.sha1(response.encode('utf-8')).hexdigest()[:16]
+
+
+def generate_messages(count=3000, seed=0):
+    rng = random.Random(seed)
+    symptoms = sorted({s for item in training_data for s in item.get('symptoms', [])})
+    vocab = list(HEALTH_RESPONSES) + list(BASIC_RESPONSES) + HEALTH_KEYWORDS + symptoms + EXTRAS
+    messages = {''}
+    while len(messages) < count:
+        words = rng.choices(FILLER, k=rng.randint(0, 6))
+        for phrase in rng.choices(vocab, k=rng.choice([0, 1, 1, 1, 2, 3])):
+            words.insert(rng.randint(0, len(words)), phrase)
+        joiner = rng.choice([' ', ' ', ' ', ''])
+        messages.add(joiner.join(words))
+    return sorted(messages)
+
+
+def test_router_matches_golden_routes():
+    with open(GOLDEN_PATH) as f:
+        golden = json.load(f)
+    assert len(golden) >= 3000
+
+    mismatches = [
+        (message, expected) for message, expected in golden
+        if digest(route_chat_message(message)) != expected
+    ]
+    assert not mismatches, f'{len(mismatches)} messages routed differently, e.g. {mismatches[:5]}'
+
+
+def test_router_rule_semantics():
+    router = IntentRouter([
+        Rule('once', 1, ['aa'], lambda message, match: match.pattern, exactly_once=True, max_tokens=2),
+        Rule('word', 2, ['hi'], lambda message, match: 'word', word_boundary=True),
+        Rule('pair', 3, ['b', 'a'], lambda message, match: ','.join(match.patterns), requires_any=['c'])
+    ], default='default')
+
+    # Occurrences are counted like str.count, so 'aaa' holds one 'aa' and 'aaaa' two
+    assert router.route('aaa') == ('once', 'aa')
+    assert router.route('aaaa') == (None, 'default')
+    assert router.route('aa x y') == (None, 'default')
+    assert router.route('hi there') == ('word', 'word')
+    assert router.route('think') == (None, 'default')
+    assert router.route('a b c') == ('pair', 'b,a')
+
+
+if __name__ == '__main__':
+    # Regenerate the golden file from the current routing (only when a routing change is intended)
+    rows = [json.dumps([m, digest(route_chat_message(m))]) for m in generate_messages()]
+    with open(GOLDEN_PATH, 'w') as f:
+        f.write('[\n' + ',\n'.join(rows) + '\n]\n')
@@ -0,0 +1,83 @@
+import gzip
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import corpus
+
+INTENTS = [
+    {'tag': 'greeting', 'patterns': ['hello there', 'hi', 'good morning'], 'responses': ['Hello!']},
+    {'tag': 'fever', 'patterns': ['i have a fever', 'my temperature is high'], 'responses': ['Rest and drink fluids.']},
+]
+EXAMPLES = [
+    {'tag': 'fever', 'pattern': 'burning up with fever'},
+    {'tag': 'headache', 'pattern': 'my head hurts', 'responses': ['Try to rest in a dark room.']},
+]
+
+
+def write_shards(directory):
+    with open(directory / 'part-000.jsonl', 'w') as f:
+        f.write('\n'.join(json.dumps(intent) for intent in INTENTS) + '\n\n')
+    with gzip.open(directory / 'part-001.jsonl.gz', 'wt') as f:
+        f.write('\n'.join(json.dumps(example) for example in EXAMPLES))
+
+
+def test_iter_examples_reads_intents_and_single_examples(tmp_path):
+    write_shards(tmp_path)
+
+    assert corpus.corpus_files(str(tmp_path)) == corpus.corpus_files(str(tmp_path / 'part-*'))
+    assert list(corpus.iter_examples(str(tmp_path))) == [
+        ('hello there', 'greeting'), ('hi', 'greeting'), ('good morning', 'greeting'),
+        ('i have a fever', 'fever'), ('my temperature is high', 'fever'),
+        ('burning up with fever', 'fever'), ('my head hurts', 'headache'),
+    ]
+
+
+def test_validation_split_is_stable_and_disjoint(tmp_path):
+    write_shards(tmp_path)
+    everything = list(corpus.iter_examples(str(tmp_path)))
+    train = list(corpus.iter_examples(str(tmp_path), 'train', 0.5))
+    validation = list(corpus.iter_examples(str(tmp_path), 'validation', 0.5))
+
+    assert sorted(train + validation) == sorted(everything)
+    assert validation == list(corpus.iter_examples(str(tmp_path), 'validation', 0.5))
+    assert list(corpus.iter_examples(str(tmp_path), 'train', 0.0)) == everything
+
+
+def test_invalid_line_reports_its_location(tmp_path):
+    (tmp_path / 'bad.jsonl').write_text('{"tag": "a", "pattern": "b"}\nnot json\n')
+    with pytest.raises(ValueError, match='bad.jsonl:2'):
+        list(corpus.iter_records(str(tmp_path)))
+
+
+def test_train_corpus_streams_and_resumes(tmp_path):
+    pytest.importorskip('tensorflow')
+    from model import HealthcareBot
+
+    shards = tmp_path / 'shards'
+    shards.mkdir()
+    write_shards(shards)
+    checkpoints = tmp_path / 'checkpoints'
+
+    def make_bot():
+        bot = HealthcareBot(engine='lstm')
+        # Lowercasing stands in for the NLTK preprocessing, which needs downloaded data
+        bot.preprocessor = SimpleNamespace(preprocess_many=lambda texts: [text.lower() for text in texts])
+        return bot
+
+    bot = make_bot()
+    bot.train_corpus(str(shards), epochs=2, batch_size=2, validation_fraction=0.3,
+                     checkpoint_dir=str(checkpoints), patience=1)
+    assert bot.intent_names == ['greeting', 'fever', 'headache']
+    assert bot.intent_responses['headache'] == ['Try to rest in a dark room.']
+    assert bot.model.loss == 'sparse_categorical_crossentropy'
+    assert (checkpoints / 'tokenizer.vocab').exists()
+    assert (checkpoints / 'best.h5').exists()
+
+    # A second run reuses the saved vocabulary and intents instead of refitting them
+    resumed = make_bot()
+    resumed.train_corpus(str(shards), epochs=3, batch_size=2, validation_fraction=0.3,
+                         checkpoint_dir=str(checkpoints))
+    assert resumed.intent_names == bot.intent_names
+    assert dict(resumed.tokenizer.word_index.items()) == dict(bot.tokenizer.word_index)
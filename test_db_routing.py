@@ -0,0 +1,83 @@
+from flask import Flask, jsonify
+from flask_sqlalchemy import SQLAlchemy
+import pytest
+from sqlalchemy.pool import NullPool
+
+from config import engine_options
+from db_routing import ReplicaRouter, RoutingSession
+
+
+def make_app(tmp_path, replica_uri):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'primary.db'}"
+    app.config['SQLALCHEMY_BINDS'] = {'replica': replica_uri}
+    db = SQLAlchemy(app, session_options={'class_': RoutingSession})
+    router = ReplicaRouter(db, retry_interval=60)
+
+    class Note(db.Model):
+        id = db.Column(db.Integer, primary_key=True)
+        text = db.Column(db.String(80))
+
+    @app.route('/notes')
+    @router.read_only
+    def notes():
+        return jsonify([note.text for note in Note.query.order_by(Note.id)])
+
+    @app.route('/write')
+    def write():
+        db.session.add(Note(text='written'))
+        db.session.commit()
+        return jsonify([note.text for note in Note.query.order_by(Note.id)])
+
+    with app.app_context():
+        db.create_all(bind_key=None)
+        db.session.add(Note(text='on primary'))
+        db.session.commit()
+    return app, db, router, Note
+
+
+def test_read_only_views_use_the_replica(tmp_path):
+    replica_uri = f"sqlite:///{tmp_path / 'replica.db'}"
+    app, db, router, Note = make_app(tmp_path, replica_uri)
+    # The "replica" is a second database holding different rows, so routing is visible
+    with app.app_context():
+        Note.__table__.create(db.engines['replica'])
+        with db.engines['replica'].begin() as connection:
+            connection.execute(Note.__table__.insert(), [{'text': 'on replica'}])
+
+    client = app.test_client()
+    assert client.get('/notes').json == ['on replica']
+    assert client.get('/write').json == ['on primary', 'written']
+    assert client.get('/notes').json == ['on replica']
+    with app.app_context():
+        assert router.stats()['replica_requests'] == 2 and router.stats()['fallbacks'] == 0
+
+
+def test_unreachable_replica_falls_back_to_primary(tmp_path):
+    app, db, router, Note = make_app(tmp_path, f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+
+    client = app.test_client()
+    assert client.get('/notes').json == ['on primary']
+    assert router.fallbacks == 1
+    with app.app_context():
+        assert not router.available()
+    # Skipped without another attempt until the retry interval passes
+    assert client.get('/notes').json == ['on primary']
+    assert router.fallbacks == 1
+
+
+def test_engine_options_from_environment(monkeypatch):
+    monkeypatch.setenv('DB_POOL_SIZE', '20')
+    monkeypatch.setenv('DB_MAX_OVERFLOW', '5')
+    monkeypatch.setenv('DB_POOL_PRE_PING', '1')
+    monkeypatch.setenv('DB_POOL_RECYCLE', '1800')
+    monkeypatch.setenv('DB_STATEMENT_TIMEOUT_MS', '5000')
+    assert engine_options('postgresql://db/app') == {
+        'pool_pre_ping': True, 'pool_size': 20, 'max_overflow': 5, 'pool_recycle': 1800,
+        'connect_args': {'options': '-c statement_timeout=5000'}
+    }
+    # Pool sizing doesn't apply to SQLite
+    assert engine_options('sqlite:///app.db') == {'pool_pre_ping': True}
+
+    monkeypatch.setenv('DB_PGBOUNCER', '1')
+    assert engine_options('postgresql://pgbouncer/app') == {'pool_pre_ping': True, 'poolclass': NullPool}
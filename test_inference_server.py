@@ -0,0 +1,136 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from inference_server import InferenceClient, InferenceError, InferenceServer
+
+
+class EchoBot:
+    """Stands in for HealthcareBot: replies with the upper-cased text and records batch sizes."""
+
+    def __init__(self):
+        self.batches = []
+
+    def predict_batch(self, texts):
+        self.batches.append(len(texts))
+        if 'fail' in texts:
+            raise RuntimeError('model exploded')
+        return [text.upper() for text in texts]
+
+
+@pytest.fixture
+def server(tmp_path):
+    bot = EchoBot()
+    server = InferenceServer(bot, str(tmp_path / 'inference.sock'), max_batch_size=64, max_wait_ms=50)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, bot
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def test_client_round_trip(server):
+    server, _ = server
+    client = InferenceClient(server.socket_path)
+
+    assert client.ping()
+    assert client.predict('héadache') == 'HÉADACHE'
+    assert client.predict_batch(['a', '', 'fever ' * 1000]) == ['A', '', 'FEVER ' * 1000]
+    assert client.predict_batch([]) == []
+    client.close()
+
+
+def test_requests_from_different_clients_share_batches(server):
+    server, bot = server
+    results = {}
+
+    def worker(index):
+        client = InferenceClient(server.socket_path)
+        results[index] = client.predict(f'message {index}')
+        client.close()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == {i: f'MESSAGE {i}' for i in range(8)}
+    assert sum(bot.batches) == 8
+    assert len(bot.batches) < 8
+
+
+def test_server_errors_raise_or_fall_back(server):
+    server, _ = server
+    with pytest.raises(InferenceError, match='model exploded'):
+        InferenceClient(server.socket_path).predict('fail')
+
+    client = InferenceClient(server.socket_path, fallback=lambda texts: ['fallback'] * len(texts))
+    assert client.predict('fail') == 'fallback'
+    assert client.fallbacks == 1
+    # The connection is still usable afterwards
+    assert client.predict('ok') == 'OK'
+
+
+def test_unreachable_server_uses_fallback(tmp_path):
+    missing = str(tmp_path / 'missing.sock')
+    assert not InferenceClient(missing).ping()
+    with pytest.raises(InferenceError):
+        InferenceClient(missing, timeout=0.1).predict('hello')
+    client = InferenceClient(missing, timeout=0.1, fallback=lambda texts: [text[::-1] for text in texts])
+    assert client.predict_batch(['abc']) == ['cba']
+
+
+def test_refuses_socket_of_running_server(server):
+    server, bot = server
+    with pytest.raises(OSError, match='already listening'):
+        InferenceServer(bot, server.socket_path)
+
+
+def test_failing_text_only_fails_its_own_request(server):
+    server, bot = server
+    start = threading.Barrier(2)
+    results = {}
+
+    def worker(text):
+        client = InferenceClient(server.socket_path)
+        start.wait()
+        try:
+            results[text] = client.predict(text)
+        except InferenceError as e:
+            results[text] = e
+        client.close()
+
+    threads = [threading.Thread(target=worker, args=(text,)) for text in ('fail', 'fine')]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results['fine'] == 'FINE'
+    assert isinstance(results['fail'], InferenceError)
+    assert bot.batches[0] == 2  # Both were in one batch before the retry
+
+
+def test_serves_the_shipped_model(tmp_path):
+    from model import HealthcareBot, LSTMEngine
+
+    bot = HealthcareBot(engine=LSTMEngine(runtime='numpy', quantization=''))
+    # Lowercasing stands in for the NLTK preprocessing, which needs downloaded data
+    bot.preprocessor = SimpleNamespace(preprocess_many=lambda texts: [text.lower() for text in texts])
+    bot.load_model('healthcare_model.h5', 'tokenizer.vocab')
+    server = InferenceServer(bot, str(tmp_path / 'inference.sock'))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        client = InferenceClient(server.socket_path)
+        replies = client.predict_batch(['hello', 'fever cough sore throat'])
+        client.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+    assert replies == [bot.intent_responses['greeting'][0], bot.intent_responses['Common Cold'][0]]
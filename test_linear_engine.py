@@ -0,0 +1,75 @@
+import json
+
+import numpy as np
+import pytest
+
+pytest.importorskip('sklearn')
+
+from model import LinearEngine, training_intents
+
+TRAIN = [
+    ('headache fever chills', 0), ('fever body aches', 0), ('high fever headache', 0),
+    ('sore throat cough', 1), ('dry cough runny nose', 1), ('cough congestion sneezing', 1),
+    ('chest pain shortness of breath', 2), ('tight chest breathless', 2), ('chest pain sweating', 2),
+]
+TEXTS = ['fever and headache', 'cough cough cough', 'chest pain', 'unknown words only', '',
+         'fever cough chest pain ' * 5]
+
+
+def train(examples, num_classes):
+    engine = LinearEngine()
+    texts, labels = engine.fit_features(*zip(*examples), num_classes)
+    engine.build(num_classes=num_classes)
+    engine.train(texts, labels)
+    return engine
+
+
+def sklearn_proba(engine, texts):
+    # sklearn's columns are the classes it saw, in engine.model.classes_ order
+    return engine.model.predict_proba(engine.vectorizer.transform(texts))
+
+
+def test_multiclass_matches_sklearn():
+    engine = train(TRAIN, 3)
+    np.testing.assert_allclose(engine.predict_proba(TEXTS), sklearn_proba(engine, TEXTS), atol=1e-12)
+
+
+def test_binary_matches_sklearn():
+    engine = train([(text, label) for text, label in TRAIN if label < 2], 2)
+    proba = engine.predict_proba(TEXTS)
+    assert proba.shape == (len(TEXTS), 2)
+    np.testing.assert_allclose(proba, sklearn_proba(engine, TEXTS), atol=1e-12)
+
+
+def test_intents_without_examples_get_zero_probability():
+    # Binary in sklearn's eyes (labels 0 and 2), but the bot has 4 intents
+    engine = train([(text, label) for text, label in TRAIN if label != 1], 4)
+    proba = engine.predict_proba(TEXTS)
+    assert proba.shape == (len(TEXTS), 4)
+    assert not proba[:, [1, 3]].any()
+    np.testing.assert_allclose(proba[:, [0, 2]], sklearn_proba(engine, TEXTS), atol=1e-12)
+
+
+def test_shipped_training_data_converts_to_intents():
+    with open('training_data.json') as f:
+        intents = training_intents(json.load(f))
+
+    tags = [intent['tag'] for intent in intents]
+    assert 'Common Cold' in tags and 'greeting' in tags and 'thank_you' in tags
+    cold = intents[tags.index('Common Cold')]
+    assert cold['patterns'][0] == 'fever cough sore throat'
+    assert all(intent['patterns'] and intent['responses'] for intent in intents)
+
+
+@pytest.mark.parametrize('num_classes', [2, 3, 4])
+def test_saved_engine_reloads_without_unpickling(tmp_path, num_classes):
+    engine = train([(text, label) for text, label in TRAIN if label < num_classes], num_classes)
+    path = str(tmp_path / 'linear.npz')
+    engine.save(path)
+
+    loaded = LinearEngine()
+    loaded.load(path)  # np.load(allow_pickle=False) inside
+    assert loaded.num_classes() == num_classes
+    np.testing.assert_allclose(loaded.predict_proba(TEXTS), engine.predict_proba(TEXTS), atol=1e-12)
+    # The rebuilt sklearn estimators agree too
+    np.testing.assert_allclose(sklearn_proba(loaded, TEXTS), sklearn_proba(engine, TEXTS), atol=1e-12)
@@ -0,0 +1,103 @@
+from datetime import date
+
+import pytest
+
+from app import DailyRollup, Exercise, HealthMetric, IngestBatch, Meal, User, WaterIntake, app, db
+
+USERNAME = 'batch_test_user'
+
+
+def delete_test_user():
+    user = User.query.filter_by(username=USERNAME).first()
+    if user is not None:
+        for model in (WaterIntake, Meal, Exercise, HealthMetric, DailyRollup, IngestBatch):
+            model.query.filter_by(user_id=user.id).delete()
+        db.session.delete(user)
+        db.session.commit()
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setitem(app.config, 'WTF_CSRF_ENABLED', False)
+    with app.app_context():
+        db.create_all()
+        delete_test_user()
+        user = User(username=USERNAME, email='batch_test@example.com', password_hash='unused')
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+    client.user_id = user_id
+    yield client
+    with app.app_context():
+        delete_test_user()
+
+
+def rollups(user_id):
+    with app.app_context():
+        return {
+            row.day: (row.calories, row.water_ml, row.exercise_min, row.sleep_h)
+            for row in DailyRollup.query.filter_by(user_id=user_id)
+        }
+
+
+def test_valid_items_are_stored_and_invalid_ones_reported(client):
+    response = client.post('/log_batch', json={'entries': [
+        {'type': 'water', 'amount': 2, 'date': '2025-03-01T08:00:00'},
+        {'type': 'meal', 'calories': 'lots'},
+        {'type': 'meal', 'calories': 600, 'date': '2025-03-01T12:30:00'},
+        {'type': 'sleep', 'hours': 8},
+        {'type': 'exercise', 'duration': 45, 'date': '2025-03-02T18:00:00'},
+        {'type': 'metrics', 'sleep_hours': 7.5, 'heart_rate': 60, 'date': '2025-03-02T07:00:00'},
+    ]})
+
+    assert response.status_code == 200
+    body = response.json
+    assert (body['inserted'], body['failed']) == (4, 2)
+    assert [result['status'] for result in body['results']] == ['ok', 'error', 'ok', 'error', 'ok', 'ok']
+    assert body['results'][1]['message'].startswith('calories must be a positive integer')
+    assert body['results'][3]['message'].startswith('type must be one of')
+    # One rollup row per day touched, with each item's delta
+    assert rollups(client.user_id) == {
+        date(2025, 3, 1): (600, 500, 0, 0),
+        date(2025, 3, 2): (0, 0, 45, 7.5)
+    }
+
+
+@pytest.mark.parametrize('entry', [
+    {'type': 'water', 'amount': 1e308},
+    {'type': 'water', 'amount': float('inf')},
+    {'type': 'water', 'amount': float('nan')},
+    {'type': 'water', 'amount': 10 ** 30},
+    {'type': 'water', 'amount': 0.001},  # Rounds to 0 ml
+    {'type': 'meal', 'calories': 10 ** 30},
+    {'type': 'exercise', 'duration': 24 * 60 + 1},
+    {'type': 'metrics', 'weight': float('-inf')},
+    {'type': 'metrics', 'heart_rate': 10 ** 30},
+])
+def test_non_finite_oversize_and_vanishing_values_are_per_item_errors(client, entry):
+    valid = {'type': 'water', 'amount': 1, 'date': '2025-03-01T08:00:00'}
+    response = client.post('/log_batch', json={'entries': [entry, valid]})
+
+    assert response.status_code == 200
+    assert [result['status'] for result in response.json['results']] == ['error', 'ok']
+    assert rollups(client.user_id) == {date(2025, 3, 1): (0, 250, 0, 0)}
+
+
+def test_replayed_idempotency_key_is_applied_once(client):
+    batch = {'entries': [{'type': 'water', 'amount': 1, 'date': '2025-03-01T08:00:00'}]}
+    first = client.post('/log_batch', json=batch, headers={'Idempotency-Key': 'sync-1'})
+    second = client.post('/log_batch', json=batch, headers={'Idempotency-Key': 'sync-1'})
+
+    assert first.json['inserted'] == 1 and 'replayed' not in first.json
+    assert second.json == {**first.json, 'replayed': True}
+    with app.app_context():
+        assert WaterIntake.query.filter_by(user_id=client.user_id).count() == 1
+    assert rollups(client.user_id) == {date(2025, 3, 1): (0, 250, 0, 0)}
+
+    # A different key is a different batch
+    client.post('/log_batch', json=batch, headers={'Idempotency-Key': 'sync-2'})
+    assert rollups(client.user_id) == {date(2025, 3, 1): (0, 500, 0, 0)}
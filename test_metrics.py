@@ -0,0 +1,91 @@
+import json
+import logging
+import re
+import time
+
+import pytest
+
+import app as app_module
+from app import app, db
+from metrics import Registry
+from password_hashing import PasswordHasher
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setitem(app.config, 'WTF_CSRF_ENABLED', False)
+    monkeypatch.setattr(app_module, 'password_hasher', PasswordHasher(iterations=1000, max_workers=1))
+    with app.app_context():
+        db.create_all()
+    return app.test_client()
+
+
+def test_render_prometheus_text():
+    registry = Registry()
+    requests = registry.counter('app_requests', 'Requests', ['route'])
+    latency = registry.histogram('app_latency_seconds', 'Latency', buckets=(0.1, 1.0))
+    registry.register_collector('app_queue_depth', 'Queue depth', lambda: {(('queue', 'a"b'),): 3})
+    requests.inc(route='/chat')
+    requests.inc(2, route='/chat')
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(2)
+
+    text = re.sub(r'pid="\d+",?', '', registry.render()).replace('{}', '')
+    assert '# TYPE app_requests_total counter' in text
+    assert 'app_requests_total{route="/chat"} 3' in text
+    assert '# TYPE app_latency_seconds histogram' in text
+    assert [line for line in text.splitlines() if line.startswith('app_latency_seconds')] == [
+        'app_latency_seconds_bucket{le="0.1"} 1', 'app_latency_seconds_bucket{le="1"} 2',
+        'app_latency_seconds_bucket{le="+Inf"} 3', 'app_latency_seconds_count 3', 'app_latency_seconds_sum 2.55'
+    ]
+    assert 'app_queue_depth{queue="a\\"b"} 3' in text
+
+
+def test_requests_are_recorded_and_exported(client):
+    seconds = app_module.request_seconds
+    queries = app_module.request_sql_queries
+    before = seconds.count(route='/login', method='POST', status='200')
+    queries_before = queries.count(route='/login')
+
+    response = client.post('/login', data={'username': 'metrics_nobody', 'password': 'wrong'})
+    assert response.json['status'] == 'error'
+    assert seconds.count(route='/login', method='POST', status='200') == before + 1
+    assert queries.count(route='/login') == queries_before + 1
+
+    text = client.get('/metrics').get_data(as_text=True)
+    assert 'healthcare_http_request_duration_seconds_bucket{' in text
+    assert 'route="/login",method="POST",status="200",le="+Inf"}' in text
+    assert 'healthcare_cache_entries{' in text and 'cache="user"' in text
+
+
+def test_slow_requests_are_logged_with_queries(client, monkeypatch, caplog):
+    monkeypatch.setitem(app.config, 'SLOW_REQUEST_MS', 0)
+    with caplog.at_level(logging.WARNING, logger=app.logger.name):
+        client.post('/login', data={'username': 'metrics_nobody', 'password': 'wrong'})
+
+    events = [json.loads(record.getMessage()) for record in caplog.records if 'slow_request' in record.getMessage()]
+    assert len(events) == 1
+    event = events[0]
+    assert event['route'] == '/login' and event['sql_queries'] >= 1
+    assert any('FROM user' in query['statement'] for query in event['top_queries'])
+
+
+def test_metrics_can_be_disabled(client, monkeypatch):
+    monkeypatch.setitem(app.config, 'METRICS_ENABLED', False)
+    assert client.get('/metrics').status_code == 404
+
+
+def test_symptom_check_timing_covers_matching(monkeypatch):
+    histogram = app_module.metrics.symptom_check_seconds
+    seen = []
+    monkeypatch.setattr(histogram, 'observe', lambda value, **labels: seen.append(value))
+    match = app_module.symptom_index.match
+    monkeypatch.setattr(app_module.symptom_index, 'match', lambda message: (time.sleep(0.02), match(message))[1])
+
+    assert app_module.check_symptoms('i have a fever and a cough')
+    assert len(seen) == 1 and seen[0] >= 0.02  # The match is inside the timer
+
+    assert app_module.route_chat_message('i have a fever and a cough and chills')
+    assert app_module.route_chat_message('hello')
+    assert len(seen) == 2  # Only the message routed to the symptoms rule
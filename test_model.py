@@ -0,0 +1,70 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from model import HealthcareBot, LSTMEngine, model_intents_path
+
+INTENTS = {'intents': [
+    {'tag': 'greeting', 'patterns': ['hello', 'hi there', 'good morning'], 'responses': ['Hello!']},
+    {'tag': 'fever', 'patterns': ['high fever', 'fever and chills', 'hot and feverish'], 'responses': ['Rest.']},
+    {'tag': 'headache', 'patterns': ['bad headache', 'my head hurts', 'throbbing head'], 'responses': ['Lie down.']},
+]}
+
+
+def plain_bot(engine):
+    bot = HealthcareBot(engine=engine)
+    # Lowercasing stands in for the NLTK preprocessing, which needs downloaded data
+    bot.preprocessor = SimpleNamespace(preprocess_many=lambda texts: [text.lower() for text in texts])
+    return bot
+
+
+@pytest.fixture
+def model_path(tmp_path):
+    pytest.importorskip('sklearn')
+    data_path = tmp_path / 'intents.json'
+    data_path.write_text(json.dumps(INTENTS))
+    model_path = str(tmp_path / 'linear.model')
+
+    bot = plain_bot('linear')
+    X, y = bot.load_training_data(str(data_path))
+    bot.build_model(bot.vocab_size(), len(bot.intent_names))
+    bot.train(X, y)
+    bot.save_model(model_path, None)
+    return model_path
+
+
+def test_saved_bot_reloads_its_intents(model_path):
+    loaded = plain_bot('linear')
+    loaded.load_model(model_path, None)
+    assert loaded.intent_names == ['greeting', 'fever', 'headache']
+    assert loaded.predict_batch(['hello', 'fever and chills', 'headache']) == ['Hello!', 'Rest.', 'Lie down.']
+
+
+def test_intents_must_match_the_model_outputs(model_path):
+    with open(model_intents_path(model_path), 'w') as f:
+        json.dump({'names': ['greeting'], 'responses': {'greeting': ['Hello!']}}, f)
+    with pytest.raises(ValueError, match='1 intents'):
+        plain_bot('linear').load_model(model_path, None)
+
+
+def test_shipped_model_answers_from_its_intents():
+    bot = plain_bot(LSTMEngine(runtime='numpy', quantization=''))
+    bot.load_model('healthcare_model.h5', 'tokenizer.vocab')
+
+    with open('training_data.json') as f:
+        knowledge = {item['disease']: item['advice'] for item in json.load(f)['training_data'] if 'disease' in item}
+    assert len(bot.intent_names) == bot.engine.num_classes()
+    assert bot.predict('fever cough sore throat') == knowledge['Common Cold']
+    assert bot.predict('chest pain shortness breath sweating') == knowledge['Heart Attack']
+
+
+def test_preload_refuses_a_bot_without_intents(monkeypatch):
+    import model
+
+    bot = HealthcareBot(engine=LSTMEngine(runtime='numpy', quantization=''))
+    bot.engine.warm_up = lambda: pytest.fail('preload should stop before warming the model')
+    monkeypatch.setattr(model, 'INFERENCE_SOCKET', '')
+    monkeypatch.setattr(model, 'get_bot', lambda: bot)
+    with pytest.raises(RuntimeError, match='no intents'):
+        model.preload()
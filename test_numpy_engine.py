@@ -0,0 +1,82 @@
+import pickle
+
+import numpy as np
+import pytest
+
+import numpy_engine
+from vocab import pad_sequences
+
+keras = pytest.importorskip('tensorflow').keras
+
+TEXTS = ['headache fever', 'sore throat cough!', 'chest pain shortness breath', 'hello', '', 'UNKNOWN words only',
+         'dizzy nausea vomiting ' * 10]
+
+
+@pytest.fixture(scope='module')
+def keras_model():
+    model = keras.models.load_model('healthcare_model.h5')
+    with open('tokenizer.pickle', 'rb') as handle:
+        tokenizer = pickle.load(handle)
+    return model, tokenizer
+
+
+def test_numpy_forward_pass_matches_keras(keras_model, tmp_path):
+    model, tokenizer = keras_model
+    npz_path = tmp_path / 'model.npz'
+    numpy_engine.export_model(model, tokenizer, npz_path)
+    numpy_model, numpy_tokenizer = numpy_engine.load(npz_path)
+
+    assert numpy_tokenizer.texts_to_sequences(TEXTS) == tokenizer.texts_to_sequences(TEXTS)
+    padded = pad_sequences(tokenizer.texts_to_sequences(TEXTS), maxlen=20)
+    np.testing.assert_array_equal(padded, keras.preprocessing.sequence.pad_sequences(
+        tokenizer.texts_to_sequences(TEXTS), maxlen=20))
+
+    vocab_size = model.layers[0].input_dim
+    inputs = np.concatenate([padded, np.random.default_rng(0).integers(0, vocab_size, size=(64, 20))])
+    expected = np.asarray(model(inputs, training=False))
+    np.testing.assert_allclose(numpy_model(inputs), expected, atol=1e-5)
+
+
+def test_shipped_weights_match_keras(keras_model):
+    model, tokenizer = keras_model
+    numpy_model, _ = numpy_engine.load('healthcare_model.npz')
+    inputs = np.random.default_rng(1).integers(0, model.layers[0].input_dim, size=(32, 20))
+    np.testing.assert_allclose(numpy_model(inputs), np.asarray(model(inputs, training=False)), atol=1e-5)
+
+
+@pytest.mark.parametrize('mode', ['int8', 'float16'])
+def test_quantized_model_tracks_float_model(keras_model, tmp_path, mode):
+    from model import LSTMEngine
+
+    model, tokenizer = keras_model
+    engine = LSTMEngine(runtime='keras', quantization='')
+    engine.model, engine.tokenizer = model, tokenizer
+
+    inputs = np.random.default_rng(2).integers(0, model.layers[0].input_dim, size=(256, 20))
+    labels = np.asarray(model(inputs, training=False)).argmax(axis=1)
+
+    # A negative allowance can never be met, so the gate must refuse to write anything
+    with pytest.raises(ValueError):
+        engine.publish_quantized(str(tmp_path / 'model.h5'), inputs, labels, mode, max_accuracy_drop=-1)
+    assert not list(tmp_path.iterdir())
+
+    path, baseline, score = engine.publish_quantized(str(tmp_path / 'model.h5'), inputs, labels, mode,
+                                                     max_accuracy_drop=0.05)
+    assert path.endswith(f'model.{mode}.npz') and baseline == 1.0 and score >= 0.95
+
+    quantized, _ = numpy_engine.load(path)
+    np.testing.assert_allclose(quantized(inputs), np.asarray(model(inputs, training=False)), atol=0.05)
+    assert quantized.nbytes < numpy_engine.from_keras(model).nbytes / (3.5 if mode == 'int8' else 1.9)
+
+
+def test_dequantized_lstm_matches_per_step_products():
+    rng = np.random.default_rng(3)
+    x = rng.standard_normal((4, 6, 8)).astype(np.float32)
+    kernel, recurrent_kernel = rng.standard_normal((8, 16)), rng.standard_normal((4, 16))
+    bias = rng.standard_normal(16).astype(np.float32)
+    for weights in ([numpy_engine.Int8Weight.quantize(w, axis=-1) for w in (kernel, recurrent_kernel)],
+                    [w.astype(np.float16) for w in (kernel, recurrent_kernel)]):
+        dense = [numpy_engine.dequantize(w) for w in weights]
+        assert all(w.dtype == np.float32 for w in dense)
+        np.testing.assert_allclose(numpy_engine.matmul(x, weights[0]), x @ dense[0], rtol=1e-5, atol=1e-5)
+        np.testing.assert_array_equal(numpy_engine.lstm(x, *weights, bias), numpy_engine.lstm(x, *dense, bias))
@@ -0,0 +1,60 @@
+import os
+import time
+
+from app import app
+from profiler import SamplingProfiler
+
+
+def busy_loop(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def test_tracked_requests_are_sampled_as_collapsed_stacks(tmp_path):
+    profiler = SamplingProfiler(str(tmp_path), interval=0.001, flush_interval=60)
+    with profiler.track('POST /chat'):
+        busy_loop(0.2)
+    busy_loop(0.05)  # Not tracked, so never sampled
+    path = profiler.flush()
+
+    with open(path) as f:
+        lines = f.read().splitlines()
+    assert lines and all(line.startswith('POST /chat;') for line in lines)
+    stack, count = max((line.rsplit(' ', 1) for line in lines), key=lambda item: int(item[1]))
+    assert 'test_tracked_requests_are_sampled_as_collapsed_stacks (test_profiler.py:' in stack
+    assert stack.split(';')[-1].startswith('busy_loop (test_profiler.py:')
+    assert sum(int(line.rsplit(' ', 1)[1]) for line in lines) == profiler.samples_taken > 10
+
+
+def test_files_rotate_by_size(tmp_path):
+    profiler = SamplingProfiler(str(tmp_path), max_bytes=1, backup_count=2)
+    for n in range(4):
+        profiler._stacks = {f'GET /;frame{n}': 1}
+        path = profiler.flush()
+
+    assert sorted(os.listdir(tmp_path)) == [f'profile-{os.getpid()}.collapsed' + suffix for suffix in ('', '.1', '.2')]
+    with open(path) as f:
+        assert f.read() == 'GET /;frame3 1\n'
+    with open(path + '.2') as f:
+        assert f.read() == 'GET /;frame1 1\n'
+
+
+def test_capture_window_is_shared_through_the_output_dir(tmp_path):
+    starter = SamplingProfiler(str(tmp_path))
+    other_worker = SamplingProfiler(str(tmp_path))
+    assert not other_worker.window_active()
+
+    starter.start_window(30)
+    other_worker._window_checked -= 1  # Skip the once-a-second reread throttle
+    assert starter.window_active() and other_worker.window_active()
+    starter.stop_window()
+    other_worker._window_checked -= 1
+    assert not other_worker.window_active()
+
+
+def test_disabled_profiler_registers_nothing():
+    assert not app.config['PROFILER_ENABLED']
+    assert 'profiler_control' not in app.view_functions
+    hooks = [f.__name__ for funcs in app.before_request_funcs.values() for f in funcs]
+    assert 'start_profiling' not in hooks
@@ -0,0 +1,140 @@
+from datetime import date, timedelta
+import threading
+
+import pytest
+
+import app as app_module
+from app import DailyRollup, Exercise, IngestBatch, Meal, User, WaterIntake, app, db
+
+USERNAME = 'rollup_test_user'
+
+
+def delete_test_user():
+    user = User.query.filter_by(username=USERNAME).first()
+    if user is not None:
+        for model in (WaterIntake, Meal, Exercise, DailyRollup, IngestBatch):
+            model.query.filter_by(user_id=user.id).delete()
+        db.session.delete(user)
+        db.session.commit()
+
+
+def logged_in_client(user_id):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+    return client
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setitem(app.config, 'WTF_CSRF_ENABLED', False)
+    with app.app_context():
+        db.create_all()
+        delete_test_user()
+        user = User(username=USERNAME, email='rollup_test@example.com', password_hash='unused')
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+    client = logged_in_client(user_id)
+    client.user_id = user_id
+    yield client
+    with app.app_context():
+        delete_test_user()
+
+
+def log_day(client):
+    assert client.post('/log_water', json={'amount': 2}).json['success']
+    assert client.post('/log_water', json={'amount': 1}).json['success']
+    assert client.post('/log_meal', json={'calories': 650}).json['success']
+    assert client.post('/log_meal', json={'calories': 400}).json['success']
+    assert client.post('/log_exercise', json={'duration': 30}).json['success']
+
+
+def test_progress_reads_the_rollup_kept_by_logging(client):
+    log_day(client)
+
+    progress = client.get('/get_daily_progress', query_string={'date': date.today().isoformat()}).json
+    assert {key: value['current'] for key, value in progress.items()} == {
+        'calories': 1050, 'water': 750, 'exercise': 30
+    }
+    summary = client.get('/summary').json
+    assert (summary['water_intake'], summary['calories_consumed'], summary['exercise_duration']) == (750, 1050, 30)
+
+
+def test_check_reports_drift_and_rebuild_repairs_it(client):
+    log_day(client)
+    runner = app.test_cli_runner()
+    assert runner.invoke(args=['rebuild-rollups']).exit_code == 0
+    assert f'user {client.user_id} on' not in runner.invoke(args=['check-rollups']).output
+
+    with app.app_context():
+        rollup = db.session.get(DailyRollup, (client.user_id, date.today()))
+        rollup.water_ml = 99
+        db.session.commit()
+
+    result = runner.invoke(args=['check-rollups'])
+    assert result.exit_code == 1
+    assert f"user {client.user_id} on {date.today()}: expected" in result.output
+
+    assert runner.invoke(args=['rebuild-rollups']).exit_code == 0
+    result = runner.invoke(args=['check-rollups'])
+    assert result.exit_code == 0, result.output
+    with app.app_context():
+        assert db.session.get(DailyRollup, (client.user_id, date.today())).water_ml == 750
+
+
+def test_rebuild_does_not_lose_a_concurrent_write(client, monkeypatch):
+    log_day(client)
+    writer = threading.Thread(target=lambda: logged_in_client(client.user_id).post('/log_water', json={'amount': 4}))
+    read_totals = app_module.raw_daily_totals
+
+    def log_while_rebuilding(user_ids):
+        # A write arriving between the rebuild locking its chunk and reading the totals
+        if client.user_id in user_ids:
+            writer.start()
+            writer.join(0.5)
+            assert writer.is_alive(), 'the write should wait for the rebuild to commit'
+        return read_totals(user_ids)
+
+    monkeypatch.setattr(app_module, 'raw_daily_totals', log_while_rebuilding)
+    assert app.test_cli_runner().invoke(args=['rebuild-rollups']).exit_code == 0
+    writer.join()
+
+    with app.app_context():
+        assert db.session.get(DailyRollup, (client.user_id, date.today())).water_ml == 750 + 1000
+
+
+def test_progress_range_is_inclusive_and_fills_empty_days(client):
+    client.post('/log_batch', json={'entries': [
+        {'type': 'water', 'amount': 2, 'date': '2025-03-01T08:00:00'},
+        {'type': 'meal', 'calories': 500, 'date': '2025-03-03T12:00:00'},
+        {'type': 'exercise', 'duration': 20, 'date': '2025-03-04T18:00:00'},  # Outside the range
+    ]})
+
+    response = client.get('/get_progress_range', query_string={'start': '2025-03-01', 'end': '2025-03-03'})
+    assert response.status_code == 200
+    assert response.json['days'] == [
+        {'date': '2025-03-01', 'calories': 0, 'water': 500, 'exercise': 0, 'sleep': 0},
+        {'date': '2025-03-02', 'calories': 0, 'water': 0, 'exercise': 0, 'sleep': 0},
+        {'date': '2025-03-03', 'calories': 500, 'water': 0, 'exercise': 0, 'sleep': 0},
+    ]
+    single = client.get('/get_progress_range', query_string={'start': '2025-03-04', 'end': '2025-03-04'}).json
+    assert [day['exercise'] for day in single['days']] == [20]
+
+
+@pytest.mark.parametrize('start, end', [
+    ('2025-03-02', '2025-03-01'),  # end before start
+    ('2025-01-01', (date(2025, 1, 1) + timedelta(days=app_module.MAX_PROGRESS_RANGE_DAYS)).isoformat()),
+    ('2025-03-01', None),
+    ('March 1', '2025-03-02'),
+])
+def test_progress_range_rejects_bad_ranges(client, start, end):
+    query = {'start': start, **({'end': end} if end else {})}
+    assert client.get('/get_progress_range', query_string=query).status_code == 400
+
+
+def test_progress_range_allows_the_maximum_span(client):
+    end = date(2025, 1, 1) + timedelta(days=app_module.MAX_PROGRESS_RANGE_DAYS - 1)
+    response = client.get('/get_progress_range', query_string={'start': '2025-01-01', 'end': end.isoformat()})
+    assert len(response.json['days']) == app_module.MAX_PROGRESS_RANGE_DAYS
@@ -0,0 +1,127 @@
+import random
+
+from app import check_symptoms, related_conditions, symptom_index, training_data
+from symptom_index import PatternAutomaton, RelatedConditions, SymptomIndex
+
+RESPIRATORY_INFECTIONS = {'Common Cold', 'Flu', 'Tonsillitis'}
+CHRONIC_RESPIRATORY = {'COPD', 'Asthma'}
+EMERGENCY_CONDITIONS = {'Heart Attack', 'Stroke'}
+
+
+def legacy_find_related_conditions(catalogue, user_symptoms, current_disease):
+    # Reference copy of the original per-disease loop from app.py
+    related = []
+    for item in catalogue:
+        if 'symptoms' not in item or item['disease'] == current_disease:
+            continue
+        item_symptoms = set(s.lower() for s in item['symptoms'])
+        user_symptoms_lower = set(s.lower() for s in user_symptoms)
+        matching_count = len(item_symptoms & user_symptoms_lower)
+        mild_respiratory = {'cough', 'runny nose', 'sore throat'}
+        severe_respiratory = {'shortness of breath', 'wheezing', 'chest pain'}
+        has_mild = any(s in mild_respiratory for s in user_symptoms_lower)
+        has_severe = any(s in severe_respiratory for s in user_symptoms_lower)
+        if has_mild and not has_severe and item['disease'] in CHRONIC_RESPIRATORY:
+            continue
+        if has_severe and item['disease'] in RESPIRATORY_INFECTIONS:
+            continue
+        if matching_count > 0:
+            related.append({
+                'disease': item['disease'],
+                'match_count': matching_count,
+                'is_emergency': item['disease'] in EMERGENCY_CONDITIONS
+            })
+    related.sort(key=lambda x: (x['is_emergency'], x['match_count']), reverse=True)
+    return [r['disease'] for r in related[:3]] if related else []
+
+
+def legacy_match_and_rank(catalogue, message):
+    # Reference copy of the original check_symptoms scan and ranking from app.py
+    user_symptoms = set()
+    for item in catalogue:
+        if 'symptoms' in item:
+            for symptom in item['symptoms']:
+                if symptom.lower() in message.lower():
+                    user_symptoms.add(symptom)
+    possible_matches = []
+    for item in catalogue:
+        if 'symptoms' not in item:
+            continue
+        matching_symptoms = set(s.lower() for s in user_symptoms) & set(s.lower() for s in item['symptoms'])
+        if matching_symptoms:
+            possible_matches.append((item['disease'], len(matching_symptoms)))
+    possible_matches.sort(key=lambda x: x[1], reverse=True)
+    return user_symptoms, possible_matches
+
+
+def build_scorer(catalogue):
+    return RelatedConditions(
+        SymptomIndex(catalogue),
+        respiratory_infections=RESPIRATORY_INFECTIONS,
+        chronic_respiratory=CHRONIC_RESPIRATORY,
+        emergency_conditions=EMERGENCY_CONDITIONS,
+        mild_symptoms={'cough', 'runny nose', 'sore throat'},
+        severe_symptoms={'shortness of breath', 'wheezing', 'chest pain'}
+    )
+
+
+def test_automaton_reports_overlapping_patterns():
+    automaton = PatternAutomaton(['pain', 'chest pain', 'ache', 'headache', 'he'])
+    found = automaton.find_all('chest pain and a headache')
+    assert {automaton.patterns[i] for i in found} == {'pain', 'chest pain', 'ache', 'headache', 'he'}
+    assert automaton.find_all('nothing relevant') == set()
+
+
+def test_check_symptoms_matches_legacy_scan():
+    rng = random.Random(2)
+    symptoms = sorted({s for item in training_data for s in item.get('symptoms', [])})
+    filler = ['i', 'have', 'a', 'bad', 'since', 'yesterday', 'and', 'my', 'feel', 'been', 'for 3 weeks']
+    messages = ['hello there', 'chest pain', 'CHEST PAIN and a Headache', 'painful stomachache', '']
+    for _ in range(2000):
+        words = rng.choices(filler, k=rng.randint(1, 8))
+        for symptom in rng.sample(symptoms, rng.randint(0, 4)):
+            words.insert(rng.randint(0, len(words)), symptom)
+        messages.append(' '.join(words))
+
+    for message in messages:
+        user_symptoms, ranked = legacy_match_and_rank(training_data, message)
+        symptom_ids = symptom_index.match(message)
+        assert set(symptom_index.original_forms(symptom_ids)) == user_symptoms, message
+        # Same conditions with the same match counts, in the same order
+        assert [(item['disease'], count) for item, count in symptom_index.rank(symptom_ids)] == ranked, message
+        report = check_symptoms(message.lower())
+        if ranked:
+            assert f">{ranked[0][0]}</div>" in report
+        else:
+            assert report is None
+
+
+def test_related_conditions_matches_legacy_ranking():
+    rng = random.Random(0)
+    symptoms = sorted({s for item in training_data for s in item.get('symptoms', [])})
+    symptoms += ['runny nose', 'Chest Pain', 'unknown symptom']
+    diseases = [item['disease'] for item in training_data if 'symptoms' in item] + ['Not A Disease']
+
+    for _ in range(2000):
+        user_symptoms = rng.sample(symptoms, rng.randint(1, 6))
+        current_disease = rng.choice(diseases)
+        assert related_conditions.top(user_symptoms, current_disease) == \
+            legacy_find_related_conditions(training_data, user_symptoms, current_disease)
+
+
+def test_related_conditions_matches_legacy_on_large_catalogue():
+    rng = random.Random(1)
+    vocabulary = [f'symptom {i}' for i in range(300)] + ['cough', 'wheezing', 'chest pain']
+    named = sorted(RESPIRATORY_INFECTIONS | CHRONIC_RESPIRATORY | EMERGENCY_CONDITIONS)
+    catalogue = [
+        {'disease': rng.choice(named) if rng.random() < 0.05 else f'Disease {i}',
+         'symptoms': rng.sample(vocabulary, rng.randint(1, 8))}
+        for i in range(10000)
+    ]
+    scorer = build_scorer(catalogue)
+
+    for _ in range(50):
+        user_symptoms = rng.sample(vocabulary, rng.randint(1, 5))
+        current_disease = catalogue[rng.randrange(len(catalogue))]['disease']
+        assert scorer.top(user_symptoms, current_disease) == \
+            legacy_find_related_conditions(catalogue, user_symptoms, current_disease)
@@ -0,0 +1,62 @@
+import pytest
+
+from text_preprocessing import STOP_WORDS, TextPreprocessor, tokenize
+from vocab import VocabTokenizer
+
+SENTENCES = [
+    "i don't feel well, can't sleep and won't eat",
+    "it's a 3-day fever; i'm sick!! they've said we'd be fine",
+    'e-mail me at a@b.com (now) about my 38.5 degree temperature',
+    'he said "hello" ... ok? i cannot breathe, gonna see a doctor',
+    "my kids' throats hurt & they're coughing",
+    'café naïve headache',
+    '',
+]
+
+# The model's tokenizer strips these characters, so tokens made only of them never matter
+KERAS_FILTERS = '!"#$%&()*+,-./:;<=>?@[\\]^_`{|}~\t\n'
+
+
+def model_words(tokens):
+    # Bare quote marks ("''" for a closing quote, "'" after a plural possessive)
+    # are dropped by the fast tokenizer; they never occur in the training vocabulary
+    words = VocabTokenizer({}, KERAS_FILTERS).text_to_word_sequence(' '.join(tokens))
+    return [word for word in words if word.strip("'")]
+
+
+def test_fast_tokenizer_matches_treebank():
+    from nltk.tokenize import NLTKWordTokenizer  # rule-based part of word_tokenize; needs no data
+
+    treebank = NLTKWordTokenizer()
+    for sentence in SENTENCES:
+        assert model_words(tokenize(sentence)) == model_words(treebank.tokenize(sentence)), sentence
+
+
+def test_stop_words_match_nltk_corpus():
+    try:
+        from nltk.corpus import stopwords
+        words = stopwords.words('english')
+    except LookupError:
+        pytest.skip('NLTK stopwords corpus not installed')
+    assert STOP_WORDS == frozenset(words)
+
+
+def test_compat_mode_matches_original_preprocessing():
+    preprocessor = TextPreprocessor('compat')
+    try:
+        preprocessor.preprocess('warm up')
+    except LookupError:
+        pytest.skip('NLTK data not installed')
+
+    from nltk.corpus import stopwords
+    from nltk.stem import WordNetLemmatizer
+    from nltk.tokenize import word_tokenize
+
+    def original(text):
+        tokens = word_tokenize(text.lower())
+        stop_words = set(stopwords.words('english'))
+        return ' '.join(WordNetLemmatizer().lemmatize(token) for token in tokens if token not in stop_words)
+
+    expected = [original(sentence) for sentence in SENTENCES]
+    assert [preprocessor.preprocess(sentence) for sentence in SENTENCES] == expected
+    assert preprocessor.preprocess_many(SENTENCES) == expected
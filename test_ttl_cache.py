@@ -0,0 +1,60 @@
+import pytest
+
+import ttl_cache
+from app import chat_response, chat_response_cache
+from ttl_cache import TTLCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(ttl_cache.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = TTLCache(maxsize=10, ttl=30)
+    cache.set('a', 1)
+    clock[0] += 29
+    assert cache.get('a') == 1
+    clock[0] += 2
+    assert cache.get('a') is None
+    assert cache.get('a', 'missing') == 'missing'
+    assert cache.stats() == {'size': 0, 'maxsize': 10, 'hits': 1, 'misses': 2, 'invalidations': 0}
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = TTLCache(maxsize=2, ttl=30)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1  # 'b' is now least recently used
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c')) == (1, 3)
+    assert cache.stats()['size'] == 2
+
+
+def test_invalidate_and_disabled_cache(clock):
+    cache = TTLCache(maxsize=10, ttl=30)
+    cache.set('a', 1)
+    cache.invalidate('a')
+    cache.invalidate('a')  # Already gone, so not counted again
+    assert cache.get('a') is None
+    assert cache.invalidations == 1
+
+    disabled = TTLCache(maxsize=0)
+    disabled.set('a', 1)
+    assert disabled.get('a') is None and disabled.stats()['size'] == 0
+
+
+def test_cached_reply_is_personalized_per_user():
+    chat_response_cache.clear()
+    hits = chat_response_cache.hits
+
+    first = chat_response('hello', 'alice')
+    second = chat_response('hello', 'bob')
+
+    assert 'alice' in first and 'bob' not in first
+    assert second == first.replace('alice', 'bob')
+    assert chat_response_cache.hits == hits + 1
+    assert '{username}' in chat_response_cache.get('hello')
@@ -0,0 +1,82 @@
+import pytest
+from sqlalchemy import event
+
+from app import CachedUser, User, app, db, load_user, user_cache
+
+
+@pytest.fixture
+def user_id():
+    with app.app_context():
+        db.create_all()
+        User.query.filter_by(username='cache_test_user').delete()
+        user = User(username='cache_test_user', email='cache_test@example.com')
+        user.set_password('secret')
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+    user_cache.clear()
+    yield user_id
+    with app.app_context():
+        User.query.filter_by(username='cache_test_user').delete()
+        db.session.commit()
+
+
+@pytest.fixture
+def user_queries():
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if 'FROM user' in statement:
+            statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    yield statements
+    event.remove(engine, 'before_cursor_execute', record)
+
+
+def test_user_is_loaded_once_and_detached(user_id, user_queries):
+    hits = user_cache.hits
+    # Each request gets its own session, as in the app
+    with app.test_request_context():
+        first = load_user(str(user_id))
+    with app.test_request_context():
+        second = load_user(str(user_id))
+
+    assert len(user_queries) == 1
+    assert isinstance(first, CachedUser) and second is first
+    assert (first.id, first.username, first.email) == (user_id, 'cache_test_user', 'cache_test@example.com')
+    assert first.is_authenticated and first.get_id() == str(user_id)
+    assert not hasattr(first, 'password_hash')
+    assert user_cache.hits == hits + 1
+
+
+def test_updates_and_deletes_invalidate(user_id):
+    invalidations = user_cache.invalidations
+    with app.test_request_context():
+        load_user(str(user_id))
+        user = db.session.get(User, user_id)
+        user.email = 'changed@example.com'
+        db.session.commit()
+    assert user_cache.invalidations == invalidations + 1
+    with app.test_request_context():
+        assert load_user(str(user_id)).email == 'changed@example.com'
+
+    with app.test_request_context():
+        db.session.delete(db.session.get(User, user_id))
+        db.session.commit()
+    with app.test_request_context():
+        assert load_user(str(user_id)) is None
+
+
+def test_cache_can_be_disabled(user_id, user_queries, monkeypatch):
+    monkeypatch.setitem(app.config, 'USER_CACHE_ENABLED', False)
+    with app.test_request_context():
+        loaded = load_user(str(user_id))
+    with app.test_request_context():
+        load_user(str(user_id))
+
+    assert isinstance(loaded, User)
+    assert len(user_queries) == 2
+    assert user_cache.stats()['size'] == 0
@@ -0,0 +1,48 @@
+import pickle
+
+import pytest
+
+from vocab import Vocabulary, VocabTokenizer, convert_pickle, pad_sequences, write_vocab
+
+TEXTS = ['Headache, fever & chills!', 'sore\tthroat\ncough', 'hello', '', 'UNKNOWN words only', 'café naïve ñandú',
+         'dizzy nausea vomiting ' * 10]
+
+
+def test_vocabulary_lookups(tmp_path):
+    word_index = {'b': 3, 'a': 1, 'ab': 2, 'café': 5, 'z' * 50: 4}
+    path = tmp_path / 'words.vocab'
+    write_vocab(path, word_index, {'filters': '!', 'lower': True, 'split': ' ', 'num_words': None, 'oov_token': None})
+
+    vocabulary = Vocabulary.open(path)
+    assert len(vocabulary) == 5
+    assert dict(vocabulary.items()) == word_index
+    assert all(vocabulary[word] == index for word, index in word_index.items())
+    assert vocabulary.get('abc') is None and '' not in vocabulary and 'caf' not in vocabulary
+    with pytest.raises(KeyError):
+        vocabulary['missing']
+
+
+@pytest.mark.parametrize('num_words, oov_token', [(None, None), (5, None), (5, '<oov>'), (None, '<oov>')])
+def test_matches_keras_tokenizer(tmp_path, num_words, oov_token):
+    keras = pytest.importorskip('tensorflow').keras
+    tokenizer = keras.preprocessing.text.Tokenizer(num_words=num_words, oov_token=oov_token)
+    tokenizer.fit_on_texts(TEXTS[:3] + ['cough cough fever naïve'])
+    pickle_path = tmp_path / 'tokenizer.pickle'
+    with open(pickle_path, 'wb') as handle:
+        pickle.dump(tokenizer, handle)
+
+    convert_pickle(str(pickle_path), str(tmp_path / 'tokenizer.vocab'))
+    vocab_tokenizer = VocabTokenizer.from_file(str(tmp_path / 'tokenizer.vocab'))
+
+    expected = tokenizer.texts_to_sequences(TEXTS)
+    assert vocab_tokenizer.texts_to_sequences(TEXTS) == expected
+    assert (pad_sequences(expected, maxlen=4) == keras.preprocessing.sequence.pad_sequences(expected, maxlen=4)).all()
+
+
+def test_shipped_vocab_matches_pickle():
+    pytest.importorskip('tensorflow')  # unpickling the Keras tokenizer needs it
+    with open('tokenizer.pickle', 'rb') as handle:
+        tokenizer = pickle.load(handle)
+    vocab_tokenizer = VocabTokenizer.from_file('tokenizer.vocab')
+    assert dict(vocab_tokenizer.word_index.items()) == tokenizer.word_index
+    assert vocab_tokenizer.texts_to_sequences(TEXTS) == tokenizer.texts_to_sequences(TEXTS)
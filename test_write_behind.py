@@ -0,0 +1,87 @@
+import os
+import threading
+import time
+
+from write_behind import WriteBehindBuffer
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.01)
+
+
+def test_flushes_full_batches_without_waiting_for_the_interval():
+    batches = []
+    buffer = WriteBehindBuffer(batches.append, batch_size=3, flush_interval=60)
+    for item in range(7):
+        assert buffer.record(item)
+
+    wait_for(lambda: buffer.written == 6)
+    assert batches == [[0, 1, 2], [3, 4, 5]]
+    buffer.close()
+    assert batches[-1] == [6]
+    assert buffer.stats()['written'] == 7 and buffer.stats()['flushes'] == 3
+
+
+def test_flushes_a_partial_batch_after_the_interval():
+    batches = []
+    buffer = WriteBehindBuffer(batches.append, batch_size=100, flush_interval=0.05)
+    buffer.record('a')
+    buffer.record('b')
+
+    wait_for(lambda: buffer.written == 2)
+    assert batches == [['a', 'b']]
+    buffer.close()
+
+
+def test_drops_when_full_and_after_close():
+    release = threading.Event()
+    taken = threading.Event()
+    batches = []
+
+    def slow_write(batch):
+        taken.set()
+        release.wait()
+        batches.append(batch)
+
+    buffer = WriteBehindBuffer(slow_write, max_queue_size=2, batch_size=1, flush_interval=60)
+    assert buffer.record(1)
+    taken.wait(5)  # The writer holds item 1, so the queue is empty again
+    assert buffer.record(2) and buffer.record(3)
+    assert not buffer.record(4)
+    assert buffer.stats()['dropped'] == 1 and buffer.stats()['queue_depth'] == 2
+
+    release.set()
+    buffer.close()
+    assert batches == [[1], [2], [3]]
+    assert not buffer.record(5)
+    assert buffer.dropped == 2
+
+
+def test_failed_batches_are_counted_not_raised():
+    def failing_write(batch):
+        raise RuntimeError('database is down')
+
+    buffer = WriteBehindBuffer(failing_write, batch_size=2, flush_interval=60)
+    buffer.record(1)
+    buffer.record(2)
+    wait_for(lambda: buffer.failed == 2)
+    buffer.close()
+    assert buffer.written == 0
+
+
+def test_writer_restarts_in_a_forked_child(monkeypatch):
+    batches = []
+    buffer = WriteBehindBuffer(batches.append, batch_size=10, flush_interval=60)
+    buffer.record('parent')
+    parent_thread = buffer._thread
+    buffer.close()
+
+    # A forked child inherits the closed buffer but not its thread
+    monkeypatch.setattr(os, 'getpid', lambda: -1)
+    assert buffer.record('child')
+    assert buffer._thread is not parent_thread and buffer._thread.is_alive()
+    buffer.close()
+    assert batches == [['parent'], ['child']]
@@ -0,0 +1,149 @@
+"""Text preprocessing for the intent model: tokenize, drop stopwords, lemmatize.
+
+``TextPreprocessor`` has two modes:
+
+- ``fast`` (default): a precompiled regex tokenizer that splits contractions
+  the way NLTK's Treebank tokenizer does and drops punctuation-only tokens
+  (the model's tokenizer filters those out anyway). It needs only the WordNet
+  data, not Punkt or the stopwords corpus.
+- ``compat``: NLTK ``word_tokenize`` and the NLTK stopwords corpus, giving
+  exactly the output of the original ``HealthcareBot.preprocess_text``.
+
+Both modes share a module-level frozenset of stopwords (``compat`` loads the
+corpus once instead) and memoize WordNet lemmas in a bounded LRU cache.
+"""
+from functools import lru_cache
+import os
+import re
+
+# NLTK resources the preprocessing needs, by download name and data path
+NLTK_RESOURCES = {
+    'punkt': 'tokenizers/punkt',
+    'stopwords': 'corpora/stopwords',
+    'wordnet': 'corpora/wordnet'
+}
+
+MODES = ('fast', 'compat')
+
+# NLTK's English stopword list (nltk_data corpora/stopwords/english), frozen here
+# so the fast mode needs no corpus download
+STOP_WORDS = frozenset("""
+i me my myself we our ours ourselves you you're you've you'll you'd your yours
+yourself yourselves he him his himself she she's her hers herself it it's its
+itself they them their theirs themselves what which who whom this that that'll
+these those am is are was were be been being have has had having do does did
+doing a an the and but if or because as until while of at by for with about
+against between into through during before after above below to from up down
+in out on off over under again further then once here there when where why how
+all any both each few more most other some such no nor not only own same so
+than too very s t can will just don don't should should've now d ll m o re ve y
+ain aren aren't couldn couldn't didn didn't doesn doesn't hadn hadn't hasn
+hasn't haven haven't isn isn't ma mightn mightn't mustn mustn't needn needn't
+shan shan't shouldn shouldn't wasn wasn't weren weren't won won't wouldn
+wouldn't
+""".split())
+
+# Treebank-style tokens: "n't" and clitics ("'s", "'m", ...) split off their word,
+# and words may contain inner hyphens or dots ("3-day", "b.com")
+TOKEN_PATTERN = re.compile(r"n't\b|'(?:s|m|d|ll|re|ve)\b|\w+?(?=n't\b)|\w+(?:[-.]\w+)*")
+
+# Single words the Treebank tokenizer splits in two
+SPLIT_WORDS = {
+    'cannot': ('can', 'not'),
+    'gimme': ('gim', 'me'),
+    'gonna': ('gon', 'na'),
+    'gotta': ('got', 'ta'),
+    'lemme': ('lem', 'me'),
+    'wanna': ('wan', 'na')
+}
+
+_verified_resources = set()
+
+
+def ensure_nltk_data(data_dir=None, download=False, resources=None):
+    """Check the NLTK resources exist locally; never touches the network unless ``download``.
+
+    ``data_dir`` defaults to the ``NLTK_DATA`` environment variable and is searched
+    before NLTK's standard locations. ``resources`` defaults to all of ``NLTK_RESOURCES``.
+    """
+    names = [name for name in (resources or NLTK_RESOURCES) if name not in _verified_resources]
+    if not names:
+        return
+
+    import nltk
+    data_dir = data_dir or os.getenv('NLTK_DATA')
+    if data_dir and data_dir not in nltk.data.path:
+        nltk.data.path.insert(0, data_dir)
+
+    missing = []
+    for name in names:
+        try:
+            nltk.data.find(NLTK_RESOURCES[name])
+        except LookupError:
+            if download and nltk.download(name, download_dir=data_dir, quiet=True):
+                continue
+            missing.append(name)
+
+    if missing:
+        raise LookupError(
+            f"Missing NLTK data: {', '.join(missing)}. Install it ahead of time with "
+            f"`python model.py --download-nltk` or `python -m nltk.downloader {' '.join(missing)}`."
+        )
+    _verified_resources.update(names)
+
+
+def tokenize(text):
+    """Fast-mode tokenizer for already lowercased ``text``."""
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text):
+        if token in SPLIT_WORDS:
+            tokens.extend(SPLIT_WORDS[token])
+        else:
+            tokens.append(token)
+    return tokens
+
+
+class TextPreprocessor:
+    def __init__(self, mode='fast', lemma_cache_size=65536):
+        if mode not in MODES:
+            raise ValueError(f"Unknown preprocessing mode {mode!r}; expected one of {', '.join(MODES)}")
+        self.mode = mode
+        self.lemma_cache_size = lemma_cache_size
+        self.stop_words = STOP_WORDS
+        self._tokenize = tokenize
+        self._lemmatize = None
+
+    def _load(self):
+        # NLTK is imported on first use; importing it costs about a second
+        if self.mode == 'compat':
+            ensure_nltk_data()
+            from nltk.corpus import stopwords
+            from nltk.tokenize import word_tokenize
+            self.stop_words = frozenset(stopwords.words('english'))
+            self._tokenize = word_tokenize
+        else:
+            ensure_nltk_data(resources=['wordnet'])
+        from nltk.stem import WordNetLemmatizer
+        self._lemmatize = lru_cache(maxsize=self.lemma_cache_size)(WordNetLemmatizer().lemmatize)
+
+    def tokens(self, text):
+        if self._lemmatize is None:
+            self._load()
+        lemmatize = self._lemmatize
+        stop_words = self.stop_words
+        return [lemmatize(token) for token in self._tokenize(text.lower()) if token not in stop_words]
+
+    def preprocess(self, text):
+        return ' '.join(self.tokens(text))
+
+    def preprocess_many(self, texts):
+        if self._lemmatize is None:
+            self._load()
+        tokenize_text, lemmatize, stop_words = self._tokenize, self._lemmatize, self.stop_words
+        return [
+            ' '.join([lemmatize(token) for token in tokenize_text(text.lower()) if token not in stop_words])
+            for text in texts
+        ]
+
+    def cache_info(self):
+        return self._lemmatize.cache_info() if self._lemmatize is not None else None
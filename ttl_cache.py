@@ -0,0 +1,59 @@
+from collections import OrderedDict
+import threading
+import time
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire ``ttl`` seconds after insertion.
+
+    A ``maxsize`` of 0 disables caching: ``get`` always misses and ``set`` is a no-op.
+    """
+
+    def __init__(self, maxsize=1024, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > now:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            if self._data.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'invalidations': self.invalidations
+        }
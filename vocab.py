@@ -0,0 +1,224 @@
+"""Compact serving vocabulary for the intent model's tokenizer.
+
+A ``.vocab`` file holds only what ``texts_to_sequences`` needs: the Keras
+Tokenizer settings and the word -> id table, stored as a byte-sorted string
+table with a parallel id array and an open-addressing hash index (crc32,
+linear probing) over it. The file is memory-mapped read-only, so forked
+workers share one copy through the page cache, and lookups probe it in place
+without building a dict. Nothing is unpickled, so loading it never imports
+Keras or executes code from the file.
+
+Layout (little-endian)::
+
+    magic  b'HCVOCAB1'
+    uint32 word count N, uint32 settings length S, uint32 slot count M (power of two)
+    S bytes of settings JSON, zero-padded to a multiple of 4
+    uint32 offsets[N + 1]   string table offsets into the blob
+    uint32 ids[N]           token id of each string
+    uint32 slots[M]         string position per hash slot, EMPTY_SLOT if unused
+    blob                    UTF-8 words, concatenated in byte order
+
+Usage: python vocab.py [tokenizer.pickle] [tokenizer.vocab]
+"""
+import json
+import mmap
+import struct
+import zlib
+
+import numpy as np
+
+MAGIC = b'HCVOCAB1'
+HEADER = struct.Struct('<III')
+EMPTY_SLOT = 0xFFFFFFFF
+
+
+class Vocabulary:
+    """Read-only word -> id mapping over the bytes of a ``.vocab`` file."""
+
+    def __init__(self, buffer):
+        self._buffer = buffer
+        view = memoryview(buffer)
+        if bytes(view[:len(MAGIC)]) != MAGIC:
+            raise ValueError('Not a vocabulary file')
+        count, settings_length, slot_count = HEADER.unpack_from(view, len(MAGIC))
+        start = len(MAGIC) + HEADER.size
+        self.settings = json.loads(bytes(view[start:start + settings_length]))
+
+        start += _padded(settings_length)
+        self._offsets = view[start:start + 4 * (count + 1)].cast('I')
+        start += 4 * (count + 1)
+        self._ids = view[start:start + 4 * count].cast('I')
+        start += 4 * count
+        self._slots = view[start:start + 4 * slot_count].cast('I')
+        self._mask = slot_count - 1
+        self._blob = view[start + 4 * slot_count:]
+        self._count = count
+
+    @classmethod
+    def open(cls, path):
+        with open(path, 'rb') as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def _word(self, position):
+        return bytes(self._blob[self._offsets[position]:self._offsets[position + 1]])
+
+    def get(self, word, default=None):
+        key = word.encode('utf-8')
+        offsets, slots, blob = self._offsets, self._slots, self._blob
+        slot = zlib.crc32(key) & self._mask
+        while True:
+            position = slots[slot]
+            if position == EMPTY_SLOT:
+                return default
+            if blob[offsets[position]:offsets[position + 1]] == key:
+                return self._ids[position]
+            slot = (slot + 1) & self._mask
+
+    def __getitem__(self, word):
+        index = self.get(word)
+        if index is None:
+            raise KeyError(word)
+        return index
+
+    def __contains__(self, word):
+        return self.get(word) is not None
+
+    def __len__(self):
+        return self._count
+
+    def items(self):
+        for position in range(self._count):
+            yield self._word(position).decode('utf-8'), self._ids[position]
+
+
+class VocabTokenizer:
+    """``texts_to_sequences`` of a fitted Keras Tokenizer, without Keras.
+
+    ``word_index`` can be a dict or a ``Vocabulary``; ids come out identical
+    to Keras for the same settings.
+    """
+
+    def __init__(self, word_index, filters, lower=True, split=' ', num_words=None, oov_token=None):
+        self.word_index = word_index
+        self.filters = filters
+        self.lower = lower
+        self.split = split
+        self.num_words = num_words
+        self.oov_token = oov_token
+        self._oov_index = word_index.get(oov_token) if oov_token is not None else None
+        self._translate = str.maketrans({ch: split for ch in filters})
+
+    @classmethod
+    def from_keras(cls, tokenizer):
+        if isinstance(tokenizer, cls):
+            return tokenizer
+        if tokenizer.char_level:
+            raise ValueError('Character-level tokenizers are not supported')
+        return cls(dict(tokenizer.word_index), tokenizer.filters, tokenizer.lower, tokenizer.split,
+                   tokenizer.num_words, tokenizer.oov_token)
+
+    @classmethod
+    def from_file(cls, path):
+        vocabulary = Vocabulary.open(path)
+        return cls(vocabulary, **vocabulary.settings)
+
+    def settings(self):
+        return {
+            'filters': self.filters,
+            'lower': self.lower,
+            'split': self.split,
+            'num_words': self.num_words,
+            'oov_token': self.oov_token
+        }
+
+    def to_config(self):
+        return dict(self.settings(), word_index=dict(self.word_index.items()))
+
+    def save(self, path):
+        write_vocab(path, self.word_index, self.settings())
+
+    def text_to_word_sequence(self, text):
+        if self.lower:
+            text = text.lower()
+        return [word for word in text.translate(self._translate).split(self.split) if word]
+
+    def texts_to_sequences(self, texts):
+        sequences = []
+        for text in texts:
+            sequence = []
+            for word in self.text_to_word_sequence(text):
+                index = self.word_index.get(word)
+                if index is not None and (not self.num_words or index < self.num_words):
+                    sequence.append(index)
+                elif self._oov_index is not None:
+                    sequence.append(self._oov_index)
+            sequences.append(sequence)
+        return sequences
+
+
+def pad_sequences(sequences, maxlen):
+    """Same result as Keras ``pad_sequences`` with its defaults ('pre' padding and truncating)."""
+    padded = np.zeros((len(sequences), maxlen), dtype=np.int32)
+    for row, sequence in enumerate(sequences):
+        sequence = sequence[-maxlen:]
+        if len(sequence):
+            padded[row, maxlen - len(sequence):] = sequence
+    return padded
+
+
+def _padded(length):
+    return (length + 3) // 4 * 4
+
+
+def write_vocab(path, word_index, settings):
+    entries = sorted((word.encode('utf-8'), index) for word, index in word_index.items())
+    settings_json = json.dumps(settings).encode('utf-8')
+
+    offsets = [0]
+    for word, _ in entries:
+        offsets.append(offsets[-1] + len(word))
+
+    # At most half full, so probe chains stay short
+    slot_count = 1
+    while slot_count < 2 * len(entries):
+        slot_count *= 2
+    slots = [EMPTY_SLOT] * slot_count
+    for position, (word, _) in enumerate(entries):
+        slot = zlib.crc32(word) & (slot_count - 1)
+        while slots[slot] != EMPTY_SLOT:
+            slot = (slot + 1) & (slot_count - 1)
+        slots[slot] = position
+
+    with open(path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(HEADER.pack(len(entries), len(settings_json), slot_count))
+        f.write(settings_json.ljust(_padded(len(settings_json)), b'\0'))
+        f.write(np.asarray(offsets, dtype='<u4').tobytes())
+        f.write(np.asarray([index for _, index in entries], dtype='<u4').tobytes())
+        f.write(np.asarray(slots, dtype='<u4').tobytes())
+        f.write(b''.join(word for word, _ in entries))
+
+
+def load_tokenizer(path):
+    """Load a ``.vocab`` file, or a legacy pickled Keras Tokenizer (needs Keras; trusted files only)."""
+    if path.endswith('.pickle'):
+        import pickle
+        with open(path, 'rb') as handle:
+            return pickle.load(handle)
+    return VocabTokenizer.from_file(path)
+
+
+def convert_pickle(pickle_path, vocab_path):
+    VocabTokenizer.from_keras(load_tokenizer(pickle_path)).save(vocab_path)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Convert a pickled Keras Tokenizer to the .vocab format')
+    parser.add_argument('pickle_path', nargs='?', default='tokenizer.pickle')
+    parser.add_argument('vocab_path', nargs='?', default='tokenizer.vocab')
+    args = parser.parse_args()
+
+    convert_pickle(args.pickle_path, args.vocab_path)
+    print(f'Wrote {args.vocab_path}')
@@ -0,0 +1,126 @@
+import logging
+import os
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindBuffer:
+    """Bounded in-process queue flushed in batches by a background thread.
+
+    ``record()`` never blocks: when the queue is full the item is dropped and
+    counted. ``flush_func(items)`` receives up to ``batch_size`` items at a time,
+    either once a batch is full or every ``flush_interval`` seconds.
+
+    The worker thread starts on the first ``record()`` in each process, so a
+    buffer created before a preforking server forks still works in its workers.
+    """
+
+    def __init__(self, flush_func, max_queue_size=10000, batch_size=200, flush_interval=1.0):
+        self.flush_func = flush_func
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+        self.flushes = 0
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+        self._thread = None
+        self._closed = False
+
+    def record(self, item):
+        """Queue ``item`` for writing; returns False if it had to be dropped.
+
+        Items are dropped when the queue is full, or after ``close()`` in this process.
+        """
+        if self._pid != os.getpid():
+            self._start()
+        if self._closed:
+            self._drop('Write-behind buffer closed; dropping items')
+            return False
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except queue.Full:
+            self._drop('Write-behind queue full; dropping items')
+            return False
+
+    def stats(self):
+        return {
+            'queue_depth': self._queue.qsize() if self._queue is not None else 0,
+            'queue_capacity': self.max_queue_size,
+            'dropped': self.dropped,
+            'written': self.written,
+            'failed': self.failed,
+            'flushes': self.flushes
+        }
+
+    def close(self, timeout=10):
+        """Stop the worker after it has flushed everything already queued."""
+        if self._thread is None or self._pid != os.getpid() or self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _drop(self, warning):
+        with self._lock:
+            self.dropped += 1
+            if self.dropped == 1:
+                logger.warning(warning)
+
+    def _start(self):
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            # Threads don't survive fork, so each process gets its own queue and worker
+            self._pid = os.getpid()
+            self._closed = False
+            self._queue = queue.Queue(maxsize=self.max_queue_size)
+            self._thread = threading.Thread(target=self._run, name='write-behind', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                item = False
+
+            if item is None:
+                # Sentinel from close(): write out whatever is left
+                while True:
+                    try:
+                        remaining = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if remaining is not None:
+                        batch.append(remaining)
+                for start in range(0, len(batch), self.batch_size):
+                    self._flush(batch[start:start + self.batch_size])
+                return
+
+            if item is not False:
+                batch.append(item)
+            if len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                if batch:
+                    self._flush(batch)
+                    batch = []
+                deadline = time.monotonic() + self.flush_interval
+
+    def _flush(self, batch):
+        try:
+            self.flush_func(batch)
+        except Exception:
+            self.failed += len(batch)
+            logger.exception('Failed to write %d buffered items', len(batch))
+        else:
+            self.written += len(batch)
+        self.flushes += 1